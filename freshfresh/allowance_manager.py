@@ -0,0 +1,66 @@
+import threading
+
+
+class AllowanceManager:
+    """Our ERC20 allowances per (token, spender), kept locally.
+
+    The allowance only changes through our own transactions, so after one
+    read it is tracked here: an approval sets it, a swap spends from it and
+    a transaction that fails on chain drops the entry so the next swap
+    reads it again. With the 'standing' policy an approval covers
+    `standing_trades` trades of the size being approved, capped at the
+    token's ceiling (never less than the trade itself), so the steady-state
+    swap needs neither an allowance read nor an approval. The 'exact'
+    policy approves each swap's amount.
+    """
+
+    def __init__(self, policy='standing', standing_trades=10, ceilings=None):
+        self.policy = policy
+        self.standing_trades = standing_trades
+        self.ceilings = {token.lower(): ceiling for token, ceiling in (ceilings or {}).items()}  # token -> wei
+        self._allowances = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token, spender):
+        return token.lower(), spender.lower()
+
+    def get(self, token, spender):
+        """Tracked allowance in wei, or None if it has to be read from the chain"""
+        with self._lock:
+            return self._allowances.get(self._key(token, spender))
+
+    def set(self, token, spender, allowance):
+        """Record an allowance read from the chain"""
+        with self._lock:
+            self._allowances[self._key(token, spender)] = allowance
+
+    def approval_amount(self, token, amount):
+        """How much to approve for a trade of `amount` wei under the policy"""
+        if self.policy != 'standing':
+            return amount
+        ceiling = self.ceilings.get(token.lower())
+        standing = amount * self.standing_trades
+        if ceiling is not None:
+            standing = min(standing, ceiling)
+        return max(standing, amount)
+
+    def approved(self, token, spender, allowance):
+        """Our approval of `allowance` was broadcast"""
+        self.set(token, spender, allowance)
+
+    def spent(self, token, spender, amount):
+        """Our swap spending `amount` was broadcast"""
+        with self._lock:
+            key = self._key(token, spender)
+            if key in self._allowances:
+                self._allowances[key] = max(self._allowances[key] - amount, 0)
+
+    def invalidate(self, token, spender):
+        """Forget the allowance (a transaction that changes it failed); the next swap reads it"""
+        with self._lock:
+            self._allowances.pop(self._key(token, spender), None)
+
+    def get_stats(self):
+        with self._lock:
+            return {f"{token}:{spender}": allowance for (token, spender), allowance in self._allowances.items()}
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Offline backtester for the multi-exchange spike strategy
+"""
+
+import sys
+import time
+import numpy as np
+from config import (
+    SPIKE_THRESHOLD, PRICE_LOOKBACK_PERIODS, MIN_PRICE_CHANGE,
+    SIMULTANEOUS_SPIKE_FACTOR, DIRECTIONAL_SPIKE_FACTOR, ALIGN_FILL,
+    DEFAULT_TRADE_AMOUNT, MAX_TRADE_AMOUNT, MAX_DAILY_TRADES, MIN_BALANCE_THRESHOLD,
+    BACKTEST_INITIAL_USDC, BACKTEST_FEE_RATE, BACKTEST_SLIPPAGE, CANDLE_STORE_DIR,
+    TICK_FILTER_ENABLED, TICK_FILTER_WINDOW, TICK_FILTER_THRESHOLD,
+    TICK_FILTER_MIN_DEVIATION, TICK_FILTER_MAX_CROSS_DEVIATION
+)
+from spike_detector import find_spikes, rolling_spikes
+from candle_alignment import merge_timestamps, asof_index
+from tick_filter import classify_ticks
+
+# Signal codes used in the per-candle signal array
+NO_SIGNAL, SIMULTANEOUS, UPWARD, DOWNWARD = 0, 1, 2, 3
+SIGNAL_TYPES = {
+    SIMULTANEOUS: 'simultaneous_spikes',
+    UPWARD: 'strong_upward',
+    DOWNWARD: 'strong_downward',
+}
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+DEFAULT_PARAMS = {
+    'spike_threshold': SPIKE_THRESHOLD,
+    'lookback_periods': PRICE_LOOKBACK_PERIODS,
+    'min_price_change': MIN_PRICE_CHANGE,
+    'simultaneous_factor': SIMULTANEOUS_SPIKE_FACTOR,
+    'directional_factor': DIRECTIONAL_SPIKE_FACTOR,
+    'align_fill': ALIGN_FILL,
+    'tick_filter': TICK_FILTER_ENABLED,
+    'tick_filter_window': TICK_FILTER_WINDOW,
+    'tick_filter_threshold': TICK_FILTER_THRESHOLD,
+    'tick_filter_min_deviation': TICK_FILTER_MIN_DEVIATION,
+    'tick_filter_max_cross_deviation': TICK_FILTER_MAX_CROSS_DEVIATION,
+    'trade_amount': DEFAULT_TRADE_AMOUNT,
+    'max_trade_amount': MAX_TRADE_AMOUNT,
+    'max_daily_trades': MAX_DAILY_TRADES,
+    'min_balance_threshold': MIN_BALANCE_THRESHOLD,
+    'initial_usdc': BACKTEST_INITIAL_USDC,
+    'initial_cro': 0.0,
+    'fee_rate': BACKTEST_FEE_RATE,  # percent
+    'slippage': BACKTEST_SLIPPAGE,  # percent
+}
+
+
+def evaluate_signals(series, params):
+    """Vectorized detect_spikes + evaluate_spikes over a whole history.
+
+    `series` maps exchange name -> (timestamps, closes), each sorted by
+    timestamp. Every timestamp seen on any exchange is a decision point.
+    Exchanges are aligned on that grid and bad ticks dropped as in
+    MarketAnalyzer.detect_spikes, so at each point every exchange
+    contributes the spike window over the same grid bars that a live check
+    would see. Returns (grid, signals, prices): the decision timestamps, a
+    signal code per timestamp and the mean close across exchanges there.
+    """
+    series = {name: value for name, value in series.items() if len(value[0])}
+    grid, positions = merge_timestamps([timestamps for timestamps, _ in series.values()])
+    count = len(grid)
+
+    # Closes on the grid (as of each grid time) and which slots are real candles
+    grid_closes = np.full((len(series), count), np.nan)
+    present = np.zeros((len(series), count), dtype=bool)
+    for row, ((_, closes), position) in enumerate(zip(series.values(), positions)):
+        present[row, position] = True
+        index = asof_index(position, count)
+        grid_closes[row, index >= 0] = np.asarray(closes, dtype=np.float64)[index[index >= 0]]
+
+    rejected = np.zeros_like(present)
+    held = np.zeros_like(present)
+    if params['tick_filter']:
+        # Held: outliers held back while they were the newest candle, then kept
+        rejected, held = classify_ticks(
+            grid_closes, present, params['tick_filter_window'], params['tick_filter_threshold'],
+            params['tick_filter_min_deviation'], params['tick_filter_max_cross_deviation']
+        )
+    candles = present
+    present = present & ~rejected
+
+    up_count = np.zeros(count, dtype=np.int64)
+    down_count = np.zeros(count, dtype=np.int64)
+    up_sum = np.zeros(count)
+    down_sum = np.zeros(count)
+    price_sum = np.zeros(count)
+    price_count = np.zeros(count, dtype=np.int64)
+
+    for row in range(len(series)):
+        # Newest accepted candle of this exchange at or before each grid time
+        real = np.flatnonzero(present[row])
+        index = asof_index(real, count)
+        listed = index >= 0
+        filled = np.full(count, np.nan)
+        filled[listed] = grid_closes[row, real[index[listed]]]
+
+        # Spikes are found on the aligned bars, like MarketAnalyzer.detect_spikes
+        aligned = filled.copy() if params['align_fill'] == 'ffill' else np.where(present[row], grid_closes[row], np.nan)
+        is_spike, _, magnitude = rolling_spikes(aligned, params['lookback_periods'], params['spike_threshold'])
+
+        # detect_spikes skips exchanges with fewer than lookback real candles
+        spiking = listed & is_spike & (index + 1 >= params['lookback_periods'])
+        spike_magnitude = np.where(spiking, magnitude, 0.0)
+        
+        # A move one exchange leads is kept once its next candle shows it
+        # held; until then it is the newest candle and a live check holds
+        # it back, as if it were missing
+        ticks = np.flatnonzero(candles[row])
+        newest = asof_index(ticks, count)
+        newest = np.where(newest >= 0, ticks[np.maximum(newest, 0)], -1)
+        for i in np.flatnonzero((newest >= 0) & held[row, np.maximum(newest, 0)]):
+            tick = newest[i]
+            before = np.flatnonzero(present[row, :tick])
+            previous = grid_closes[row, before[-1]] if len(before) else np.nan
+            window = np.full(params['lookback_periods'] + 1, np.nan)
+            start = max(i - params['lookback_periods'], 0)
+            window[start - i - 1:] = aligned[start:i + 1]
+            if params['align_fill'] == 'ffill':
+                window[max(tick - i - 1, -len(window)):] = previous
+            elif tick - i - 1 >= -len(window):
+                window[tick - i - 1] = np.nan
+            tick_spike, _, tick_magnitude = find_spikes(window[None, :], params['spike_threshold'])
+            listed[i] = len(before) > 0
+            filled[i] = previous
+            spiking[i] = listed[i] and tick_spike[0] and len(before) >= params['lookback_periods']
+            spike_magnitude[i] = tick_magnitude[0] if spiking[i] else 0.0
+        
+        up = spiking & (spike_magnitude > 0)
+        down = spiking & ~(spike_magnitude > 0)
+
+        up_count += up
+        down_count += down
+        up_sum += np.where(up, spike_magnitude, 0.0)
+        down_sum += np.where(down, spike_magnitude, 0.0)
+        price_sum += np.where(listed, filled, 0.0)
+        price_count += listed
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        up_mean = up_sum / up_count
+        down_mean = down_sum / down_count
+        prices = price_sum / price_count
+
+    simultaneous_min = params['min_price_change'] * params['simultaneous_factor']
+    directional_min = params['min_price_change'] * params['directional_factor']
+
+    # Same branches as MarketAnalyzer.evaluate_spikes. Down magnitudes are
+    # negative there too, so they are compared signed, not by size.
+    signals = np.full(count, NO_SIGNAL, dtype=np.int8)
+    both = (up_count > 0) & (down_count > 0)
+    signals[both & (up_mean >= simultaneous_min) & (down_mean >= simultaneous_min)] = SIMULTANEOUS
+    signals[(up_count > 0) & (down_count == 0) & (up_mean >= directional_min)] = UPWARD
+    signals[(up_count == 0) & (down_count > 0) & (down_mean >= directional_min)] = DOWNWARD
+
+    return grid, signals, prices
+
+
+def simulate_trades(grid, signals, prices, params):
+    """Replay TradingBot's trade rules on a signal array.
+
+    Only candles with a signal are visited. Buys spend
+    min(trade_amount, max_trade_amount) USDC, sells half the CRO held, both
+    filled at the mean close moved against the trade by `slippage` and
+    charged `fee_rate`. The daily trade limit resets at 00:00 UTC.
+    """
+    usdc = float(params['initial_usdc'])
+    cro = float(params['initial_cro'])
+    fee = params['fee_rate'] / 100
+    slippage = params['slippage'] / 100
+
+    trade_index, usdc_after, cro_after = [], [], []
+    buys = sells = skipped = 0
+    fees_paid = 0.0
+    trades_today = 0
+    day = None
+
+    for i in np.flatnonzero(signals):
+        today = grid[i] // DAY_MS
+        if today != day:
+            day = today
+            trades_today = 0
+
+        # TradingBot._can_trade
+        if (trades_today >= params['max_daily_trades'] or usdc < params['min_balance_threshold']
+                or usdc < params['trade_amount']):
+            skipped += 1
+            continue
+
+        price = prices[i]
+        if signals[i] == DOWNWARD:
+            if cro <= 0:
+                continue
+            sell_amount = cro * 0.5
+            proceeds = sell_amount * float(price) * (1 - slippage)
+            fees_paid += proceeds * fee
+            usdc += proceeds * (1 - fee)
+            cro -= sell_amount
+            sells += 1
+        else:
+            amount = min(params['trade_amount'], params['max_trade_amount'])
+            fees_paid += amount * fee
+            cro += amount * (1 - fee) / float(price * (1 + slippage))
+            usdc -= amount
+            buys += 1
+
+        trades_today += 1
+        trade_index.append(i)
+        usdc_after.append(usdc)
+        cro_after.append(cro)
+
+    # Balances only change at trades: look up the last trade at or before each candle
+    state = np.searchsorted(np.asarray(trade_index, dtype=np.int64), np.arange(len(grid)), side='right') - 1
+    usdc_curve = np.append(usdc_after, params['initial_usdc'])[state]
+    cro_curve = np.append(cro_after, params['initial_cro'])[state]
+    equity = usdc_curve + cro_curve * prices
+
+    return {
+        'buys': buys,
+        'sells': sells,
+        'skipped_signals': skipped,
+        'fees_paid': fees_paid,
+        'final_usdc': usdc,
+        'final_cro': cro,
+        'equity': equity,
+    }
+
+
+class Backtester:
+    """Replay stored candle history through the live spike strategy.
+
+    Signals are evaluated for every candle at once with the same spike
+    and threshold rules as MarketAnalyzer.detect_spikes and
+    evaluate_spikes; only candles with a signal are stepped through to
+    apply TradingBot's trade limits and balances.
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+
+    def get_store(self):
+        if self.store is None:
+            from candle_store import CandleStore
+            self.store = CandleStore(CANDLE_STORE_DIR)
+        return self.store
+
+    def load(self, symbol='CRO/USDT', timeframe='1m', start=None, end=None, exchanges=None):
+        """Stored candles as exchange name -> (timestamps, closes)"""
+        store = self.get_store()
+        series = {}
+        for exchange, stored_symbol, stored_timeframe in store.series():
+            if stored_symbol != symbol or stored_timeframe != timeframe:
+                continue
+            if exchanges is not None and exchange not in exchanges:
+                continue
+            candles = store.read(exchange, symbol, timeframe, start, end)
+            if len(candles):
+                series[exchange] = (np.asarray(candles['timestamp']), np.asarray(candles['close']))
+        return series
+
+    def run(self, symbol='CRO/USDT', timeframe='1m', start=None, end=None, params=None):
+        """Backtest stored history of one symbol; see run_arrays for the result"""
+        series = self.load(symbol, timeframe, start, end)
+        if not series:
+            return {'success': False, 'error': f"No stored {timeframe} candles for {symbol}"}
+        return self.run_arrays(series, params)
+
+    def run_arrays(self, series, params=None):
+        """Backtest exchange name -> (timestamps, closes) with params overriding DEFAULT_PARAMS"""
+        started = time.perf_counter()
+        params = {**DEFAULT_PARAMS, **(params or {})}
+
+        grid, signals, prices = evaluate_signals(series, params)
+        if not len(grid):
+            return {'success': False, 'error': "No candles to backtest"}
+        trades = simulate_trades(grid, signals, prices, params)
+
+        equity = trades.pop('equity')
+        initial_equity = float(params['initial_usdc'] + params['initial_cro'] * prices[0])
+        final_equity = float(equity[-1])
+        peak = np.maximum.accumulate(equity)
+        drawdown = (peak - equity) / peak * 100
+
+        return {
+            'success': True,
+            'candles': len(grid),
+            'start': int(grid[0]),
+            'end': int(grid[-1]),
+            'signals': {name: int(np.count_nonzero(signals == code)) for code, name in SIGNAL_TYPES.items()},
+            'trades': trades['buys'] + trades['sells'],
+            **trades,
+            'initial_equity': initial_equity,
+            'final_equity': final_equity,
+            'pnl': final_equity - initial_equity,
+            'pnl_pct': (final_equity / initial_equity - 1) * 100 if initial_equity else 0.0,
+            'max_drawdown_pct': float(drawdown.max()),
+            'elapsed': time.perf_counter() - started,
+        }
+
+
+def format_report(result):
+    """Human-readable backtest summary"""
+    if not result['success']:
+        return f"❌ Backtest failed: {result['error']}"
+    signals = ", ".join(f"{name}: {count}" for name, count in result['signals'].items())
+    return (
+        f"📊 Backtest over {result['candles']} candles ({result['elapsed']:.2f}s)\n"
+        f"Signals: {signals}\n"
+        f"Trades: {result['trades']} ({result['buys']} buys, {result['sells']} sells, "
+        f"{result['skipped_signals']} signals skipped by limits)\n"
+        f"Equity: ${result['initial_equity']:.2f} -> ${result['final_equity']:.2f}\n"
+        f"PnL: ${result['pnl']:.2f} ({result['pnl_pct']:.2f}%)\n"
+        f"Max drawdown: {result['max_drawdown_pct']:.2f}%\n"
+        f"Fees paid: ${result['fees_paid']:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    symbol = sys.argv[1] if len(sys.argv) > 1 else 'CRO/USDT'
+    timeframe = sys.argv[2] if len(sys.argv) > 2 else '1m'
+    result = Backtester().run(symbol, timeframe)
+    print(format_report(result))
+    sys.exit(0 if result['success'] else 1)
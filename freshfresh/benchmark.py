@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the CRO/USDC Trading Bot hot paths
+"""
+
+import subprocess
+import sys
+import timeit
+import numpy as np
+import pandas as pd
+
+
+def _time_call(func, repeat=5, number=20):
+    """Best time per call in milliseconds"""
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number * 1000
+
+
+def _synthetic_price_data(exchange_count, candles=20, seed=0):
+    """Random-walk candles for `exchange_count` exchanges with a few spikes"""
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range('2024-01-01', periods=candles, freq='1min')
+    price_data = {}
+    for i in range(exchange_count):
+        returns = rng.normal(0, 0.01, candles)
+        returns[-2] += rng.choice([-0.03, 0, 0.03])
+        close = 0.1 * np.cumprod(1 + returns)
+        price_data[f'exchange_{i}'] = pd.DataFrame({
+            'timestamp': timestamps,
+            'open': close, 'high': close, 'low': close, 'close': close,
+            'volume': rng.uniform(1000, 5000, candles)
+        })
+    return price_data
+
+
+def bench_detect_spikes():
+    """Vectorized detect_spikes vs the per-exchange pandas path.
+
+    detect_spikes also converts the DataFrames to arrays and aligns them on
+    a common timestamp grid before the vectorized pass, and that conversion
+    is most of its time. End to end it measures about 2-4x faster than the
+    pandas path, not the 11-19x of the bare vectorized pass before candle
+    alignment was added.
+    """
+    from market_analyzer import MarketAnalyzer
+
+    print("🔍 detect_spikes: vectorized NumPy vs pandas")
+    analyzer = MarketAnalyzer()
+    # The pandas reference has no bad-tick filter, so compare the detectors without it
+    analyzer.tick_filter_enabled = False
+    filtered = MarketAnalyzer()
+
+    for exchange_count in (2, 10, 50, 200):
+        price_data = _synthetic_price_data(exchange_count)
+
+        vectorized = analyzer.detect_spikes(price_data)
+        reference = analyzer.detect_spikes_pandas({k: df.copy() for k, df in price_data.items()})
+        assert vectorized.keys() == reference.keys(), "detectors disagree on spiking exchanges"
+        for name, spike in reference.items():
+            assert vectorized[name]['direction'] == spike['direction']
+            assert np.isclose(vectorized[name]['magnitude'], spike['magnitude'])
+            assert vectorized[name]['timestamp'] == spike['timestamp']
+
+        pandas_ms = _time_call(lambda: analyzer.detect_spikes_pandas(price_data))
+        numpy_ms = _time_call(lambda: analyzer.detect_spikes(price_data))
+        filtered_ms = _time_call(lambda: filtered.detect_spikes(price_data))
+        print(f"  {exchange_count:>4} exchanges: pandas {pandas_ms:8.3f} ms | "
+              f"numpy {numpy_ms:8.3f} ms | {pandas_ms / numpy_ms:6.1f}x | with tick filter {filtered_ms:8.3f} ms")
+
+
+def bench_backtest():
+    """Backtest a year of 1-minute candles from two exchanges"""
+    from backtester import Backtester
+
+    print("🔍 Backtester: one year of 1m candles, 2 exchanges")
+    rng = np.random.default_rng(0)
+    candles = 365 * 24 * 60
+    timestamps = np.arange(candles, dtype=np.int64) * 60_000
+    # One market price, quoted by each exchange with a little noise of its own
+    returns = rng.normal(0, 0.003, candles)
+    returns[rng.integers(0, candles, 200)] += rng.choice([-0.04, 0.04], 200)
+    market = 0.1 * np.cumprod(1 + returns)
+    series = {}
+    for name in ('kucoin', 'crypto_com'):
+        series[name] = (timestamps, market * (1 + rng.normal(0, 0.0005, candles)))
+
+    backtester = Backtester()
+    result = backtester.run_arrays(series)
+    elapsed_ms = _time_call(lambda: backtester.run_arrays(series), repeat=3, number=1)
+    print(f"  {candles} candles: {elapsed_ms:8.1f} ms | {sum(result['signals'].values())} signals | "
+          f"{result['trades']} trades | PnL {result['pnl_pct']:.2f}%")
+
+
+def bench_indicators():
+    """Per-candle cost of the incremental indicators for growing windows"""
+    from indicators import IndicatorSet
+
+    print("🔍 Incremental indicators: cost per closed candle")
+    rng = np.random.default_rng(0)
+    count = 20_000
+    close = 0.1 * np.cumprod(1 + rng.normal(0, 0.005, count))
+    candles = np.column_stack([
+        np.arange(count) * 60_000, close, close * 1.002, close * 0.998, close, rng.uniform(1000, 5000, count)
+    ]).tolist()
+
+    for window in (20, 200, 2000):
+        def feed():
+            indicators = IndicatorSet(window, window, window, window)
+            for candle in candles:
+                indicators.update(candle)
+        per_candle_us = _time_call(feed, repeat=3, number=1) / count * 1000
+        print(f"  window {window:>5}: {per_candle_us:6.2f} us per candle")
+
+
+def bench_trade_bars():
+    """Trades per second aggregated into 1s/5s/15s bars"""
+    from trade_bars import TradeBarBuilder
+
+    print("🔍 Trade bars: 1s/5s/15s bars from raw trades")
+    rng = np.random.default_rng(0)
+    count = 200_000
+    timestamps = np.sort(rng.integers(0, count // 5, count)) * 5  # ~1000 trades per second
+    prices = 0.1 * np.cumprod(1 + rng.normal(0, 0.0001, count))
+    amounts = rng.uniform(1, 1000, count)
+
+    for batch in (1000, 50, 5):
+        def feed():
+            builder = TradeBarBuilder(['1s', '5s', '15s'], 900)
+            for start in range(0, count, batch):
+                end = start + batch
+                builder.add_trades(timestamps[start:end], prices[start:end], amounts[start:end])
+        elapsed_ms = _time_call(feed, repeat=3, number=1)
+        print(f"  batches of {batch:>4}: {count / elapsed_ms * 1000:12,.0f} trades/s")
+
+
+def bench_order_book():
+    """Cost of one level change in an order book of growing size"""
+    from order_book import OrderBook
+
+    print("🔍 Order book: cost per level change")
+    rng = np.random.default_rng(0)
+    for levels in (20, 200, 2000):
+        book = OrderBook(levels)
+        tick = 0.0001
+        book.apply_snapshot([(1 - i * tick, 100.0) for i in range(levels)],
+                            [(1 + (i + 1) * tick, 100.0) for i in range(levels)], 0)
+        changes = [
+            (round(1 - int(i) * tick, 4), float(size))
+            for i, size in zip(rng.integers(0, levels, 10_000), rng.choice([0, 50, 150], 10_000))
+        ]
+        sequence = iter(range(1, 10**9))
+
+        def apply():
+            for change in changes:
+                book.apply_diff([change], [], next(sequence))
+        per_change_us = _time_call(apply, repeat=3, number=1) / len(changes) * 1000
+        print(f"  {levels:>5} levels: {per_change_us:6.2f} us per change")
+
+
+def bench_consolidated_book():
+    """Executable price for 100 USDC across two exchange books and the pool curve"""
+    from order_book import OrderBook
+    from consolidated_book import ConsolidatedBook, PoolCurve
+    from config import ORDER_BOOK_DEPTH, POOL_FEE_PERCENT, POOL_LEVEL_SIZE, POOL_MAX_LEVELS
+
+    print("🔍 Consolidated book: executable price for 100 USDC")
+    rng = np.random.default_rng(0)
+    book = ConsolidatedBook()
+    exchange_books = []
+    for name, offset in (('kucoin', 0.0), ('crypto_com', 0.00005)):
+        exchange_book = OrderBook(ORDER_BOOK_DEPTH)
+        exchange_book.apply_snapshot(
+            [(0.1 + offset - i * 0.0001, float(size)) for i, size in enumerate(rng.uniform(100, 5000, ORDER_BOOK_DEPTH))],
+            [(0.1001 + offset + i * 0.0001, float(size)) for i, size in enumerate(rng.uniform(100, 5000, ORDER_BOOK_DEPTH))],
+            0
+        )
+        book.add_source(name, exchange_book)
+        exchange_books.append(exchange_book)
+    pool = PoolCurve(POOL_FEE_PERCENT, POOL_LEVEL_SIZE, POOL_MAX_LEVELS)
+    pool.set_reserves(50_000_000, 5_000_000)
+    book.add_source('vvs', pool)
+
+    number = 10_000
+    unchanged_us = _time_call(lambda: book.executable_price(100), repeat=3, number=number) * 1000
+
+    sequence = iter(range(1, 10**9))
+
+    def changed():
+        exchange_books[0].apply_diff([(0.1, 1000.0)], [], next(sequence))
+        book.executable_price(100)
+    changed_us = _time_call(changed, repeat=3, number=number) * 1000
+    print(f"  unchanged books: {unchanged_us:6.2f} us | after a book change: {changed_us:6.2f} us")
+
+
+def bench_contract_calls():
+    """Local per-call overhead of the balance and swap paths, before and after the contract registry"""
+    from web3 import Web3
+    from contract_registry import ContractRegistry
+    from config import CRO_TOKEN_ADDRESS, USDC_TOKEN_ADDRESS, WALLET_ADDRESS
+
+    print("🔍 Contract calls: local overhead per call (no RPC)")
+    w3 = Web3()
+    registry = ContractRegistry(w3)
+    erc20_abi = [{
+        "constant": True,
+        "inputs": [{"name": "_owner", "type": "address"}],
+        "name": "balanceOf",
+        "outputs": [{"name": "balance", "type": "uint256"}],
+        "type": "function"
+    }]
+
+    def balance_before():
+        contract = w3.eth.contract(address=Web3.to_checksum_address(USDC_TOKEN_ADDRESS), abi=erc20_abi)
+        return contract.functions.balanceOf(WALLET_ADDRESS)._encode_transaction_data()
+
+    def balance_after():
+        return registry.address(USDC_TOKEN_ADDRESS), registry.call_data('balanceOf(address)', WALLET_ADDRESS)
+
+    def path_before():
+        return [Web3.to_checksum_address(USDC_TOKEN_ADDRESS), Web3.to_checksum_address(CRO_TOKEN_ADDRESS)]
+
+    def path_after():
+        return [registry.address(USDC_TOKEN_ADDRESS), registry.address(CRO_TOKEN_ADDRESS)]
+
+    number = 2000
+    for name, before, after in (('balance', balance_before, balance_after), ('swap path', path_before, path_after)):
+        before_us = _time_call(before, repeat=3, number=number) * 1000
+        after_us = _time_call(after, repeat=3, number=number) * 1000
+        print(f"  {name:>9}: {before_us:8.2f} us -> {after_us:6.2f} us per call")
+
+
+def bench_startup():
+    """Import and construction time of MarketAnalyzer in a fresh interpreter"""
+    print("🔍 MarketAnalyzer startup (fresh interpreter, best of 3)")
+    script = (
+        "import time; t0 = time.perf_counter(); "
+        "from market_analyzer import MarketAnalyzer; t1 = time.perf_counter(); "
+        "MarketAnalyzer(); t2 = time.perf_counter(); "
+        "print((t1 - t0) * 1000, (t2 - t1) * 1000)"
+    )
+    runs = []
+    for _ in range(3):
+        output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+        runs.append([float(value) for value in output.split()])
+    print(f"  import {min(r[0] for r in runs):8.1f} ms | construct {min(r[1] for r in runs):8.2f} ms")
+
+
+def main():
+    """Run all benchmarks"""
+    print("🚀 Running CRO/USDC Trading Bot benchmarks\n")
+
+    benchmarks = [
+        bench_startup,
+        bench_detect_spikes,
+        bench_backtest,
+        bench_indicators,
+        bench_trade_bars,
+        bench_order_book,
+        bench_consolidated_book,
+        bench_contract_calls,
+    ]
+
+    for benchmark in benchmarks:
+        benchmark()
+        print()
+
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
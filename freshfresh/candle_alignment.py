@@ -0,0 +1,125 @@
+import numpy as np
+
+# Column order of the OHLCV arrays handled here (ccxt fetch_ohlcv order)
+TIMESTAMP, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+
+
+def merge_timestamps(timestamp_arrays):
+    """Merge sorted timestamp arrays into their union.
+
+    Returns (grid, positions): the sorted distinct timestamps and, for each
+    input array, where each of its timestamps sits on the grid. The inputs
+    are already sorted, so the stable sort over their concatenation only
+    merges k runs, and deduplication and positions are a single linear
+    pass over the merged result.
+    """
+    arrays = [np.asarray(ts, dtype=np.int64) for ts in timestamp_arrays]
+    merged = np.concatenate(arrays) if arrays else np.empty(0, dtype=np.int64)
+    order = np.argsort(merged, kind='stable')
+    ordered = merged[order]
+
+    is_new = np.empty(len(ordered), dtype=bool)
+    is_new[:1] = True
+    np.not_equal(ordered[1:], ordered[:-1], out=is_new[1:])
+    grid = ordered[is_new]
+
+    slot = np.empty(len(ordered), dtype=np.int64)
+    slot[order] = np.cumsum(is_new) - 1
+    positions = np.split(slot, np.cumsum([len(ts) for ts in arrays])[:-1]) if arrays else []
+    return grid, positions
+
+
+def asof_index(positions, length):
+    """For every grid slot, the index of the newest row at or before it (-1 if none)"""
+    index = np.full(length, -1, dtype=np.int64)
+    index[positions] = np.arange(len(positions))
+    return np.maximum.accumulate(index) if length else index
+
+
+def align_candles(candles, fill='ffill'):
+    """Join per-exchange OHLCV arrays on their common timestamp grid.
+
+    `candles` maps name -> (n, 6) OHLCV array sorted by timestamp. Returns
+    a dict with the grid ('timestamp'), each exchange's candles on it
+    ('candles', name -> (len(grid), 6)) and which slots hold a real candle
+    ('present', name -> bool array). Gaps are forward-filled as flat,
+    zero-volume bars at the previous close (fill='ffill') or left as NaN
+    (fill='mask'); slots before an exchange's first candle are always NaN.
+    """
+    names = list(candles)
+    arrays = [np.asarray(candles[name], dtype=np.float64).reshape(-1, 6) for name in names]
+    grid, positions = merge_timestamps([array[:, TIMESTAMP] for array in arrays])
+
+    aligned = {}
+    present = {}
+    for name, array, position in zip(names, arrays, positions):
+        bars = np.full((len(grid), 6), np.nan)
+        mask = np.zeros(len(grid), dtype=bool)
+        mask[position] = True
+        bars[position] = array
+        bars[:, TIMESTAMP] = grid
+        fill_gaps(bars, mask, fill)
+        aligned[name] = bars
+        present[name] = mask
+
+    return {'timestamp': grid, 'candles': aligned, 'present': present}
+
+
+def fill_gaps(bars, present, fill='ffill'):
+    """Fill the slots of aligned bars without a real candle, in place.
+
+    With fill='ffill' they become flat, zero-volume bars at the previous
+    real close; otherwise (and before the first real candle) they are NaN.
+    """
+    bars[~present, OPEN:] = np.nan
+    if fill != 'ffill':
+        return bars
+    real = np.flatnonzero(present)
+    index = asof_index(real, len(bars))
+    gaps = ~present & (index >= 0)
+    previous_close = bars[real[index[gaps]], CLOSE]
+    bars[gaps, OPEN:CLOSE + 1] = previous_close[:, None]
+    bars[gaps, VOLUME] = 0.0
+    return bars
+
+
+def consolidate(aligned, fill='ffill'):
+    """Volume-weighted consolidated OHLCV series from align_candles output.
+
+    Each bar combines the exchanges with a real candle in that slot: open
+    and close are volume-weighted (plain means when no volume traded),
+    high/low are the extremes and volume is the total. Slots with no real
+    candle anywhere repeat the previous consolidated close (fill='ffill')
+    or stay NaN (fill='mask').
+    """
+    grid = aligned['timestamp']
+    names = list(aligned['candles'])
+    result = np.full((len(grid), 6), np.nan)
+    result[:, TIMESTAMP] = grid
+    if not names:
+        return result
+
+    bars = np.stack([aligned['candles'][name] for name in names])  # exchange x slot x field
+    present = np.stack([aligned['present'][name] for name in names])
+
+    volume = np.where(present, bars[:, :, VOLUME], 0.0)
+    total_volume = volume.sum(axis=0)
+    counts = present.sum(axis=0)
+    weights = np.where(total_volume > 0, volume / np.where(total_volume > 0, total_volume, 1),
+                       present / np.maximum(counts, 1))
+
+    traded = counts > 0
+    for field in (OPEN, CLOSE):
+        result[traded, field] = (np.where(present, bars[:, :, field], 0.0) * weights).sum(axis=0)[traded]
+    result[traded, HIGH] = np.max(np.where(present, bars[:, :, HIGH], -np.inf), axis=0)[traded]
+    result[traded, LOW] = np.min(np.where(present, bars[:, :, LOW], np.inf), axis=0)[traded]
+    result[traded, VOLUME] = total_volume[traded]
+
+    if fill == 'ffill':
+        index = asof_index(np.flatnonzero(traded), len(grid))
+        gaps = ~traded & (index >= 0)
+        previous_close = result[np.flatnonzero(traded)[index[gaps]], CLOSE]
+        result[gaps, OPEN:CLOSE + 1] = previous_close[:, None]
+        result[gaps, VOLUME] = 0.0
+
+    return result
@@ -0,0 +1,98 @@
+import threading
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+class CandleBuffer:
+    """Fixed-size ring buffer of OHLCV candles for one exchange/symbol/timeframe.
+
+    Candles are stored as rows of [timestamp_ms, open, high, low, close, volume]
+    in a preallocated NumPy array. Once the buffer is full the oldest candle
+    is overwritten. Safe to write from a stream thread while others read.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = np.zeros((capacity, len(OHLCV_COLUMNS)), dtype=np.float64)
+        self._start = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def last_timestamp(self):
+        """Timestamp (ms) of the newest candle, or None if empty"""
+        if self._count == 0:
+            return None
+        return int(self._data[(self._start + self._count - 1) % self.capacity, 0])
+
+    def clear(self):
+        with self._lock:
+            self._start = 0
+            self._count = 0
+
+    def extend(self, ohlcv):
+        """Add candles in ccxt fetch_ohlcv format (oldest first).
+
+        A candle with the same timestamp as the newest stored one replaces
+        it, because the newest candle is usually still forming when it is
+        fetched. Candles older than the newest stored one are ignored.
+        Returns the number of new candles appended.
+        """
+        with self._lock:
+            return self._extend(ohlcv)
+
+    def _extend(self, ohlcv):
+        added = 0
+        for candle in ohlcv:
+            timestamp = candle[0]
+            last_timestamp = self.last_timestamp
+
+            if last_timestamp is not None and timestamp < last_timestamp:
+                continue
+
+            if last_timestamp is not None and timestamp == last_timestamp:
+                index = (self._start + self._count - 1) % self.capacity
+            elif self._count < self.capacity:
+                index = (self._start + self._count) % self.capacity
+                self._count += 1
+                added += 1
+            else:
+                index = self._start
+                self._start = (self._start + 1) % self.capacity
+                added += 1
+
+            self._data[index] = candle[:len(OHLCV_COLUMNS)]
+
+        return added
+
+    def to_array(self, limit=None, after=None):
+        """Return the newest `limit` candles (all if None) as an array, oldest first.
+
+        With `after` (ms), only candles newer than that timestamp are
+        returned; they are found by binary search, so only they are copied.
+        """
+        with self._lock:
+            count = self._count if limit is None else min(limit, self._count)
+            if after is not None:
+                low, high = self._count - count, self._count
+                while low < high:
+                    middle = (low + high) // 2
+                    if self._data[(self._start + middle) % self.capacity, 0] > after:
+                        high = middle
+                    else:
+                        low = middle + 1
+                count = self._count - low
+            first = self._start + self._count - count
+            indices = np.arange(first, first + count) % self.capacity
+            return self._data[indices]
+
+    def to_frame(self, limit=None):
+        """Return the newest `limit` candles as a DataFrame in get_price_data format"""
+        df = pd.DataFrame(self.to_array(limit), columns=OHLCV_COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'].astype(np.int64), unit='ms')
+        return df
@@ -0,0 +1,106 @@
+import os
+import threading
+import numpy as np
+
+# One fixed-width record per candle; files are plain arrays of these
+CANDLE_DTYPE = np.dtype([
+    ('timestamp', '<i8'),  # Candle open time, ms since epoch
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+])
+
+
+class CandleStore:
+    """Persistent candle history, one append-only file per (exchange, symbol, timeframe).
+
+    Each file is a flat array of CANDLE_DTYPE records in timestamp order.
+    Reads memory-map the file, so a range query returns a zero-copy view
+    and only touches the pages it needs. Because timestamps are sorted, the
+    timestamp column is its own index: a binary search finds any time in
+    O(log n) without loading the file.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._last_timestamps = {}
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def _path(self, exchange, symbol, timeframe):
+        # <directory>/<exchange>/<BASE-QUOTE>/<timeframe>.candles
+        return os.path.join(self.directory, exchange, symbol.replace('/', '-'), f"{timeframe}.candles")
+
+    def _lock(self, key):
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def last_timestamp(self, exchange, symbol, timeframe):
+        """Timestamp (ms) of the newest stored candle, or None"""
+        key = (exchange, symbol, timeframe)
+        if key not in self._last_timestamps:
+            candles = self.read(exchange, symbol, timeframe)
+            self._last_timestamps[key] = int(candles['timestamp'][-1]) if len(candles) else None
+        return self._last_timestamps[key]
+
+    def append(self, exchange, symbol, timeframe, ohlcv):
+        """Append closed candles (ccxt fetch_ohlcv rows, oldest first).
+
+        Candles not newer than the last stored one are skipped, so the same
+        candles can be offered repeatedly. Returns the number written.
+        """
+        key = (exchange, symbol, timeframe)
+        with self._lock(key):
+            last = self.last_timestamp(exchange, symbol, timeframe)
+            rows = [row for row in ohlcv if last is None or row[0] > last]
+            if not rows:
+                return 0
+
+            records = np.empty(len(rows), dtype=CANDLE_DTYPE)
+            for field_index, field in enumerate(CANDLE_DTYPE.names):
+                records[field] = [row[field_index] for row in rows]
+            records.sort(order='timestamp')
+
+            path = self._path(exchange, symbol, timeframe)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'ab') as f:
+                # Drop a partial record left behind by an interrupted write
+                size = f.tell()
+                if size % CANDLE_DTYPE.itemsize:
+                    f.truncate(size - size % CANDLE_DTYPE.itemsize)
+                f.write(records.tobytes())
+
+            self._last_timestamps[key] = int(records['timestamp'][-1])
+            return len(records)
+
+    def read(self, exchange, symbol, timeframe, start=None, end=None):
+        """Candles with start <= timestamp < end (ms) as a read-only memory-mapped array"""
+        path = self._path(exchange, symbol, timeframe)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=CANDLE_DTYPE)
+
+        count = os.path.getsize(path) // CANDLE_DTYPE.itemsize
+        if count == 0:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+
+        candles = np.memmap(path, dtype=CANDLE_DTYPE, mode='r', shape=(count,))
+        timestamps = candles['timestamp']
+        first = 0 if start is None else np.searchsorted(timestamps, start, side='left')
+        last = count if end is None else np.searchsorted(timestamps, end, side='left')
+        return candles[first:last]
+
+    def series(self):
+        """(exchange, symbol, timeframe) of every stored series"""
+        keys = []
+        for exchange in sorted(os.listdir(self.directory)):
+            exchange_dir = os.path.join(self.directory, exchange)
+            if not os.path.isdir(exchange_dir):
+                continue
+            for symbol in sorted(os.listdir(exchange_dir)):
+                for name in sorted(os.listdir(os.path.join(exchange_dir, symbol))):
+                    if name.endswith('.candles'):
+                        keys.append((exchange, symbol.replace('-', '/'), name[:-len('.candles')]))
+        return keys
@@ -14,6 +14,12 @@ RECOVERY_PHRASE = "grab gym giant atom turtle cost word analyst question nasty c
 # Cronos Network Configuration
 CRONOS_RPC_URL = "https://evm.cronos.org"
 CRONOS_CHAIN_ID = 25
+MULTICALL_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"  # Multicall3 (same address on every chain)
+MULTICALL_ENABLED = True  # Pack contract reads into one aggregate3 eth_call (else a JSON-RPC batch of eth_calls)
+RPC_TIMEOUT = 10  # Seconds to wait for a batched JSON-RPC request
+RECEIPT_POLL_INTERVAL = 1.0  # Seconds between receipt polls (about one Cronos block)
+RECEIPT_TIMEOUT = 300  # Seconds without a receipt before a transaction counts as stale (still pending, checked less often)
+RECEIPT_STALE_POLL_INTERVAL = 30.0  # Seconds between checks of a stale transaction's receipt and nonce
 
 # Token Addresses on Cronos
 CRO_TOKEN_ADDRESS = "0x5C7F8A570d578ED84E63fdFA7b1eE72dEae1AE23"  # Wrapped CRO
@@ -23,15 +29,124 @@ USDC_TOKEN_ADDRESS = "0xc21223249CA28397B4B6541dfFaEcC539BfF0c59"  # USDC on Cro
 VVS_ROUTER_ADDRESS = "0x145863Eb42Cf62847A6Ca784e6416C1682b1b2Ae"
 VVS_FACTORY_ADDRESS = "0x3B44B2a1876c0C4b0b63a048d6f4Fc1b0954d6f5"
 
+# Allowance Configuration
+ALLOWANCE_POLICY = 'standing'  # 'standing' approves ahead for several trades, 'exact' approves each swap's amount
+STANDING_APPROVAL_TRADES = 10  # Trades of the current size one standing approval covers
+STANDING_APPROVAL_CEILING_USDC = 5000  # Most USDC the router is ever approved for at once
+STANDING_APPROVAL_CEILING_CRO = 50000  # Most wrapped CRO the router is ever approved for at once
+
 # Trading Configuration
 DEFAULT_TRADE_AMOUNT = 100  # USDC
 DEFAULT_SLIPPAGE = 2.0  # 2%
 MIN_PRICE_CHANGE = 2.0  # 2% minimum price change to trigger trade (more aggressive)
 SIGNAL_CHECK_INTERVAL = 60  # seconds
 
+# Signal Schedule Configuration
+SIGNAL_CHECK_MODE = 'fixed'  # 'fixed' (every signal_check_interval), 'adaptive' (scaled by market activity) or 'aligned' (at candle closes)
+ADAPTIVE_MIN_INTERVAL = 10  # Shortest adaptive check interval, seconds
+ADAPTIVE_MAX_INTERVAL = 300  # Longest adaptive check interval, seconds
+ADAPTIVE_REFERENCE_VOLATILITY = 0.2  # Std of 1m % returns at which the interval equals signal_check_interval
+ADAPTIVE_PROXIMITY_WEIGHT = 0.75  # How much a move close to SPIKE_THRESHOLD shortens the interval (0-1)
+ALIGNED_CHECK_TIMEFRAME = '1m'  # Aligned mode checks just after each close of this candle (at most every signal_check_interval)
+ALIGNED_SETTLE_DELAY = 2.0  # Seconds after the candle close before checking, so exchanges have published the closed bar
+
 # Market Analysis Configuration
 PRICE_LOOKBACK_PERIODS = 3  # Number of periods to look back for spike detection (shorter lookback)
 SPIKE_THRESHOLD = 1.5  # Percentage change to consider as spike (more sensitive)
+ALIGN_FILL = 'ffill'  # Exchange candle gaps on the common grid: 'ffill' (flat bar at the last close) or 'mask' (NaN)
+TICK_FILTER_ENABLED = True  # Drop bad-tick candles before spike detection
+TICK_FILTER_WINDOW = 10  # Previous candles whose median/MAD a close is compared with
+TICK_FILTER_THRESHOLD = 5.0  # Scaled MADs from the median that make a close an outlier
+TICK_FILTER_MIN_DEVIATION = 1.0  # Closes within this % of the median are never outliers
+TICK_FILTER_MAX_CROSS_DEVIATION = 1.0  # Outliers within this % of the other exchanges' price are kept as real moves
+INDICATOR_EMA_PERIOD = 20  # Candles in the exponential moving average of closes
+INDICATOR_WINDOW = 20  # Candles in the rolling mean/std of closes and of returns (z-score)
+INDICATOR_ATR_PERIOD = 14  # Candles in the average true range
+INDICATOR_VWAP_WINDOW = 1440  # Candles in the rolling VWAP (a day of 1m candles); None for all candles seen
+SIMULTANEOUS_SPIKE_FACTOR = 0.8  # Simultaneous up/down spikes must average MIN_PRICE_CHANGE times this
+DIRECTIONAL_SPIKE_FACTOR = 1.2  # One-directional spikes must average MIN_PRICE_CHANGE times this
+
+# Exchange Configuration
+EXCHANGES = {  # Exchange name -> ccxt exchange id; clients are created on first use
+    'kucoin': 'kucoin',
+    'crypto_com': 'cryptocom'
+}
+EXCHANGE_SYMBOL_OVERRIDES = {}  # Exchange name -> {unified symbol: exchange symbol} for pairs listed under another name
+
+# Exchange Fetch Configuration
+CONCURRENT_FETCH = True  # Query all exchanges in parallel instead of one after another
+EXCHANGE_FETCH_TIMEOUT = 5  # Seconds to wait for a single exchange before skipping it
+MAX_FETCH_WORKERS = 4  # Thread pool size for concurrent exchange requests
+CANDLE_BUFFER_SIZE = 500  # Candles kept in memory per exchange/symbol/timeframe
+OHLCV_FETCH_LIMIT = 300  # Max candles requested per fetch_ohlcv call
+CANDLE_STORE_ENABLED = True  # Keep every closed candle on disk for backtesting
+CANDLE_STORE_DIR = 'candle_data'  # Directory of the on-disk candle history
+
+# Streaming Configuration
+STREAMING_ENABLED = False  # Drive spike detection from WebSocket trades (REST polling stays as fallback)
+STREAM_TIMEFRAME = '1m'  # Candle size built locally from streamed trades
+STREAM_STALE_AFTER = 30  # Seconds without a message before a stream is treated as down
+STREAM_SIGNAL_ON = 'close'  # Run spike detection on every candle 'close' or every 'trade'
+
+# Trade Bar Configuration
+TRADE_BAR_TIMEFRAMES = ['1s', '5s', '15s']  # Sub-minute timeframes built locally from raw trades
+TRADE_BAR_CAPACITY = 900  # Bars kept per timeframe (15 minutes of 1s bars)
+TRADE_FETCH_LIMIT = 1000  # Trades requested per fetch_trades call when not streaming
+
+# Order Book Configuration
+ORDER_BOOK_ENABLED = False  # Load order books and ignore spikes on exchanges with thin books (changes which signals trade)
+ORDER_BOOK_DEPTH = 20  # Price levels per side kept for each exchange
+ORDER_BOOK_DEPTH_PCT = 1.0  # Depth is measured within this % of the mid price
+ORDER_BOOK_MIN_DEPTH = 500  # Quote (USDT) needed on each side within ORDER_BOOK_DEPTH_PCT to trust a spike
+
+# Consolidated Book Configuration
+CONSOLIDATED_BOOK_ENABLED = False  # Attach the executable price across all venues to each signal (adds book and VVS pool reads per signal)
+POOL_BOOK_ENABLED = True  # Include the VVS pool's implied curve in the consolidated book
+POOL_FEE_PERCENT = 0.3  # VVS swap fee
+POOL_LEVEL_SIZE = 50  # Quote (USDC) per implied pool level
+POOL_MAX_LEVELS = 400  # Implied pool levels generated per side at most
+
+# Market Scanner Configuration
+SCAN_SYMBOLS = ['CRO/USDT']  # Pairs watched by MarketAnalyzer.scan_markets
+SCAN_TIMEOUT = 30  # Seconds to wait for a whole scan before skipping unfinished fetches
+SCAN_MAX_WORKERS = 8  # Thread pool size shared by all scan fetches
+
+# Exchange Rate Limit Configuration
+EXCHANGE_RATE_LIMITS = {}  # ccxt cost units per second per exchange, e.g. {'kucoin': 100}; defaults to ccxt's published limit
+RATE_LIMIT_BURST = 5  # Cost units an exchange may receive back-to-back after being idle
+RATE_LIMIT_MAX_RETRIES = 3  # Retries after an HTTP 429 before giving up
+RATE_LIMIT_BACKOFF = 1.0  # Seconds to pause an exchange after its first 429 (doubles per retry)
+
+# Exchange Health Configuration
+HEALTH_WINDOW = 20  # Recent requests used to compute an exchange's error rate
+HEALTH_MAX_ERROR_RATE = 0.5  # Error rate that trips the circuit breaker
+HEALTH_MIN_REQUESTS = 5  # Requests needed in the window before the breaker can trip
+HEALTH_MAX_LATENCY = 3.0  # Average latency (seconds) that trips the circuit breaker
+HEALTH_COOLDOWN = 60  # Seconds an unhealthy exchange is skipped before it is probed again
+HEALTH_MAX_COOLDOWN = 600  # Cooldown cap; it doubles after every failed probe
+HEALTH_PROBE_SUCCESSES = 3  # Successful probes in a row needed to trust an exchange again
+
+# Market Data Cache Configuration
+MARKET_CACHE_TTL = 5  # Seconds market data is served from cache without asking the exchange
+MARKET_CACHE_STALE_TTL = 25  # Extra seconds expired prices may be served while they refresh in the background
+
+# Backtest Configuration
+BACKTEST_INITIAL_USDC = 1000  # Starting USDC balance of a simulated wallet
+BACKTEST_FEE_RATE = 0.3  # Percent charged per swap (VVS Finance pool fee)
+BACKTEST_SLIPPAGE = 0.1  # Percent the fill price moves against each simulated swap
+
+# Parameter Sweep Configuration
+# simultaneous_factor is not swept: down magnitudes are compared signed, so it never changes a result
+SWEEP_SPACE = {  # Backtest parameter -> values tried by parameter_sweep.py
+    'spike_threshold': [1.0, 1.5, 2.0, 2.5],
+    'lookback_periods': [2, 3, 5, 10],
+    'min_price_change': [1.0, 1.5, 2.0, 3.0],
+    'directional_factor': [1.0, 1.2, 1.5],
+}
+SWEEP_WORKERS = None  # Worker processes for a sweep; None uses every core
+SWEEP_RANK_BY = 'pnl_pct'  # Backtest result column the sweep results are ranked by (highest first)
+SWEEP_PROGRESS_FILE = 'sweep_progress.jsonl'  # Finished runs, one per line; an interrupted sweep resumes from here
+SWEEP_RESULTS_FILE = 'sweep_results.csv'  # Ranked results table
 
 # Safety Configuration
 MAX_DAILY_TRADES = 10
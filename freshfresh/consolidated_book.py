@@ -0,0 +1,201 @@
+import heapq
+import threading
+import time
+
+
+class PoolCurve:
+    """Order-book view of a constant-product (x * y = k) pool such as VVS.
+
+    The pool has no resting orders, but buying or selling it in chunks of
+    `level_quote` worth of base gives a ladder of levels whose price is the
+    average price of each successive chunk after the swap fee. Levels are
+    generated on demand, so only as many are computed as a merge consumes.
+    """
+
+    def __init__(self, fee_percent, level_quote, max_levels):
+        self.fee_percent = fee_percent
+        self.level_quote = level_quote
+        self.max_levels = max_levels
+        self.base_reserve = None
+        self.quote_reserve = None
+        self.synced = False
+        self.updated_at = None
+        self.version = 0
+
+    def set_reserves(self, base_reserve, quote_reserve):
+        """Update the pool reserves (in token units, not wei)"""
+        self.updated_at = time.time()
+        if (base_reserve, quote_reserve) == (self.base_reserve, self.quote_reserve):
+            return
+        self.base_reserve = float(base_reserve)
+        self.quote_reserve = float(quote_reserve)
+        self.synced = self.base_reserve > 0 and self.quote_reserve > 0
+        self.version += 1
+
+    def mid(self):
+        return self.quote_reserve / self.base_reserve if self.synced else None
+
+    def levels(self, is_bid, count=None):
+        """Implied (price, size) levels, best first, generated lazily"""
+        if not self.synced:
+            return
+        x, y = self.base_reserve, self.quote_reserve
+        after_fee = 1 - self.fee_percent / 100
+        step = self.level_quote / (y / x)
+        count = self.max_levels if count is None else min(count, self.max_levels)
+
+        if is_bid:
+            # Quote received for selling b base into the pool
+            def quote_for(b):
+                return y * b * after_fee / (x + b * after_fee)
+        else:
+            # Quote paid for buying b base out of the pool
+            def quote_for(b):
+                return y * b / ((x - b) * after_fee)
+
+        previous = 0.0
+        for i in range(1, count + 1):
+            if not is_bid and i * step >= x:
+                return
+            total = quote_for(i * step)
+            yield abs(total - previous) / step, step
+            previous = total
+
+
+class _Ladder:
+    """One side of the merged book: the levels merged so far and the heap that yields the rest"""
+
+    __slots__ = ('is_bid', 'versions', 'levels', 'heap')
+
+    def __init__(self, is_bid, sources, versions):
+        self.is_bid = is_bid
+        self.versions = versions
+        self.levels = []  # [(price, size, source name), ...] best first
+        self.heap = []
+        for order, (name, source) in enumerate(sources.items()):
+            if not source.synced:
+                continue
+            levels = iter(source.levels(is_bid))
+            for price, size in levels:
+                self.heap.append((-price if is_bid else price, order, price, size, name, levels))
+                break
+        heapq.heapify(self.heap)
+
+    def extend(self):
+        """Merge the next best level; returns False when every source is exhausted"""
+        if not self.heap:
+            return False
+        _, order, price, size, name, levels = self.heap[0]
+        self.levels.append((price, size, name))
+        for next_price, next_size in levels:
+            heapq.heapreplace(
+                self.heap, (-next_price if self.is_bid else next_price, order, next_price, next_size, name, levels)
+            )
+            break
+        else:
+            heapq.heappop(self.heap)
+        return True
+
+
+class ConsolidatedBook:
+    """One best-bid/best-ask ladder over several venues' books.
+
+    Sources are OrderBooks and PoolCurves (anything with `version`,
+    `synced` and a best-first `levels(is_bid)`). Each side is a k-way merge
+    of the sources' ladders through a heap. The merge is lazy: levels are
+    only merged as deep as a query walks, and the merged prefix is reused
+    until any source's version changes, so repeated queries on an
+    unchanged market cost a walk over a few cached levels. Prices of all
+    sources are treated as the same quote currency (USDT on the exchanges,
+    USDC on the pool).
+    """
+
+    def __init__(self):
+        self.sources = {}
+        self._ladders = {}
+        self._lock = threading.Lock()
+
+    def add_source(self, name, source):
+        with self._lock:
+            if self.sources.get(name) is not source:
+                self.sources[name] = source
+                self._ladders.clear()
+
+    def _ladder(self, is_bid):
+        versions = tuple((source.version, source.synced) for source in self.sources.values())
+        ladder = self._ladders.get(is_bid)
+        if ladder is None or ladder.versions != versions:
+            ladder = _Ladder(is_bid, self.sources, versions)
+            self._ladders[is_bid] = ladder
+        return ladder
+
+    def levels(self, is_bid, count):
+        """The best `count` merged levels [(price, size, source name), ...]"""
+        with self._lock:
+            ladder = self._ladder(is_bid)
+            while len(ladder.levels) < count and ladder.extend():
+                pass
+            return ladder.levels[:count]
+
+    def best(self, is_bid):
+        levels = self.levels(is_bid, 1)
+        return levels[0][0] if levels else None
+
+    def executable_price(self, quote_amount, side='buy'):
+        """Average price of buying (walking the asks) or selling (the bids) `quote_amount` of quote now.
+
+        Returns a dict with the average, best and worst price used, the base
+        amount, how much of the quote amount the book could fill and how
+        much of it went to each source.
+        """
+        is_bid = side == 'sell'
+        with self._lock:
+            ladder = self._ladder(is_bid)
+            remaining = quote_amount
+            base_amount = 0.0
+            venues = {}
+            index = 0
+            worst_price = None
+            while remaining > 1e-12:
+                if index == len(ladder.levels) and not ladder.extend():
+                    break
+                price, size, name = ladder.levels[index]
+                quote = min(price * size, remaining)
+                base_amount += quote / price
+                venues[name] = venues.get(name, 0.0) + quote
+                remaining -= quote
+                worst_price = price
+                index += 1
+            best_price = ladder.levels[0][0] if ladder.levels else None
+
+        filled = quote_amount - remaining
+        average_price = filled / base_amount if base_amount else None
+        return {
+            'side': side,
+            'amount': quote_amount,
+            'filled': filled,
+            'complete': remaining <= 1e-12,
+            'base_amount': base_amount,
+            'average_price': average_price,
+            'best_price': best_price,
+            'worst_price': worst_price,
+            'slippage_pct': abs(average_price - best_price) / best_price * 100 if average_price else None,
+            'levels': index,
+            'venues': venues,
+        }
+
+    def snapshot(self):
+        """Best merged prices and where they rest"""
+        bids, asks = self.levels(True, 1), self.levels(False, 1)
+        best_bid = bids[0] if bids else (None, None, None)
+        best_ask = asks[0] if asks else (None, None, None)
+        mid = (best_bid[0] + best_ask[0]) / 2 if bids and asks else None
+        return {
+            'best_bid': best_bid[0],
+            'best_bid_venue': best_bid[2],
+            'best_ask': best_ask[0],
+            'best_ask_venue': best_ask[2],
+            'mid': mid,
+            'spread_pct': (best_ask[0] - best_bid[0]) / mid * 100 if mid else None,
+            'sources': {name: source.synced for name, source in self.sources.items()},
+        }
@@ -0,0 +1,71 @@
+from eth_abi import encode, decode
+from web3 import Web3
+
+
+def _argument_types(signature):
+    """'transfer(address,uint256)' -> ['address', 'uint256']"""
+    arguments = signature[signature.index('(') + 1:-1]
+    return arguments.split(',') if arguments else []
+
+
+class ContractRegistry:
+    """Contract objects, checksummed addresses and call data, each built once.
+
+    Building a web3 contract object parses its ABI, checksumming hashes the
+    address and every contract function call re-encodes its arguments
+    through the ABI. The trader polls the same few contracts with the same
+    arguments over and over, so this keeps one contract object per
+    (address, ABI), one checksummed form per address, the 4-byte selector
+    per function signature and the full call data of calls whose arguments
+    never change (e.g. balanceOf(our wallet)).
+    """
+
+    def __init__(self, w3):
+        self.w3 = w3
+        self._addresses = {}
+        self._contracts = {}
+        self._selectors = {}
+        self._call_data = {}
+
+    def address(self, address):
+        """Checksummed form of an address"""
+        checksum = self._addresses.get(address)
+        if checksum is None:
+            checksum = self._addresses[address] = Web3.to_checksum_address(address)
+        return checksum
+
+    def contract(self, address, abi):
+        """Contract object for address and abi (the same list object each time)"""
+        key = (address, id(abi))
+        contract = self._contracts.get(key)
+        if contract is None:
+            contract = self._contracts[key] = self.w3.eth.contract(address=self.address(address), abi=abi)
+        return contract
+
+    def selector(self, signature):
+        """4-byte function selector of e.g. 'balanceOf(address)'"""
+        selector = self._selectors.get(signature)
+        if selector is None:
+            selector = self._selectors[signature] = bytes(Web3.keccak(text=signature)[:4])
+        return selector
+
+    def encode_call(self, signature, *args):
+        """ABI-encoded call data for a function signature and arguments"""
+        return self.selector(signature) + encode(_argument_types(signature), list(args))
+
+    def call_data(self, signature, *args):
+        """encode_call, cached for calls made repeatedly with the same arguments"""
+        key = (signature, args)
+        try:
+            data = self._call_data.get(key)
+        except TypeError:  # Unhashable arguments such as a path list
+            return self.encode_call(signature, *args)
+        if data is None:
+            data = self._call_data[key] = self.encode_call(signature, *args)
+        return data
+
+    def call(self, address, data, output_types=('uint256',)):
+        """eth_call with prepared call data; returns the decoded outputs (a single value if there is one)"""
+        result = self.w3.eth.call({'to': self.address(address), 'data': data})
+        values = decode(list(output_types), bytes(result))
+        return values[0] if len(values) == 1 else values
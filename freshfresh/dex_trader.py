@@ -1,9 +1,11 @@
 import json
-from web3 import Web3
+from concurrent.futures import wait as wait_for
 from wallet_manager import WalletManager
+from allowance_manager import AllowanceManager
 from config import (
-    CRO_TOKEN_ADDRESS, USDC_TOKEN_ADDRESS, VVS_ROUTER_ADDRESS,
-    CRONOS_CHAIN_ID, DEFAULT_SLIPPAGE, MAX_TRADE_AMOUNT
+    CRO_TOKEN_ADDRESS, USDC_TOKEN_ADDRESS, VVS_ROUTER_ADDRESS, VVS_FACTORY_ADDRESS,
+    CRONOS_CHAIN_ID, DEFAULT_SLIPPAGE, MAX_TRADE_AMOUNT, ALLOWANCE_POLICY, STANDING_APPROVAL_TRADES,
+    STANDING_APPROVAL_CEILING_USDC, STANDING_APPROVAL_CEILING_CRO, RECEIPT_TIMEOUT
 )
 
 class DEXTrader:
@@ -11,6 +13,18 @@ class DEXTrader:
         self.wallet = wallet_manager
         self.w3 = wallet_manager.w3
         
+        # Contract objects, checksummed addresses and call data, built once
+        self.contracts = wallet_manager.contracts
+        self._swap_paths = {}
+        
+        # Router allowances tracked from our own approvals and swaps
+        self.allowances = AllowanceManager(
+            ALLOWANCE_POLICY, STANDING_APPROVAL_TRADES, {
+                USDC_TOKEN_ADDRESS: int(STANDING_APPROVAL_CEILING_USDC * 10**6),  # USDC has 6 decimals
+                CRO_TOKEN_ADDRESS: int(STANDING_APPROVAL_CEILING_CRO * 10**18)  # CRO has 18 decimals
+            }
+        )
+        
         # VVS Router ABI (simplified for swap functions)
         self.router_abi = [
             {
@@ -82,17 +96,58 @@ class DEXTrader:
             }
         ]
         
-        self.router_contract = self.w3.eth.contract(
-            address=Web3.to_checksum_address(VVS_ROUTER_ADDRESS),
-            abi=self.router_abi
-        )
+        # VVS factory/pair ABIs (reserves for the pool's implied order book)
+        self.factory_abi = [
+            {
+                "inputs": [
+                    {"internalType": "address", "name": "tokenA", "type": "address"},
+                    {"internalType": "address", "name": "tokenB", "type": "address"}
+                ],
+                "name": "getPair",
+                "outputs": [{"internalType": "address", "name": "pair", "type": "address"}],
+                "stateMutability": "view",
+                "type": "function"
+            }
+        ]
+        self.pair_abi = [
+            {
+                "inputs": [],
+                "name": "getReserves",
+                "outputs": [
+                    {"internalType": "uint112", "name": "_reserve0", "type": "uint112"},
+                    {"internalType": "uint112", "name": "_reserve1", "type": "uint112"},
+                    {"internalType": "uint32", "name": "_blockTimestampLast", "type": "uint32"}
+                ],
+                "stateMutability": "view",
+                "type": "function"
+            },
+            {
+                "inputs": [],
+                "name": "token0",
+                "outputs": [{"internalType": "address", "name": "", "type": "address"}],
+                "stateMutability": "view",
+                "type": "function"
+            }
+        ]
+        
+        self.router_contract = self.contracts.contract(VVS_ROUTER_ADDRESS, self.router_abi)
+        
+        # CRO/USDC pair contract and its token order, looked up on first use
+        self.pair_contract = None
+        self.pair_cro_is_token0 = None
     
     def get_token_contract(self, token_address):
         """Get ERC20 token contract"""
-        return self.w3.eth.contract(
-            address=Web3.to_checksum_address(token_address),
-            abi=self.erc20_abi
-        )
+        return self.contracts.contract(token_address, self.erc20_abi)
+    
+    def get_swap_path(self, token_in, token_out):
+        """Checksummed [token_in, token_out] swap path"""
+        path = self._swap_paths.get((token_in, token_out))
+        if path is None:
+            path = self._swap_paths[(token_in, token_out)] = [
+                self.contracts.address(token_in), self.contracts.address(token_out)
+            ]
+        return path
     
     def get_amounts_out(self, amount_in, path):
         """Get expected output amounts for a swap"""
@@ -104,52 +159,121 @@ class DEXTrader:
         except Exception as e:
             raise Exception(f"Failed to get amounts out: {str(e)}")
     
-    def approve_token(self, token_address, spender_address, amount):
-        """Approve token spending"""
+    def prepare_swap(self, token_in, amount_in_wei, path, read_allowance=True):
+        """Every read a swap needs (quote, allowance, block time, nonce, gas price) in one round trip.
+        
+        The allowance is only read when read_allowance is set (it is not
+        tracked yet); otherwise reads['allowance'] is None.
+        """
+        batch = self.wallet.read_batch().call(
+            'amounts', VVS_ROUTER_ADDRESS, 'getAmountsOut(uint256,address[])', amount_in_wei, path,
+            outputs=('uint256[]',)
+        )
+        if read_allowance:
+            batch.call(
+                'allowance', token_in, 'allowance(address,address)', self.wallet.address,
+                self.contracts.address(VVS_ROUTER_ADDRESS)
+            )
+        reads = batch.block_timestamp(
+            'timestamp'
+        ).rpc(
+            'nonce', 'eth_getTransactionCount', [self.wallet.address, 'pending']
+        ).rpc(
+            'gas_price', 'eth_gasPrice'
+        ).execute()
+        reads.setdefault('allowance', None)
+        return reads
+    
+    def get_balances(self):
+        """CRO (wrapped), USDC and native CRO balances in one round trip"""
+        reads = self.wallet.read_batch().call(
+            'cro', CRO_TOKEN_ADDRESS, 'balanceOf(address)', self.wallet.address
+        ).call(
+            'usdc', USDC_TOKEN_ADDRESS, 'balanceOf(address)', self.wallet.address
+        ).native_balance(
+            'native', self.wallet.address
+        ).execute()
+        return {
+            'cro': reads['cro'] / 10**18,  # CRO has 18 decimals
+            'usdc': reads['usdc'] / 10**6,  # USDC has 6 decimals
+            'native': reads['native'] / 10**18
+        }
+    
+    def get_pool_reserves(self):
+        """CRO and USDC reserves of the VVS CRO/USDC pool, in token units"""
+        if self.pair_contract is None:
+            factory = self.contracts.contract(VVS_FACTORY_ADDRESS, self.factory_abi)
+            pair_address = factory.functions.getPair(*self.get_swap_path(CRO_TOKEN_ADDRESS, USDC_TOKEN_ADDRESS)).call()
+            pair_contract = self.contracts.contract(pair_address, self.pair_abi)
+            self.pair_cro_is_token0 = pair_contract.functions.token0().call().lower() == CRO_TOKEN_ADDRESS.lower()
+            self.pair_contract = pair_contract
+        
+        reserve0, reserve1, _ = self.pair_contract.functions.getReserves().call()
+        cro_reserve, usdc_reserve = (reserve0, reserve1) if self.pair_cro_is_token0 else (reserve1, reserve0)
+        return cro_reserve / 10**18, usdc_reserve / 10**6  # CRO has 18 decimals, USDC 6
+    
+    def approve_token(self, token_address, spender_address, amount, current_allowance=None, gas_price=None,
+                      wait=True):
+        """Approve token spending (current_allowance/gas_price skip their RPC reads when already known).
+        
+        The allowance comes from the allowance manager when it is tracked and
+        is read from the chain otherwise. A top-up approves what the
+        allowance policy asks for, which may cover several trades.
+        With wait=False the approval is only broadcast: a transaction sent
+        after it with the next nonce is mined after it, so a swap can follow
+        immediately.
+        """
         token_contract = self.get_token_contract(token_address)
+        spender_address = self.contracts.address(spender_address)
         
         # Check current allowance
-        current_allowance = token_contract.functions.allowance(
-            self.wallet.address, spender_address
-        ).call()
+        if current_allowance is None:
+            current_allowance = self.allowances.get(token_address, spender_address)
+        if current_allowance is None:
+            current_allowance = self.contracts.call(
+                token_address,
+                self.contracts.call_data('allowance(address,address)', self.wallet.address, spender_address)
+            )
+            self.allowances.set(token_address, spender_address, current_allowance)
         
         if current_allowance >= amount:
             return True  # Already approved
         
-        # Retry logic for nonce conflicts
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                # Get fresh nonce for each attempt
-                nonce = self.wallet.get_nonce()
-                
-                # Create approval transaction
-                transaction = token_contract.functions.approve(
-                    spender_address, amount
-                ).build_transaction({
-                    'from': self.wallet.address,
-                    'gas': 100000,
-                    'gasPrice': self.wallet.get_gas_price(),
-                    'nonce': nonce,
-                    'chainId': CRONOS_CHAIN_ID
-                })
-                
-                # Sign and send transaction
-                signed_txn = self.wallet.sign_transaction(transaction)
-                tx_hash = self.wallet.send_transaction(signed_txn)
-                
-                # Wait for transaction confirmation
-                receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-                return receipt.status == 1
-                
-            except Exception as e:
-                if "invalid nonce" in str(e).lower() and attempt < max_retries - 1:
-                    # Wait a bit and try again with fresh nonce
-                    import time
-                    time.sleep(2)
-                    continue
-                else:
-                    raise e
+        approve_amount = self.allowances.approval_amount(token_address, amount)
+        
+        if gas_price is None:
+            gas_price = self.wallet.get_gas_price()
+        
+        # Nonce comes from the wallet's local nonce manager; a rejected
+        # nonce is resynced and retried immediately
+        _, receipt = self.wallet.send_with_nonce(
+            lambda nonce: token_contract.functions.approve(
+                spender_address, approve_amount
+            ).build_transaction({
+                'from': self.wallet.address,
+                'gas': 100000,
+                'gasPrice': gas_price,
+                'nonce': nonce,
+                'chainId': CRONOS_CHAIN_ID
+            })
+        )
+        self.allowances.approved(token_address, spender_address, approve_amount)
+        self._invalidate_allowance_on_failure(receipt, token_address, spender_address)
+        
+        if not wait:
+            return True
+        
+        # Wait for transaction confirmation; one still pending after
+        # RECEIPT_TIMEOUT is not confirmed yet
+        done, _ = wait_for([receipt], timeout=RECEIPT_TIMEOUT)
+        return bool(done) and receipt.result()['success']
+    
+    def _invalidate_allowance_on_failure(self, receipt, token_address, spender_address):
+        """Drop the tracked allowance if the transaction changing it does not confirm"""
+        def settled(future):
+            if not future.result()['success']:
+                self.allowances.invalidate(token_address, spender_address)
+        receipt.add_done_callback(settled)
     
     def swap_tokens(self, token_in, token_out, amount_in, slippage_percent=DEFAULT_SLIPPAGE):
         """Execute token swap"""
@@ -161,72 +285,70 @@ class DEXTrader:
                 amount_in_wei = int(amount_in * 10**18)  # CRO has 18 decimals
             
             # Define swap path
-            path = [Web3.to_checksum_address(token_in), Web3.to_checksum_address(token_out)]
+            path = self.get_swap_path(token_in, token_out)
+            
+            # Quote, block time, nonce and gas price in one round trip; the
+            # allowance too unless the allowance manager already tracks it
+            allowance = self.allowances.get(token_in, VVS_ROUTER_ADDRESS)
+            reads = self.prepare_swap(token_in, amount_in_wei, path, read_allowance=allowance is None)
+            if allowance is None:
+                allowance = reads['allowance']
+                self.allowances.set(token_in, VVS_ROUTER_ADDRESS, allowance)
+            # The chain's pending count tells the nonce manager if it drifted
+            self.wallet.nonces.observe(reads['nonce'])
             
             # Get expected output amount
-            amounts_out = self.get_amounts_out(amount_in_wei, path)
-            expected_amount_out = amounts_out[-1]
+            expected_amount_out = reads['amounts'][-1]
             
             # Calculate minimum amount out with slippage
             min_amount_out = int(expected_amount_out * (100 - slippage_percent) / 100)
             
-            # Approve token spending
-            if not self.approve_token(token_in, VVS_ROUTER_ADDRESS, amount_in_wei):
+            # Approve token spending; the swap goes out right behind the approval
+            if not self.approve_token(
+                token_in, VVS_ROUTER_ADDRESS, amount_in_wei, allowance, reads['gas_price'], wait=False
+            ):
                 raise Exception("Failed to approve token spending")
             
             # Set deadline (10 minutes from now)
-            deadline = int(self.w3.eth.get_block('latest').timestamp) + 600
+            deadline = reads['timestamp'] + 600
+            
+            # Create, sign and send the swap transaction
+            tx_hash, receipt = self.wallet.send_with_nonce(
+                lambda nonce: self.router_contract.functions.swapExactTokensForTokens(
+                    amount_in_wei,
+                    min_amount_out,
+                    path,
+                    self.wallet.address,
+                    deadline
+                ).build_transaction({
+                    'from': self.wallet.address,
+                    'gas': 300000,
+                    'gasPrice': reads['gas_price'],
+                    'nonce': nonce,
+                    'chainId': CRONOS_CHAIN_ID
+                })
+            )
+            self.allowances.spent(token_in, VVS_ROUTER_ADDRESS, amount_in_wei)
+            self._invalidate_allowance_on_failure(receipt, token_in, VVS_ROUTER_ADDRESS)
             
-            # Retry logic for nonce conflicts
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    # Get fresh nonce for each attempt
-                    nonce = self.wallet.get_nonce()
-                    
-                    # Create swap transaction
-                    transaction = self.router_contract.functions.swapExactTokensForTokens(
-                        amount_in_wei,
-                        min_amount_out,
-                        path,
-                        self.wallet.address,
-                        deadline
-                    ).build_transaction({
-                        'from': self.wallet.address,
-                        'gas': 300000,
-                        'gasPrice': self.wallet.get_gas_price(),
-                        'nonce': nonce,
-                        'chainId': CRONOS_CHAIN_ID
-                    })
-                    
-                    # Sign and send transaction
-                    signed_txn = self.wallet.sign_transaction(transaction)
-                    tx_hash = self.wallet.send_transaction(signed_txn)
-                    
-                    # Convert output amounts based on token decimals
-                    if token_out.lower() == USDC_TOKEN_ADDRESS.lower():
-                        expected_amount_out_formatted = expected_amount_out / 10**6  # USDC has 6 decimals
-                        min_amount_out_formatted = min_amount_out / 10**6
-                    else:
-                        expected_amount_out_formatted = expected_amount_out / 10**18  # CRO has 18 decimals
-                        min_amount_out_formatted = min_amount_out / 10**18
-                    
-                    return {
-                        'success': True,
-                        'tx_hash': tx_hash,
-                        'amount_in': amount_in,
-                        'expected_amount_out': expected_amount_out_formatted,
-                        'min_amount_out': min_amount_out_formatted
-                    }
-                    
-                except Exception as e:
-                    if "invalid nonce" in str(e).lower() and attempt < max_retries - 1:
-                        # Wait a bit and try again with fresh nonce
-                        import time
-                        time.sleep(2)
-                        continue
-                    else:
-                        raise e
+            # Convert output amounts based on token decimals
+            if token_out.lower() == USDC_TOKEN_ADDRESS.lower():
+                expected_amount_out_formatted = expected_amount_out / 10**6  # USDC has 6 decimals
+                min_amount_out_formatted = min_amount_out / 10**6
+            else:
+                expected_amount_out_formatted = expected_amount_out / 10**18  # CRO has 18 decimals
+                min_amount_out_formatted = min_amount_out / 10**18
+            
+            # 'success' means broadcast; 'receipt' resolves with the on-chain outcome
+            return {
+                'success': True,
+                'pending': True,
+                'tx_hash': tx_hash,
+                'receipt': receipt,
+                'amount_in': amount_in,
+                'expected_amount_out': expected_amount_out_formatted,
+                'min_amount_out': min_amount_out_formatted
+            }
             
         except Exception as e:
             return {
@@ -244,8 +366,9 @@ class DEXTrader:
     
     def get_token_balance(self, token_address):
         """Get token balance"""
-        token_contract = self.get_token_contract(token_address)
-        balance = token_contract.functions.balanceOf(self.wallet.address).call()
+        balance = self.contracts.call(
+            token_address, self.contracts.call_data('balanceOf(address)', self.wallet.address)
+        )
         
         # USDC has 6 decimals, CRO has 18 decimals
         if token_address.lower() == USDC_TOKEN_ADDRESS.lower():
@@ -118,6 +118,11 @@ class DiscordBotInterface:
                 value=status['recent_activity'],
                 inline=False
             )
+            embed.add_field(
+                name="Exchange Health",
+                value=status['exchange_health'],
+                inline=False
+            )
             embed.add_field(
                 name="Current Configuration",
                 value=f"• Trade Amount: ${status['trade_amount']} USDC\n• Slippage: {status['slippage']}%\n• Min Price Change: {status['min_price_change']}%",
@@ -326,6 +331,11 @@ class DiscordBotInterface:
             value=status['recent_activity'],
             inline=False
         )
+        embed.add_field(
+            name="Exchange Health",
+            value=status['exchange_health'],
+            inline=False
+        )
         embed.add_field(
             name="Current Configuration",
             value=f"• Trade Amount: ${status['trade_amount']} USDC\n• Slippage: {status['slippage']}%\n• Min Price Change: {status['min_price_change']}%",
@@ -517,6 +527,11 @@ class MainMenuView(discord.ui.View):
             value=status['recent_activity'],
             inline=False
         )
+        embed.add_field(
+            name="Exchange Health",
+            value=status['exchange_health'],
+            inline=False
+        )
         embed.add_field(
             name="Current Configuration",
             value=f"• Trade Amount: ${status['trade_amount']} USDC\n• Slippage: {status['slippage']}%\n• Min Price Change: {status['min_price_change']}%",
@@ -698,7 +713,7 @@ class TradeMenuView(discord.ui.View):
             
             if result['success']:
                 embed = discord.Embed(
-                    title="✅ Buy Order Executed",
+                    title="✅ Buy Order Submitted",
                     color=0x00ff00
                 )
                 embed.add_field(name="Transaction Hash", value=result['tx_hash'], inline=False)
@@ -722,7 +737,7 @@ class TradeMenuView(discord.ui.View):
             
             if result['success']:
                 embed = discord.Embed(
-                    title="✅ Sell Order Executed",
+                    title="✅ Sell Order Submitted",
                     color=0x00ff00
                 )
                 embed.add_field(name="Transaction Hash", value=result['tx_hash'], inline=False)
@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import deque
+
+
+class ExchangeUnavailable(Exception):
+    """Raised instead of calling an exchange whose circuit breaker is open"""
+
+
+class ExchangeHealth:
+    """Latency/error statistics and circuit breaker for one exchange.
+
+    The breaker is 'closed' while the exchange is healthy. It opens when
+    the error rate over the last `window` requests or the smoothed latency
+    gets too high, and no requests are let through for `cooldown` seconds.
+    After that it is 'half_open': one probe request at a time is allowed,
+    and `probe_successes` successes in a row close it again. A failed
+    probe reopens it with twice the cooldown, up to `max_cooldown`.
+    """
+
+    def __init__(self, window=20, max_error_rate=0.5, min_requests=5, max_latency=3.0,
+                 cooldown=60, max_cooldown=600, probe_successes=3):
+        self.max_error_rate = max_error_rate
+        self.min_requests = min_requests
+        self.max_latency = max_latency
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.probe_successes = probe_successes
+
+        self.outcomes = deque(maxlen=window)  # True for success
+        self.latency = None  # Exponentially weighted average, seconds
+        self.requests = 0
+        self.failures = 0
+        self.last_error = None
+
+        self.state = 'closed'
+        self.cooldown = cooldown
+        self.opened_at = None
+        self._probe_in_flight = False
+        self._probe_streak = 0
+        self._lock = threading.Lock()
+
+    @property
+    def error_rate(self):
+        if not self.outcomes:
+            return 0.0
+        return 1 - sum(self.outcomes) / len(self.outcomes)
+
+    @property
+    def score(self):
+        """0-100 health score from error rate and latency; 0 while the breaker is open"""
+        if self.state == 'open':
+            return 0
+        # Full marks for latency up to a third of max_latency
+        latency_factor = 1.0 if not self.latency else min(1.0, self.max_latency / 3 / self.latency)
+        return round(100 * (1 - self.error_rate) * latency_factor)
+
+    def is_open(self):
+        """True while the exchange is cooling down and must not be queried"""
+        with self._lock:
+            return self.state == 'open' and time.monotonic() - self.opened_at < self.cooldown
+
+    def allow_request(self):
+        """Check (and, when half open, claim) permission to send a request"""
+        with self._lock:
+            if self.state == 'open':
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    return False
+                self.state = 'half_open'
+                self._probe_streak = 0
+            if self.state == 'half_open':
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def record_success(self, latency):
+        with self._lock:
+            self._record(True, latency)
+            if self.state == 'half_open':
+                self._probe_in_flight = False
+                self._probe_streak += 1
+                if self._probe_streak >= self.probe_successes:
+                    self.state = 'closed'
+                    self.cooldown = self.base_cooldown
+                    self.outcomes.clear()
+            elif self.latency > self.max_latency and len(self.outcomes) >= self.min_requests:
+                self._open()
+
+    def record_failure(self, latency, error):
+        with self._lock:
+            self._record(False, latency)
+            self.failures += 1
+            self.last_error = str(error)
+            if self.state == 'half_open':
+                self._probe_in_flight = False
+                self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+                self._open()
+            elif len(self.outcomes) >= self.min_requests and self.error_rate >= self.max_error_rate:
+                self._open()
+
+    def _record(self, success, latency):
+        self.requests += 1
+        self.outcomes.append(success)
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+
+    def _open(self):
+        self.state = 'open'
+        self.opened_at = time.monotonic()
+
+    def snapshot(self):
+        return {
+            'state': self.state,
+            'score': self.score,
+            'latency_ms': round(self.latency * 1000) if self.latency is not None else None,
+            'error_rate': round(self.error_rate, 3),
+            'requests': self.requests,
+            'failures': self.failures,
+            'last_error': self.last_error
+        }
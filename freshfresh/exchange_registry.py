@@ -0,0 +1,52 @@
+import threading
+from collections.abc import Mapping
+
+
+class ExchangeRegistry(Mapping):
+    """Exchanges declared in config, created on first use.
+
+    Behaves like a read-only dict of exchange name -> ccxt client, but ccxt
+    is only imported and a client only built (and on_create(name, client)
+    called, e.g. to load its markets) the first time that exchange is
+    looked up. Iterating over names, `in` and len() never create clients.
+    """
+
+    def __init__(self, exchange_ids, options=None, on_create=None):
+        self.exchange_ids = dict(exchange_ids)  # name -> ccxt exchange id
+        self.options = options or {}
+        self.on_create = on_create
+        self._clients = {}
+        self._locks = {name: threading.Lock() for name in self.exchange_ids}
+
+    def register(self, name, exchange_id):
+        """Declare another exchange; its client is created on first use"""
+        self.exchange_ids[name] = exchange_id
+        self._locks.setdefault(name, threading.Lock())
+
+    def is_created(self, name):
+        return name in self._clients
+
+    def __getitem__(self, name):
+        client = self._clients.get(name)
+        if client is not None:
+            return client
+        if name not in self.exchange_ids:
+            raise KeyError(name)
+
+        with self._locks[name]:
+            if name not in self._clients:
+                import ccxt
+                client = getattr(ccxt, self.exchange_ids[name])(dict(self.options))
+                if self.on_create:
+                    self.on_create(name, client)
+                self._clients[name] = client
+        return self._clients[name]
+
+    def __contains__(self, name):
+        return name in self.exchange_ids
+
+    def __iter__(self):
+        return iter(self.exchange_ids)
+
+    def __len__(self):
+        return len(self.exchange_ids)
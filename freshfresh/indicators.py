@@ -0,0 +1,196 @@
+import math
+from collections import deque
+
+
+class EMA:
+    """Exponential moving average, seeded with the first value"""
+
+    __slots__ = ('alpha', 'value')
+
+    def __init__(self, period):
+        self.alpha = 2 / (period + 1)
+        self.value = None
+
+    def update(self, x):
+        self.value = x if self.value is None else self.value + self.alpha * (x - self.value)
+        return self.value
+
+
+class RollingStats:
+    """Mean and standard deviation of the last `window` values.
+
+    Uses Welford's update extended to a sliding window: adding a value and
+    dropping the oldest adjusts the mean and sum of squared deviations
+    directly, so each update is O(1) and avoids the cancellation of a
+    running sum of squares.
+    """
+
+    __slots__ = ('window', 'values', 'mean', 'm2')
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, x):
+        if len(self.values) < self.window:
+            self.values.append(x)
+            delta = x - self.mean
+            self.mean += delta / len(self.values)
+            self.m2 += delta * (x - self.mean)
+        else:
+            oldest = self.values[0]
+            self.values.append(x)
+            old_mean = self.mean
+            self.mean += (x - oldest) / self.window
+            self.m2 += (x - oldest) * (x - self.mean + oldest - old_mean)
+        return self.mean
+
+    @property
+    def count(self):
+        return len(self.values)
+
+    @property
+    def std(self):
+        """Sample standard deviation; 0.0 until two values have been seen"""
+        if len(self.values) < 2:
+            return 0.0
+        return math.sqrt(max(self.m2, 0.0) / (len(self.values) - 1))
+
+
+class ReturnZScore:
+    """Z-score of each new % return against the previous `window` returns"""
+
+    __slots__ = ('stats', 'last_close', 'last_return', 'value')
+
+    def __init__(self, window):
+        self.stats = RollingStats(window)
+        self.last_close = None
+        self.last_return = None
+        self.value = None
+
+    def update(self, close):
+        if self.last_close:
+            change = (close - self.last_close) / self.last_close * 100
+            std = self.stats.std
+            self.value = (change - self.stats.mean) / std if std > 0 else None
+            self.last_return = change
+            self.stats.update(change)
+        self.last_close = close
+        return self.value
+
+
+class ATR:
+    """Average true range with Wilder's smoothing"""
+
+    __slots__ = ('period', 'count', 'last_close', 'value')
+
+    def __init__(self, period):
+        self.period = period
+        self.count = 0
+        self.last_close = None
+        self.value = None
+
+    def update(self, high, low, close):
+        if self.last_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - self.last_close), abs(low - self.last_close))
+        self.last_close = close
+
+        self.count += 1
+        if self.value is None:
+            self.value = true_range
+        elif self.count <= self.period:
+            # Simple average until a full period has been seen
+            self.value += (true_range - self.value) / self.count
+        else:
+            self.value += (true_range - self.value) / self.period
+        return self.value
+
+
+class VWAP:
+    """Volume-weighted average price of the last `window` candles (all candles if window is None)"""
+
+    __slots__ = ('window', 'candles', 'price_volume', 'volume', 'value')
+
+    def __init__(self, window=None):
+        self.window = window
+        self.candles = deque(maxlen=window) if window else None
+        self.price_volume = 0.0
+        self.volume = 0.0
+        self.value = None
+
+    def update(self, high, low, close, volume):
+        typical_price = (high + low + close) / 3
+        if self.candles is not None:
+            if len(self.candles) == self.window:
+                old_price_volume, old_volume = self.candles[0]
+                self.price_volume -= old_price_volume
+                self.volume -= old_volume
+            self.candles.append((typical_price * volume, volume))
+        self.price_volume += typical_price * volume
+        self.volume += volume
+        if self.volume > 0:
+            self.value = self.price_volume / self.volume
+        return self.value
+
+
+class IndicatorSet:
+    """The analyzer's indicators for one (exchange, symbol, timeframe) candle feed.
+
+    Fed closed candles in ccxt OHLCV format; candles not newer than the
+    last one seen are skipped, so the same closed candles can be offered
+    repeatedly and each is only counted once.
+    """
+
+    __slots__ = ('last_timestamp', 'ema', 'closes', 'zscore', 'atr', 'vwap')
+
+    def __init__(self, ema_period, window, atr_period, vwap_window=None):
+        self.last_timestamp = None
+        self.ema = EMA(ema_period)
+        self.closes = RollingStats(window)
+        self.zscore = ReturnZScore(window)
+        self.atr = ATR(atr_period)
+        self.vwap = VWAP(vwap_window)
+
+    def update(self, candle):
+        timestamp, _, high, low, close, volume = candle[:6]
+        if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            return False
+        self.last_timestamp = timestamp
+
+        self.ema.update(close)
+        self.closes.update(close)
+        self.zscore.update(close)
+        self.atr.update(high, low, close)
+        self.vwap.update(high, low, close, volume)
+        return True
+
+    def extend(self, candles):
+        """Feed closed candles, oldest first; returns how many were new.
+
+        Only the new tail is visited, so offering a whole candle buffer
+        costs as much as the candles added since the last call.
+        """
+        start = len(candles)
+        while start > 0 and (self.last_timestamp is None or candles[start - 1][0] > self.last_timestamp):
+            start -= 1
+        for candle in candles[start:]:
+            self.update(candle)
+        return len(candles) - start
+
+    def snapshot(self):
+        return {
+            'timestamp': self.last_timestamp,
+            'close': self.zscore.last_close,
+            'ema': self.ema.value,
+            'mean': self.closes.mean if self.closes.count else None,
+            'std': self.closes.std,
+            'return_mean': self.zscore.stats.mean if self.zscore.stats.count else None,
+            'return_std': self.zscore.stats.std,
+            'return_zscore': self.zscore.value,
+            'atr': self.atr.value,
+            'vwap': self.vwap.value,
+        }
@@ -1,44 +1,748 @@
-import ccxt
-import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
 import time
-from config import MIN_PRICE_CHANGE, PRICE_LOOKBACK_PERIODS, SPIKE_THRESHOLD
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from config import (
+    MIN_PRICE_CHANGE, PRICE_LOOKBACK_PERIODS, SPIKE_THRESHOLD,
+    SIMULTANEOUS_SPIKE_FACTOR, DIRECTIONAL_SPIKE_FACTOR, ALIGN_FILL,
+    CONCURRENT_FETCH, EXCHANGE_FETCH_TIMEOUT, MAX_FETCH_WORKERS,
+    CANDLE_BUFFER_SIZE, OHLCV_FETCH_LIMIT,
+    STREAM_TIMEFRAME, STREAM_STALE_AFTER, STREAM_SIGNAL_ON,
+    SCAN_TIMEOUT, SCAN_MAX_WORKERS,
+    EXCHANGE_RATE_LIMITS, RATE_LIMIT_BURST, RATE_LIMIT_MAX_RETRIES, RATE_LIMIT_BACKOFF,
+    HEALTH_WINDOW, HEALTH_MAX_ERROR_RATE, HEALTH_MIN_REQUESTS, HEALTH_MAX_LATENCY,
+    HEALTH_COOLDOWN, HEALTH_MAX_COOLDOWN, HEALTH_PROBE_SUCCESSES,
+    MARKET_CACHE_TTL, MARKET_CACHE_STALE_TTL,
+    EXCHANGES, EXCHANGE_SYMBOL_OVERRIDES,
+    CANDLE_STORE_ENABLED, CANDLE_STORE_DIR,
+    INDICATOR_EMA_PERIOD, INDICATOR_WINDOW, INDICATOR_ATR_PERIOD, INDICATOR_VWAP_WINDOW,
+    TRADE_BAR_TIMEFRAMES, TRADE_BAR_CAPACITY, TRADE_FETCH_LIMIT,
+    TICK_FILTER_ENABLED, TICK_FILTER_WINDOW, TICK_FILTER_THRESHOLD,
+    TICK_FILTER_MIN_DEVIATION, TICK_FILTER_MAX_CROSS_DEVIATION,
+    ORDER_BOOK_ENABLED, ORDER_BOOK_DEPTH, ORDER_BOOK_DEPTH_PCT, ORDER_BOOK_MIN_DEPTH,
+    CONSOLIDATED_BOOK_ENABLED, POOL_BOOK_ENABLED, POOL_FEE_PERCENT, POOL_LEVEL_SIZE, POOL_MAX_LEVELS,
+    DEFAULT_TRADE_AMOUNT
+)
+from rate_limiter import RateLimiter
+from exchange_health import ExchangeHealth, ExchangeUnavailable
+from market_cache import MarketDataCache
+from exchange_registry import ExchangeRegistry
+
+# ccxt, pandas and numpy (and the modules built on them) take most of a
+# second to import, so they are imported where first needed rather than
+# here - status checks and tests that never analyze the market skip them
 
 class MarketAnalyzer:
-    def __init__(self):
-        self.exchanges = {
-            'kucoin': ccxt.kucoin(),
-            'crypto_com': ccxt.cryptocom()
+    def __init__(self, concurrent_fetch=CONCURRENT_FETCH):
+        # Exchanges declared in config; each ccxt client is created and its
+        # markets loaded the first time the exchange is used.
+        # ccxt timeout is in milliseconds; it stops a hung request from
+        # holding a pool worker forever after we have stopped waiting on it.
+        # ccxt's throttle hook stays on so every HTTP request reports its
+        # endpoint's cost; self.rate_limiter takes the place of its throttle.
+        self.exchanges = ExchangeRegistry(
+            EXCHANGES,
+            options={
+                'timeout': int(EXCHANGE_FETCH_TIMEOUT * 1000),
+                'enableRateLimit': True
+            },
+            on_create=self._on_exchange_created
+        )
+        
+        # Every exchange request goes through one token bucket per exchange,
+        # added when the exchange's client is created
+        self.rate_limiter = RateLimiter(
+            {},
+            burst=RATE_LIMIT_BURST,
+            max_retries=RATE_LIMIT_MAX_RETRIES,
+            backoff=RATE_LIMIT_BACKOFF
+        )
+        
+        # Latency/error statistics and a circuit breaker per exchange, so a
+        # degraded venue is skipped instead of slowing down every check
+        self.exchange_health = {
+            exchange_name: ExchangeHealth(
+                window=HEALTH_WINDOW,
+                max_error_rate=HEALTH_MAX_ERROR_RATE,
+                min_requests=HEALTH_MIN_REQUESTS,
+                max_latency=HEALTH_MAX_LATENCY,
+                cooldown=HEALTH_COOLDOWN,
+                max_cooldown=HEALTH_MAX_COOLDOWN,
+                probe_successes=HEALTH_PROBE_SUCCESSES
+            )
+            for exchange_name in self.exchanges
         }
         
-    def get_price_data(self, symbol='CRO/USDT', timeframe='1m', limit=20):
-        """Get price data from multiple exchanges"""
-        price_data = {}
+        # Exchange-specific symbols for pairs an exchange lists under a
+        # different name than the unified one
+        self.symbol_overrides = EXCHANGE_SYMBOL_OVERRIDES
+        self._markets_lock = threading.Lock()
+        
+        # Concurrent fetch mode - one worker per exchange so a slow venue
+        # never delays the others
+        self.concurrent_fetch = concurrent_fetch
+        self.fetch_timeout = EXCHANGE_FETCH_TIMEOUT
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(MAX_FETCH_WORKERS, len(self.exchanges)),
+            thread_name_prefix='exchange-fetch'
+        )
+        self._scan_executor = ThreadPoolExecutor(max_workers=SCAN_MAX_WORKERS, thread_name_prefix='market-scan')
+        
+        # Candle history per (exchange, symbol, timeframe) - only candles
+        # newer than the last stored one are downloaded on each check
+        self.candle_buffers = {}
+        self._candle_buffers_lock = threading.Lock()
+        
+        # Every closed candle is also appended to the on-disk history
+        self.candle_store = None
+        
+        # Sub-minute bars built locally from raw trades, per (exchange, symbol)
+        self.trade_bars = {}
+        
+        # Top-of-book depth per (exchange, symbol)
+        self.order_books = {}
+        
+        # Exchange books and the VVS pool merged into one ladder per symbol.
+        # The pool's reserves are read through pool_source (a DEXTrader),
+        # set by the trading bot; without it only exchange books are merged.
+        self.consolidated_books = {}
+        self.pool_source = None
+        self.pool_curve = None
+        
+        # Drops bad prints between fetching candles and spike detection
+        self.tick_filter_enabled = TICK_FILTER_ENABLED
+        self.tick_filter = None
+        
+        # Incremental indicators per (exchange, symbol, timeframe), updated
+        # once per closed candle
+        self.indicators = {}
+        self._indicators_lock = threading.Lock()
+        # Newest closed candle already fed to the indicators and candle store,
+        # per (exchange, symbol, timeframe)
+        self._stored_until = {}
+        
+        # Shared by the signal checks and the chat UIs so that clicking
+        # around does not multiply exchange traffic
+        self.market_cache = MarketDataCache(MARKET_CACHE_TTL, MARKET_CACHE_STALE_TTL)
+        
+        # Streaming mode - WebSocket trades keep the candle buffers current
+        # and REST is only used for exchanges whose stream is not live
+        self.price_stream = None
+        self._stream_symbol = None
+        self._stream_on_signal = None
+        self._stream_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='stream-signal')
+        self._stream_check_pending = False
+        
+    def _on_exchange_created(self, exchange_name, exchange):
+        """Set up rate limiting and load markets for a newly created exchange client"""
+        import ccxt
+        self.rate_limiter.rate_limit_errors = (ccxt.RateLimitExceeded, ccxt.DDoSProtection)
+        # Bucket sized from the exchange's published limit (ccxt rateLimit is
+        # the delay in ms per cost unit) unless overridden in config. ccxt
+        # charges each HTTP request its endpoint's cost (e.g. 3 units for
+        # KuCoin candles) through throttle(), which the shared bucket replaces,
+        # so requests from all threads are spaced by their real cost.
+        self.rate_limiter.add_bucket(
+            exchange_name, EXCHANGE_RATE_LIMITS.get(exchange_name, 1000 / exchange.rateLimit), metered=True
+        )
+        exchange.throttle = lambda cost=None: self.rate_limiter.throttle(exchange_name, cost)
+        try:
+            self._call_exchange(exchange_name, exchange.load_markets)
+        except Exception as e:
+            # ccxt retries loading markets on the next request
+            print(f"Error loading markets for {exchange_name}: {str(e)}")
+    
+    def _exchange_symbol(self, exchange_name, symbol):
+        """Symbol an exchange lists a unified symbol under"""
+        return self.symbol_overrides.get(exchange_name, {}).get(symbol, symbol)
+    
+    def _call_exchange(self, exchange_name, func, *args, **kwargs):
+        """Call an exchange API method through its circuit breaker and rate limiter"""
+        health = self.exchange_health.get(exchange_name)
+        if health is None:
+            return self.rate_limiter.call(exchange_name, func, *args, **kwargs)
+        
+        if not health.allow_request():
+            raise ExchangeUnavailable(f"{exchange_name} is cooling down after repeated errors")
         
-        # Use different symbols for different exchanges
-        exchange_symbols = {
-            'kucoin': 'CRO/USDT',
-            'crypto_com': 'CRO/USDT'
+        def timed_call():
+            # ccxt waits on our rate limiter inside the call; that time is
+            # ours, not the exchange's, so it is left out of the latency
+            start = time.monotonic()
+            waited = self.rate_limiter.waited()
+            
+            def latency():
+                return time.monotonic() - start - (self.rate_limiter.waited() - waited)
+            
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                health.record_failure(latency(), e)
+                raise
+            health.record_success(latency())
+            return result
+        
+        return self.rate_limiter.call(exchange_name, timed_call)
+    
+    def get_exchange_health(self):
+        """Health score, breaker state and latency/error statistics per exchange"""
+        return {name: health.snapshot() for name, health in self.exchange_health.items()}
+    
+    def _available_exchanges(self):
+        """Names of the exchanges whose circuit breaker is not open"""
+        return [
+            name for name in self.exchanges
+            if name not in self.exchange_health or not self.exchange_health[name].is_open()
+        ]
+    
+    def _is_listed(self, exchange_name, exchange, symbol):
+        """True if the exchange lists the symbol (markets are loaded once)"""
+        with self._markets_lock:
+            if not exchange.markets:
+                self._call_exchange(exchange_name, exchange.load_markets)
+        return symbol in exchange.markets
+    
+    def _run_on_exchange(self, fetch_func, exchange_name, *args):
+        # Resolving the client on the worker means first-use client creation
+        # and market loading happen in parallel too
+        return fetch_func(exchange_name, self.exchanges[exchange_name], *args)
+    
+    def _fetch_from_exchanges(self, fetch_func, action):
+        """Run fetch_func(exchange_name, exchange) on every exchange.
+        
+        Returns a dict of exchange_name -> result for the exchanges that
+        answered. In concurrent mode all exchanges are queried at once and
+        any exchange that has not answered within fetch_timeout is skipped,
+        so a check takes about as long as the slowest healthy exchange.
+        Exchanges whose circuit breaker is open are not queried at all.
+        """
+        results = {}
+        
+        if not self.concurrent_fetch:
+            for exchange_name in self._available_exchanges():
+                try:
+                    results[exchange_name] = fetch_func(exchange_name, self.exchanges[exchange_name])
+                except Exception as e:
+                    print(f"Error fetching {action} from {exchange_name}: {str(e)}")
+            return results
+        
+        futures = {
+            self._executor.submit(self._run_on_exchange, fetch_func, exchange_name): exchange_name
+            for exchange_name in self._available_exchanges()
         }
+        done, not_done = wait(futures, timeout=self.fetch_timeout)
         
-        for exchange_name, exchange in self.exchanges.items():
+        for future in done:
+            exchange_name = futures[future]
             try:
-                # Try the exchange-specific symbol
-                exchange_symbol = exchange_symbols.get(exchange_name, symbol)
-                ohlcv = exchange.fetch_ohlcv(exchange_symbol, timeframe, limit=limit)
-                df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-                price_data[exchange_name] = df
-                time.sleep(0.1)  # Rate limiting
+                results[exchange_name] = future.result()
             except Exception as e:
-                print(f"Error fetching data from {exchange_name}: {str(e)}")
+                print(f"Error fetching {action} from {exchange_name}: {str(e)}")
+        
+        for future in not_done:
+            future.cancel()
+            print(f"Timed out fetching {action} from {futures[future]} after {self.fetch_timeout}s")
+        
+        return results
+    
+    def _get_candle_buffer(self, exchange_name, symbol, timeframe):
+        """Get (or create) the candle buffer for an exchange/symbol/timeframe"""
+        key = (exchange_name, symbol, timeframe)
+        with self._candle_buffers_lock:
+            if key not in self.candle_buffers:
+                from candle_buffer import CandleBuffer
+                self.candle_buffers[key] = CandleBuffer(CANDLE_BUFFER_SIZE)
+            return self.candle_buffers[key]
+    
+    def _update_candles(self, exchange_name, exchange, symbol, timeframe):
+        """Bring the candle buffer up to date and return it.
+        
+        An empty buffer, or one whose newest candle is older than the whole
+        buffer, is refilled with the most recent candles. Otherwise only the
+        candles since the newest stored one are fetched, page by page, so a
+        gap left by downtime is backfilled.
+        """
+        buffer = self._get_candle_buffer(exchange_name, symbol, timeframe)
+        page_limit = min(OHLCV_FETCH_LIMIT, buffer.capacity)
+        timeframe_ms = exchange.parse_timeframe(timeframe) * 1000
+        last_timestamp = buffer.last_timestamp
+        
+        # A live stream already keeps this buffer current
+        if (self._is_streaming(exchange_name, symbol, timeframe) and last_timestamp is not None
+                and exchange.milliseconds() - last_timestamp <= 2 * timeframe_ms):
+            return buffer
+        
+        if last_timestamp is None or exchange.milliseconds() - last_timestamp > buffer.capacity * timeframe_ms:
+            buffer.clear()
+            buffer.extend(self._call_exchange(
+                exchange_name, exchange.fetch_ohlcv, symbol, timeframe, limit=page_limit
+            ))
+            self._store_closed_candles(exchange_name, symbol, timeframe, buffer)
+            return buffer
+        
+        # The newest stored candle is refetched too, since it may have still
+        # been forming when we last saw it
+        while True:
+            ohlcv = self._call_exchange(
+                exchange_name, exchange.fetch_ohlcv, symbol, timeframe, since=last_timestamp, limit=page_limit
+            )
+            buffer.extend(ohlcv)
+            if len(ohlcv) < page_limit or buffer.last_timestamp == last_timestamp:
+                break
+            last_timestamp = buffer.last_timestamp
+        
+        self._store_closed_candles(exchange_name, symbol, timeframe, buffer)
+        return buffer
+    
+    def _get_trade_bar_builder(self, exchange_name, symbol):
+        """Get (or create) the trade bar builder for an exchange/symbol"""
+        key = (exchange_name, symbol)
+        with self._candle_buffers_lock:
+            if key not in self.trade_bars:
+                from trade_bars import TradeBarBuilder
+                self.trade_bars[key] = TradeBarBuilder(TRADE_BAR_TIMEFRAMES, TRADE_BAR_CAPACITY)
+            return self.trade_bars[key]
+    
+    def _update_trade_bars(self, exchange_name, exchange, symbol):
+        """Feed the trades since the last one seen into the symbol's trade bars.
+        
+        While the price stream is live for the symbol its trades already
+        keep the bars current, so nothing is fetched.
+        """
+        builder = self._get_trade_bar_builder(exchange_name, symbol)
+        if self._is_streaming(exchange_name, symbol, STREAM_TIMEFRAME):
+            return builder
+        
+        trades = self._call_exchange(
+            exchange_name, exchange.fetch_trades, symbol, since=builder.last_trade_timestamp, limit=TRADE_FETCH_LIMIT
+        )
+        builder.add_ccxt_trades(trades)
+        return builder
+    
+    def _get_trade_bars(self, exchange_name, exchange, symbol, timeframe):
+        """Up-to-date trade bar buffer for a sub-minute timeframe, refreshed at most once per cache TTL"""
+        builder = self.market_cache.get(
+            (exchange_name, symbol, 'trades'),
+            lambda: self._update_trade_bars(exchange_name, exchange, symbol),
+            allow_stale=False
+        )
+        return builder.buffers[timeframe]
+    
+    def _get_book(self, exchange_name, symbol):
+        """Get (or create) the order book for an exchange/symbol"""
+        key = (exchange_name, symbol)
+        with self._candle_buffers_lock:
+            if key not in self.order_books:
+                from order_book import OrderBook
+                self.order_books[key] = OrderBook(ORDER_BOOK_DEPTH)
+            return self.order_books[key]
+    
+    def _update_order_book(self, exchange_name, exchange, symbol):
+        """Return the order book, reloading it from a REST snapshot unless the stream keeps it current.
+        
+        A streamed book is also reloaded once the price has moved far enough
+        that its top-N snapshot no longer covers ORDER_BOOK_DEPTH_PCT.
+        """
+        book = self._get_book(exchange_name, symbol)
+        if book.synced and book.covers(ORDER_BOOK_DEPTH_PCT) and self._is_streaming(exchange_name, symbol, STREAM_TIMEFRAME):
+            return book
+        
+        snapshot = self._call_exchange(exchange_name, exchange.fetch_order_book, symbol, ORDER_BOOK_DEPTH)
+        book.apply_snapshot(snapshot['bids'], snapshot['asks'], snapshot.get('nonce'))
+        return book
+    
+    def _load_order_books(self, symbol):
+        """Current order book per exchange, loaded at most once per cache TTL"""
+        def fetch(exchange_name, exchange):
+            exchange_symbol = self._exchange_symbol(exchange_name, symbol)
+            return self.market_cache.get(
+                (exchange_name, exchange_symbol, 'book'),
+                lambda: self._update_order_book(exchange_name, exchange, exchange_symbol)
+            )
+        
+        return self._fetch_from_exchanges(fetch, 'order book')
+    
+    def get_order_book_metrics(self, symbol='CRO/USDT'):
+        """Spread, imbalance and depth within ORDER_BOOK_DEPTH_PCT of the mid, per exchange"""
+        return {
+            exchange_name: book.snapshot(ORDER_BOOK_DEPTH_PCT)
+            for exchange_name, book in self._load_order_books(symbol).items()
+        }
+    
+    def set_pool_source(self, pool_source):
+        """Read the VVS pool's reserves through pool_source.get_pool_reserves() (a DEXTrader)"""
+        self.pool_source = pool_source
+    
+    def _update_pool_curve(self):
+        if self.pool_curve is None:
+            from consolidated_book import PoolCurve
+            self.pool_curve = PoolCurve(POOL_FEE_PERCENT, POOL_LEVEL_SIZE, POOL_MAX_LEVELS)
+        self.pool_curve.set_reserves(*self.pool_source.get_pool_reserves())
+        return self.pool_curve
+    
+    def get_consolidated_book(self, symbol='CRO/USDT'):
+        """Exchange order books and the VVS pool curve merged into one ConsolidatedBook.
+        
+        Sources are refreshed through the market cache; the merged ladder
+        itself is only rebuilt, lazily, for sources that changed.
+        """
+        with self._candle_buffers_lock:
+            if symbol not in self.consolidated_books:
+                from consolidated_book import ConsolidatedBook
+                self.consolidated_books[symbol] = ConsolidatedBook()
+            book = self.consolidated_books[symbol]
+        
+        for exchange_name, exchange_book in self._load_order_books(symbol).items():
+            book.add_source(exchange_name, exchange_book)
+        
+        if POOL_BOOK_ENABLED and self.pool_source is not None:
+            try:
+                book.add_source('vvs', self.market_cache.get(('vvs', 'CRO/USDC', 'pool'), self._update_pool_curve))
+            except Exception as e:
+                print(f"Error loading VVS pool reserves: {str(e)}")
+        return book
+    
+    def get_executable_price(self, usdc_amount, side='buy', symbol='CRO/USDT'):
+        """Average price of buying or selling usdc_amount worth across every venue right now"""
+        return self.get_consolidated_book(symbol).executable_price(usdc_amount, side)
+    
+    def _drop_thin_book_spikes(self, symbol, spikes):
+        """Drop spikes from exchanges whose book is too thin for the move to be trusted.
+        
+        A wick on a book with less than ORDER_BOOK_MIN_DEPTH quote resting
+        within ORDER_BOOK_DEPTH_PCT of the mid on either side is more likely
+        a thin-book print than a real move. Exchanges whose book could not
+        be loaded keep their spikes. Returns (spikes, book metrics).
+        """
+        books = self.get_order_book_metrics(symbol)
+        kept = {}
+        for exchange_name, spike in spikes.items():
+            book = books.get(exchange_name)
+            if book is not None and min(book['bid_depth'], book['ask_depth']) < ORDER_BOOK_MIN_DEPTH:
                 continue
-                
-        return price_data
+            kept[exchange_name] = spike
+        return kept, books
+    
+    def get_candle_store(self):
+        """The on-disk candle history, or None if CANDLE_STORE_ENABLED is off"""
+        if self.candle_store is None and CANDLE_STORE_ENABLED:
+            with self._candle_buffers_lock:
+                if self.candle_store is None:
+                    from candle_store import CandleStore
+                    self.candle_store = CandleStore(CANDLE_STORE_DIR)
+        return self.candle_store
+    
+    def _store_closed_candles(self, exchange_name, symbol, timeframe, buffer):
+        """Feed the buffer's closed candles (all but the newest) not fed before to the indicators and candle store"""
+        key = (exchange_name, symbol, timeframe)
+        closed = buffer.to_array(after=self._stored_until.get(key))[:-1]
+        if not len(closed):
+            return
+        self._stored_until[key] = int(closed[-1, 0])
+        closed = closed.tolist()
+        self._update_indicators(exchange_name, symbol, timeframe, closed)
+        store = self.get_candle_store()
+        if store is None:
+            return
+        try:
+            store.append(exchange_name, symbol, timeframe, closed)
+        except Exception as e:
+            print(f"Error storing candles for {exchange_name} {symbol}: {str(e)}")
+    
+    def _update_indicators(self, exchange_name, symbol, timeframe, closed):
+        """Advance the feed's indicators by the closed candles they have not seen yet"""
+        key = (exchange_name, symbol, timeframe)
+        with self._indicators_lock:
+            indicators = self.indicators.get(key)
+            if indicators is None:
+                from indicators import IndicatorSet
+                indicators = self.indicators[key] = IndicatorSet(
+                    INDICATOR_EMA_PERIOD, INDICATOR_WINDOW, INDICATOR_ATR_PERIOD, INDICATOR_VWAP_WINDOW
+                )
+            indicators.extend(closed)
+    
+    def get_indicators(self, symbol='CRO/USDT', timeframe='1m'):
+        """Latest indicator values per exchange for symbol"""
+        with self._indicators_lock:
+            return {
+                exchange_name: indicators.snapshot()
+                for (exchange_name, exchange_symbol, indicator_timeframe), indicators in self.indicators.items()
+                if exchange_symbol == self._exchange_symbol(exchange_name, symbol) and indicator_timeframe == timeframe
+            }
+    
+    def get_market_activity(self, symbol='CRO/USDT', timeframe='1m'):
+        """Recent volatility and how close the market is to a spike, from data already loaded.
+        
+        'volatility' is the highest std of % returns across exchanges (None
+        until the indicators have two returns) and 'spike_proximity' the
+        largest move within the lookback as a fraction of SPIKE_THRESHOLD.
+        Makes no exchange requests.
+        """
+        import numpy as np
+        from spike_detector import stack_closes, find_spikes
+        
+        volatility = None
+        for snapshot in self.get_indicators(symbol, timeframe).values():
+            if snapshot['return_mean'] is not None and snapshot['return_std'] > 0:
+                volatility = max(volatility or 0.0, snapshot['return_std'])
+        
+        with self._candle_buffers_lock:
+            buffers = [
+                buffer for (exchange_name, buffer_symbol, buffer_timeframe), buffer in self.candle_buffers.items()
+                if buffer_symbol == self._exchange_symbol(exchange_name, symbol) and buffer_timeframe == timeframe
+            ]
+        series = [buffer.to_array(PRICE_LOOKBACK_PERIODS + 1)[:, 4] for buffer in buffers]
+        spike_proximity = 0.0
+        if series:
+            _, _, magnitude = find_spikes(stack_closes(series, PRICE_LOOKBACK_PERIODS), SPIKE_THRESHOLD)
+            magnitude = magnitude[~np.isnan(magnitude)]
+            if len(magnitude):
+                spike_proximity = float(np.abs(magnitude).max()) / SPIKE_THRESHOLD
+        
+        return {'volatility': volatility, 'spike_proximity': spike_proximity}
+    
+    def _get_candles(self, exchange_name, exchange, symbol, timeframe):
+        """Up-to-date candle buffer, refreshed at most once per cache TTL.
+        
+        Signals need current candles, so stale entries are never served here.
+        """
+        return self.market_cache.get(
+            (exchange_name, symbol, timeframe),
+            lambda: self._update_candles(exchange_name, exchange, symbol, timeframe),
+            allow_stale=False
+        )
     
-    def detect_spikes(self, price_data):
-        """Detect simultaneous up/down spikes across exchanges"""
+    def get_tick_filter(self):
+        """The bad-tick filter, or None if it is turned off (TICK_FILTER_ENABLED / tick_filter_enabled)"""
+        if not self.tick_filter_enabled:
+            return None
+        if self.tick_filter is None:
+            with self._candle_buffers_lock:
+                if self.tick_filter is None:
+                    from tick_filter import TickFilter
+                    self.tick_filter = TickFilter(
+                        TICK_FILTER_WINDOW, TICK_FILTER_THRESHOLD,
+                        TICK_FILTER_MIN_DEVIATION, TICK_FILTER_MAX_CROSS_DEVIATION
+                    )
+        return self.tick_filter
+    
+    def get_tick_filter_stats(self):
+        """Closed candles checked and rejected as bad ticks, per exchange"""
+        return self.tick_filter.get_stats() if self.tick_filter is not None else {}
+    
+    def get_cache_stats(self):
+        """Hit/miss counters of the shared market data cache"""
+        return self.market_cache.get_stats()
+    
+    def _is_streaming(self, exchange_name, symbol, timeframe):
+        return (self.price_stream is not None
+                and timeframe == STREAM_TIMEFRAME
+                and symbol == self._exchange_symbol(exchange_name, self._stream_symbol)
+                and self.price_stream.is_live(exchange_name, STREAM_STALE_AFTER))
+    
+    def start_streaming(self, on_signal, symbol='CRO/USDT', urls=None):
+        """Start streaming mode.
+        
+        Trades from the exchanges' WebSocket feeds are built into candles
+        locally and the market is analyzed on every candle close (or every
+        trade if STREAM_SIGNAL_ON is 'trade'). on_signal(signal, message) is
+        called from a background thread for each signal found. `urls` maps
+        exchange names to WebSocket URLs to use instead of the exchanges,
+        e.g. a local stand-in server.
+        """
+        if self.price_stream is not None:
+            return False
+        
+        import ccxt
+        from price_stream import PriceStream, TRADE_FEEDS
+        
+        urls = urls or {}
+        feeds = {
+            exchange_name: TRADE_FEEDS[exchange_name](
+                self._exchange_symbol(exchange_name, symbol), url=urls.get(exchange_name),
+                book_depth=ORDER_BOOK_DEPTH if ORDER_BOOK_ENABLED else None
+            )
+            for exchange_name in self.exchanges
+            if exchange_name in TRADE_FEEDS
+        }
+        
+        self._stream_symbol = symbol
+        self._stream_on_signal = on_signal
+        self.price_stream = PriceStream(
+            feeds,
+            ccxt.Exchange.parse_timeframe(STREAM_TIMEFRAME) * 1000,
+            on_candle=self._on_stream_candle,
+            on_candle_close=self._on_stream_candle_close,
+            on_trades=self._on_stream_trades,
+            on_book=self._on_stream_book if ORDER_BOOK_ENABLED else None
+        )
+        self.price_stream.start()
+        return True
+    
+    def stop_streaming(self):
+        """Stop streaming mode and fall back to REST polling"""
+        if self.price_stream is None:
+            return False
+        
+        self.price_stream.stop()
+        self.price_stream = None
+        return True
+    
+    def _on_stream_candle(self, exchange_name, candle):
+        """Write the in-progress streamed candle into the candle buffer"""
+        symbol = self._exchange_symbol(exchange_name, self._stream_symbol)
+        self._get_candle_buffer(exchange_name, symbol, STREAM_TIMEFRAME).extend([candle])
+        if STREAM_SIGNAL_ON == 'trade':
+            self._queue_stream_check()
+    
+    def _on_stream_trades(self, exchange_name, trades):
+        symbol = self._exchange_symbol(exchange_name, self._stream_symbol)
+        self._get_trade_bar_builder(exchange_name, symbol).add_trades(*zip(*trades))
+    
+    def _on_stream_book(self, exchange_name, kind, bids, asks, sequence, first_sequence):
+        book = self._get_book(exchange_name, self._exchange_symbol(exchange_name, self._stream_symbol))
+        if kind == 'snapshot':
+            book.apply_snapshot(bids, asks, sequence)
+        else:
+            book.apply_diff(bids, asks, sequence, first_sequence)
+    
+    def _on_stream_candle_close(self, exchange_name, candle):
+        symbol = self._exchange_symbol(exchange_name, self._stream_symbol)
+        self._update_indicators(exchange_name, symbol, STREAM_TIMEFRAME, [candle])
+        store = self.get_candle_store()
+        if store is not None:
+            try:
+                store.append(exchange_name, symbol, STREAM_TIMEFRAME, [candle])
+            except Exception as e:
+                print(f"Error storing candles for {exchange_name} {symbol}: {str(e)}")
+        if STREAM_SIGNAL_ON == 'close':
+            self._queue_stream_check()
+    
+    def _queue_stream_check(self):
+        """Analyze the market off the stream thread, one check at a time"""
+        if self._stream_check_pending:
+            return
+        self._stream_check_pending = True
+        self._stream_executor.submit(self._run_stream_check)
+    
+    def _run_stream_check(self):
+        self._stream_check_pending = False
+        signal, message = self.analyze_market_signal(self._stream_symbol)
+        if signal and self._stream_on_signal:
+            try:
+                self._stream_on_signal(signal, message)
+            except Exception as e:
+                print(f"Error handling streamed signal: {str(e)}")
+    
+    def get_price_data(self, symbol='CRO/USDT', timeframe='1m', limit=20):
+        """Get price data from multiple exchanges.
+        
+        Sub-minute timeframes (TRADE_BAR_TIMEFRAMES) are served from bars
+        built locally from the exchanges' trades.
+        """
+        def fetch(exchange_name, exchange):
+            # Try the exchange-specific symbol
+            exchange_symbol = self._exchange_symbol(exchange_name, symbol)
+            if timeframe in TRADE_BAR_TIMEFRAMES:
+                return self._get_trade_bars(exchange_name, exchange, exchange_symbol, timeframe).to_frame(limit)
+            return self._get_candles(exchange_name, exchange, exchange_symbol, timeframe).to_frame(limit)
+        
+        return self._fetch_from_exchanges(fetch, 'data')
+    
+    def detect_spikes(self, price_data, scope=None):
+        """Detect simultaneous up/down spikes across exchanges.
+        
+        Exchanges' candles are first aligned on a common timestamp grid, so
+        every exchange's lookback window covers the same bars, and bad ticks
+        are dropped (see tick_filter). All aligned closes are then stacked
+        into one array and their returns, largest move and its direction are
+        found in a single vectorized pass (see spike_detector.find_spikes).
+        `scope` (e.g. symbol and timeframe) keeps the bad-tick metrics from
+        counting the same candle twice.
+        """
+        return self._detect_spikes_keyed(self._align_candles(price_data, scope))
+    
+    def _candle_arrays(self, frames):
+        """Candle DataFrames as ccxt-style OHLCV arrays with ms timestamps"""
+        import numpy as np
+        from candle_buffer import OHLCV_COLUMNS
+        
+        candles = {}
+        for key, df in frames.items():
+            array = np.empty((len(df), len(OHLCV_COLUMNS)))
+            array[:, 0] = df['timestamp'].to_numpy('datetime64[ms]').astype(np.int64)
+            for column, name in enumerate(OHLCV_COLUMNS[1:], 1):
+                # Frames without volume or a full OHLC still carry their closes
+                array[:, column] = df[name] if name in df else (0.0 if name == 'volume' else df['close'])
+            candles[key] = array
+        return candles
+    
+    def _align_candles(self, frames, scope=None):
+        """Align a dict of key -> candle DataFrame on the keys' common timestamp grid.
+        
+        Returns key -> (aligned OHLCV array, number of real candles).
+        """
+        from candle_alignment import align_candles
+        
+        aligned = align_candles(self._candle_arrays(frames), fill=ALIGN_FILL)
+        tick_filter = self.get_tick_filter()
+        if tick_filter is not None:
+            tick_filter.filter(aligned, ALIGN_FILL, scope)
+        return {
+            key: (bars, int(aligned['present'][key].sum()))
+            for key, bars in aligned['candles'].items()
+        }
+    
+    def get_consolidated_price_data(self, symbol='CRO/USDT', timeframe='1m', limit=20):
+        """One volume-weighted candle series for symbol across all exchanges"""
+        import numpy as np
+        import pandas as pd
+        from candle_alignment import align_candles, consolidate
+        from candle_buffer import OHLCV_COLUMNS
+        
+        price_data = self.get_price_data(symbol, timeframe, limit)
+        aligned = align_candles(self._candle_arrays(price_data), fill=ALIGN_FILL)
+        tick_filter = self.get_tick_filter()
+        if tick_filter is not None:
+            tick_filter.filter(aligned, ALIGN_FILL, (symbol, timeframe))
+        consolidated = consolidate(aligned, fill=ALIGN_FILL)[-limit:]
+        df = pd.DataFrame(consolidated, columns=OHLCV_COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'].astype(np.int64), unit='ms')
+        return df
+    
+    def _detect_spikes_keyed(self, candles):
+        """Vectorized spike detection over a dict of key -> (aligned OHLCV array, real candle count)"""
+        import numpy as np
+        import pandas as pd
+        from spike_detector import stack_closes, find_spikes
+        
+        keys = [key for key, (_, count) in candles.items() if count >= PRICE_LOOKBACK_PERIODS]
+        if not keys:
+            return {}
+        
+        arrays = [candles[key][0] for key in keys]
+        closes = stack_closes([bars[:, 4] for bars in arrays], PRICE_LOOKBACK_PERIODS)
+        is_spike, spike_index, magnitude = find_spikes(closes, SPIKE_THRESHOLD)
+        
+        spikes = {}
+        for row in np.flatnonzero(is_spike):
+            bars = arrays[row]
+            # Column in the stacked window -> row on the aligned grid
+            position = len(bars) - (PRICE_LOOKBACK_PERIODS + 1) + spike_index[row]
+            spikes[keys[row]] = {
+                'direction': 'up' if magnitude[row] > 0 else 'down',
+                'magnitude': magnitude[row],
+                'timestamp': pd.Timestamp(int(bars[position, 0]), unit='ms'),
+                'price': closes[row, spike_index[row]]
+            }
+        
+        return spikes
+    
+    def detect_spikes_pandas(self, price_data):
+        """Per-exchange pandas implementation of detect_spikes.
+        
+        Kept as the reference implementation for benchmark.py.
+        """
         spikes = {}
         
         for exchange_name, df in price_data.items():
@@ -67,96 +771,178 @@ class MarketAnalyzer:
         
         return spikes
     
-    def analyze_market_signal(self, symbol='CRO/USDT'):
+    def analyze_market_signal(self, symbol='CRO/USDT', timeframe='1m'):
         """Analyze market for trading signals"""
         try:
             # Get price data from multiple exchanges
-            price_data = self.get_price_data(symbol)
+            price_data = self.get_price_data(symbol, timeframe)
             
             if not price_data:
                 return None, "No price data available"
             
             # Detect spikes
-            spikes = self.detect_spikes(price_data)
-            
-            if not spikes:
-                return None, "No significant spikes detected"
-            
-            # Analyze spike patterns
-            up_spikes = [s for s in spikes.values() if s['direction'] == 'up']
-            down_spikes = [s for s in spikes.values() if s['direction'] == 'down']
+            spikes = self.detect_spikes(price_data, scope=(symbol, timeframe))
             
-            # Check for simultaneous up/down spikes (more aggressive detection)
-            if len(up_spikes) >= 1 and len(down_spikes) >= 1:
-                # Calculate average magnitudes
-                avg_up_magnitude = np.mean([s['magnitude'] for s in up_spikes])
-                avg_down_magnitude = np.mean([s['magnitude'] for s in down_spikes])
-                
-                # Check if magnitudes are significant (lowered threshold for more aggressive trading)
-                if avg_up_magnitude >= MIN_PRICE_CHANGE * 0.8 and avg_down_magnitude >= MIN_PRICE_CHANGE * 0.8:
-                    signal = {
-                        'type': 'simultaneous_spikes',
-                        'up_spikes': up_spikes,
-                        'down_spikes': down_spikes,
-                        'avg_up_magnitude': avg_up_magnitude,
-                        'avg_down_magnitude': avg_down_magnitude,
-                        'timestamp': datetime.now(),
-                        'exchanges': list(spikes.keys())
-                    }
-                    return signal, f"Simultaneous up/down spikes detected (Up: {avg_up_magnitude:.2f}%, Down: {avg_down_magnitude:.2f}%)"
-            
-            # Check for strong unidirectional movement (more aggressive detection)
-            elif len(up_spikes) >= 1:  # Lowered from 2 to 1 for more sensitivity
-                avg_magnitude = np.mean([s['magnitude'] for s in up_spikes])
-                if avg_magnitude >= MIN_PRICE_CHANGE * 1.2:  # Lowered threshold for more aggressive trading
-                    signal = {
-                        'type': 'strong_upward',
-                        'spikes': up_spikes,
-                        'avg_magnitude': avg_magnitude,
-                        'timestamp': datetime.now(),
-                        'exchanges': list(spikes.keys())
-                    }
-                    return signal, f"Strong upward movement detected ({avg_magnitude:.2f}%)"
-            
-            elif len(down_spikes) >= 1:  # Lowered from 2 to 1 for more sensitivity
-                avg_magnitude = np.mean([s['magnitude'] for s in down_spikes])
-                if avg_magnitude >= MIN_PRICE_CHANGE * 1.2:  # Lowered threshold for more aggressive trading
-                    signal = {
-                        'type': 'strong_downward',
-                        'spikes': down_spikes,
-                        'avg_magnitude': avg_magnitude,
-                        'timestamp': datetime.now(),
-                        'exchanges': list(spikes.keys())
-                    }
-                    return signal, f"Strong downward movement detected ({avg_magnitude:.2f}%)"
+            books = None
+            if spikes and ORDER_BOOK_ENABLED:
+                spikes, books = self._drop_thin_book_spikes(symbol, spikes)
+                if not spikes:
+                    return None, "Spikes ignored: order books too thin"
             
-            return None, "No significant trading signals"
+            signal, message = self.evaluate_spikes(spikes)
+            if signal:
+                signal['indicators'] = self.get_indicators(symbol)
+                if books is not None:
+                    signal['order_book'] = books
+                if CONSOLIDATED_BOOK_ENABLED:
+                    side = 'sell' if signal['type'] == 'strong_downward' else 'buy'
+                    try:
+                        signal['execution'] = self.get_executable_price(DEFAULT_TRADE_AMOUNT, side, symbol)
+                    except Exception as e:
+                        print(f"Error pricing signal across venues: {str(e)}")
+            return signal, message
             
         except Exception as e:
             return None, f"Error analyzing market: {str(e)}"
     
-    def get_current_price(self, symbol='CRO/USDT'):
-        """Get current price from multiple exchanges"""
-        prices = {}
+    def evaluate_spikes(self, spikes):
+        """Turn the spikes found for one symbol into a trading signal"""
+        if not spikes:
+            return None, "No significant spikes detected"
+        
+        import numpy as np
+        
+        # Analyze spike patterns
+        up_spikes = [s for s in spikes.values() if s['direction'] == 'up']
+        down_spikes = [s for s in spikes.values() if s['direction'] == 'down']
+        
+        # Check for simultaneous up/down spikes (more aggressive detection)
+        if len(up_spikes) >= 1 and len(down_spikes) >= 1:
+            # Calculate average magnitudes
+            avg_up_magnitude = np.mean([s['magnitude'] for s in up_spikes])
+            avg_down_magnitude = np.mean([s['magnitude'] for s in down_spikes])
+            
+            # Check if magnitudes are significant (lowered threshold for more aggressive trading)
+            if avg_up_magnitude >= MIN_PRICE_CHANGE * SIMULTANEOUS_SPIKE_FACTOR and avg_down_magnitude >= MIN_PRICE_CHANGE * SIMULTANEOUS_SPIKE_FACTOR:
+                signal = {
+                    'type': 'simultaneous_spikes',
+                    'up_spikes': up_spikes,
+                    'down_spikes': down_spikes,
+                    'avg_up_magnitude': avg_up_magnitude,
+                    'avg_down_magnitude': avg_down_magnitude,
+                    'timestamp': datetime.now(),
+                    'exchanges': list(spikes.keys())
+                }
+                return signal, f"Simultaneous up/down spikes detected (Up: {avg_up_magnitude:.2f}%, Down: {avg_down_magnitude:.2f}%)"
+        
+        # Check for strong unidirectional movement (more aggressive detection)
+        elif len(up_spikes) >= 1:  # Lowered from 2 to 1 for more sensitivity
+            avg_magnitude = np.mean([s['magnitude'] for s in up_spikes])
+            if avg_magnitude >= MIN_PRICE_CHANGE * DIRECTIONAL_SPIKE_FACTOR:  # Lowered threshold for more aggressive trading
+                signal = {
+                    'type': 'strong_upward',
+                    'spikes': up_spikes,
+                    'avg_magnitude': avg_magnitude,
+                    'timestamp': datetime.now(),
+                    'exchanges': list(spikes.keys())
+                }
+                return signal, f"Strong upward movement detected ({avg_magnitude:.2f}%)"
+        
+        elif len(down_spikes) >= 1:  # Lowered from 2 to 1 for more sensitivity
+            avg_magnitude = np.mean([s['magnitude'] for s in down_spikes])
+            if avg_magnitude >= MIN_PRICE_CHANGE * DIRECTIONAL_SPIKE_FACTOR:  # Lowered threshold for more aggressive trading
+                signal = {
+                    'type': 'strong_downward',
+                    'spikes': down_spikes,
+                    'avg_magnitude': avg_magnitude,
+                    'timestamp': datetime.now(),
+                    'exchanges': list(spikes.keys())
+                }
+                return signal, f"Strong downward movement detected ({avg_magnitude:.2f}%)"
+        
+        return None, "No significant trading signals"
+    
+    def scan_markets(self, symbols, timeframe='1m', limit=20):
+        """Scan many symbols at once and return their signals, strongest first.
+        
+        Candles for every (symbol, exchange) pair are fetched on a shared
+        pool through the same exchange clients and candle buffers as
+        get_price_data, so repeat scans only download new candles. Symbols
+        an exchange does not list are skipped for that exchange. Spike
+        detection runs once over all pairs. Returns a list of
+        (symbol, signal, message) for the symbols with a signal.
+        """
+        def fetch(exchange_name, exchange, symbol):
+            exchange_symbol = self._exchange_symbol(exchange_name, symbol)
+            if not self._is_listed(exchange_name, exchange, exchange_symbol):
+                return None
+            return self._get_candles(exchange_name, exchange, exchange_symbol, timeframe).to_frame(limit)
         
-        # Use different symbols for different exchanges
-        exchange_symbols = {
-            'kucoin': 'CRO/USDT',
-            'crypto_com': 'CRO/USDT'
+        futures = {
+            self._scan_executor.submit(self._run_on_exchange, fetch, exchange_name, symbol): (symbol, exchange_name)
+            for symbol in symbols
+            for exchange_name in self._available_exchanges()
         }
+        done, not_done = wait(futures, timeout=SCAN_TIMEOUT)
         
-        for exchange_name, exchange in self.exchanges.items():
+        price_data = {}
+        for future in done:
+            symbol, exchange_name = futures[future]
             try:
-                # Try the exchange-specific symbol
-                exchange_symbol = exchange_symbols.get(exchange_name, symbol)
-                ticker = exchange.fetch_ticker(exchange_symbol)
-                prices[exchange_name] = {
+                df = future.result()
+                if df is not None:
+                    price_data[(symbol, exchange_name)] = df
+            except ExchangeUnavailable:
+                continue
+            except Exception as e:
+                print(f"Error scanning {symbol} on {exchange_name}: {str(e)}")
+        
+        for future in not_done:
+            future.cancel()
+        if not_done:
+            print(f"Market scan timed out after {SCAN_TIMEOUT}s, {len(not_done)} fetches skipped")
+        
+        # Align each symbol's exchanges on their own grid, then detect all at once
+        frames_by_symbol = {}
+        for (symbol, exchange_name), df in price_data.items():
+            frames_by_symbol.setdefault(symbol, {})[(symbol, exchange_name)] = df
+        aligned = {}
+        for frames in frames_by_symbol.values():
+            aligned.update(self._align_candles(frames, scope=timeframe))
+        
+        spikes_by_symbol = {}
+        for (symbol, exchange_name), spike in self._detect_spikes_keyed(aligned).items():
+            spikes_by_symbol.setdefault(symbol, {})[exchange_name] = spike
+        
+        results = []
+        for symbol, spikes in spikes_by_symbol.items():
+            signal, message = self.evaluate_spikes(spikes)
+            if signal:
+                signal['symbol'] = symbol
+                results.append((symbol, signal, message))
+        
+        results.sort(key=lambda result: self._signal_strength(result[1]), reverse=True)
+        return results
+    
+    def _signal_strength(self, signal):
+        """Size of the move behind a signal, used to rank scan results"""
+        if signal['type'] == 'simultaneous_spikes':
+            return max(abs(signal['avg_up_magnitude']), abs(signal['avg_down_magnitude']))
+        return abs(signal['avg_magnitude'])
+    
+    def get_current_price(self, symbol='CRO/USDT'):
+        """Get current price from multiple exchanges"""
+        def fetch(exchange_name, exchange):
+            # Try the exchange-specific symbol
+            exchange_symbol = self._exchange_symbol(exchange_name, symbol)
+            
+            def load():
+                ticker = self._call_exchange(exchange_name, exchange.fetch_ticker, exchange_symbol)
+                return {
                     'price': ticker['last'],
                     'timestamp': datetime.now()
                 }
-                time.sleep(0.1)
-            except Exception as e:
-                print(f"Error fetching price from {exchange_name}: {str(e)}")
-                continue
-                
-        return prices
+            
+            return self.market_cache.get((exchange_name, exchange_symbol, 'ticker'), load)
+        
+        return self._fetch_from_exchanges(fetch, 'price')
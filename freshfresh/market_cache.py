@@ -0,0 +1,84 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class MarketDataCache:
+    """In-process TTL cache for market data keyed by (exchange, symbol, timeframe).
+
+    - Entries younger than `ttl` seconds are returned as is.
+    - Entries up to `stale_ttl` seconds past their TTL are returned
+      immediately while a background refresh runs (stale-while-revalidate),
+      unless the caller asks for fresh data only.
+    - Concurrent callers missing on the same key share one in-flight load
+      (single-flight) instead of each hitting the exchange.
+    """
+
+    def __init__(self, ttl, stale_ttl=0, refresh_workers=2):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = {}  # key -> (value, loaded_at)
+        self._inflight = {}  # key -> Future
+        self._lock = threading.Lock()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix='cache-refresh')
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'shared': 0, 'errors': 0}
+
+    def get(self, key, loader, allow_stale=True):
+        """Return the cached value for key, calling loader() to (re)load it when needed"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = time.monotonic() - entry[1]
+                if age < self.ttl:
+                    self.stats['hits'] += 1
+                    return entry[0]
+                if allow_stale and age < self.ttl + self.stale_ttl:
+                    self.stats['stale_hits'] += 1
+                    if key not in self._inflight:
+                        self._inflight[key] = Future()
+                        self._refresh_executor.submit(self._load, key, loader, self._inflight[key])
+                    return entry[0]
+
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats['shared'] += 1
+                owner = False
+            else:
+                self.stats['misses'] += 1
+                future = self._inflight[key] = Future()
+                owner = True
+
+        if owner:
+            self._load(key, loader, future)
+        return future.result()
+
+    def _load(self, key, loader, future):
+        try:
+            value = loader()
+        except Exception as e:
+            with self._lock:
+                self.stats['errors'] += 1
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            return
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._inflight.pop(key, None)
+        future.set_result(value)
+
+    def invalidate(self, key=None):
+        """Drop one entry, or everything if key is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses'] + stats['shared']
+        stats['hit_rate'] = round((lookups - stats['misses']) / lookups, 3) if lookups else 0.0
+        return stats
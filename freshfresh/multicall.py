@@ -0,0 +1,181 @@
+import threading
+from eth_abi import encode, decode
+
+AGGREGATE3 = 'aggregate3((address,bool,bytes)[])'
+
+
+def hex_to_int(value):
+    return int(value, 16)
+
+
+def block_timestamp(block):
+    return int(block['timestamp'], 16)
+
+
+class JsonRpcClient:
+    """Sends JSON-RPC requests as one HTTP batch over a kept-alive session"""
+
+    def __init__(self, url, timeout=10):
+        import requests
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.round_trips = 0
+        self._lock = threading.Lock()
+
+    def batch(self, requests):
+        """Send [(method, params), ...]; returns [(result, error), ...] in the same order"""
+        payload = [
+            {'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params}
+            for request_id, (method, params) in enumerate(requests)
+        ]
+        with self._lock:
+            self.round_trips += 1
+        response = self.session.post(self.url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        replies = response.json()
+        if not isinstance(replies, list):
+            raise Exception(f"RPC endpoint rejected the batch: {replies.get('error', replies)}")
+
+        by_id = {reply.get('id'): reply for reply in replies}
+        results = []
+        for request_id in range(len(requests)):
+            reply = by_id.get(request_id, {'error': {'message': 'no reply'}})
+            results.append((reply.get('result'), reply.get('error')))
+        return results
+
+
+class Multicall:
+    """Creates ReadBatches and remembers whether the Multicall3 contract is usable"""
+
+    def __init__(self, client, contracts, address, enabled=True):
+        self.client = client
+        self.contracts = contracts
+        self.address = contracts.address(address)
+        self.available = enabled
+
+    def batch(self):
+        return ReadBatch(self)
+
+
+class ReadBatch:
+    """The read-only calls for one decision, sent in a single round trip.
+
+    Contract reads are packed into one Multicall3 aggregate3 eth_call and
+    sent in the same JSON-RPC batch as plain RPC reads (nonce, gas price).
+    If the Multicall contract cannot be used, the contract reads go out as
+    separate eth_calls in the batch instead - still one round trip - and
+    block/balance reads switch to their plain RPC methods. execute()
+    returns key -> decoded value (a single value for single-output
+    functions, else a tuple).
+    """
+
+    def __init__(self, multicall):
+        self.multicall = multicall
+        self.calls = []  # (key, target, call data, output types, (method, params, convert) without multicall)
+        self.requests = []  # (key, method, params, convert)
+        self.errors = {}
+
+    def call(self, key, target, signature, *args, outputs=('uint256',), fallback=None):
+        """Add a contract read, e.g. call('usdc', token, 'balanceOf(address)', wallet)"""
+        contracts = self.multicall.contracts
+        self.calls.append((key, contracts.address(target), contracts.call_data(signature, *args), outputs, fallback))
+        return self
+
+    def block_timestamp(self, key='timestamp'):
+        """Add the latest block's timestamp"""
+        return self.call(
+            key, self.multicall.address, 'getCurrentBlockTimestamp()',
+            fallback=('eth_getBlockByNumber', ['latest', False], block_timestamp)
+        )
+
+    def native_balance(self, key, address):
+        """Add an address's native CRO balance in wei"""
+        address = self.multicall.contracts.address(address)
+        return self.call(
+            key, self.multicall.address, 'getEthBalance(address)', address,
+            fallback=('eth_getBalance', [address, 'latest'], hex_to_int)
+        )
+
+    def rpc(self, key, method, params=(), convert=hex_to_int):
+        """Add a plain JSON-RPC read such as eth_gasPrice"""
+        self.requests.append((key, method, list(params), convert))
+        return self
+
+    def execute(self, raise_on_error=True):
+        """Send everything in one round trip; failed reads raise, or are None when raise_on_error is False"""
+        client = self.multicall.client
+        rpc_requests = [(method, params) for _, method, params, _ in self.requests]
+        self.errors = {}
+        results = {}
+        replies = None
+
+        if self.calls and self.multicall.available:
+            replies = client.batch([self._aggregate_request()] + rpc_requests)
+            try:
+                self._store_aggregate(results, *replies[0])
+                replies = replies[1:]
+            except Exception as e:
+                # No usable Multicall contract on this node: use plain batches from now on
+                print(f"Error using multicall, falling back to JSON-RPC batches: {str(e)}")
+                self.multicall.available = False
+                results, replies, self.errors = {}, None, {}
+
+        if replies is None:
+            requests = [self._call_request(call) for call in self.calls] + rpc_requests
+            replies = client.batch(requests) if requests else []
+            for call, (result, error) in zip(self.calls, replies):
+                if call[4]:
+                    self._store_rpc(results, call[0], call[4][2], result, error)
+                else:
+                    self._store_call(results, call[0], call[3], self._bytes(result), error)
+            replies = replies[len(self.calls):]
+
+        for (key, _, _, convert), (result, error) in zip(self.requests, replies):
+            self._store_rpc(results, key, convert, result, error)
+
+        if raise_on_error and self.errors:
+            raise Exception(f"Failed reads: {self.errors}")
+        return results
+
+    def _aggregate_request(self):
+        data = self.multicall.contracts.selector(AGGREGATE3) + encode(
+            ['(address,bool,bytes)[]'], [[(target, True, data) for _, target, data, _, _ in self.calls]]
+        )
+        return 'eth_call', [{'to': self.multicall.address, 'data': '0x' + data.hex()}, 'latest']
+
+    def _store_aggregate(self, results, result, error):
+        if error:
+            raise Exception(error.get('message', error))
+        data = self._bytes(result)
+        if not data:
+            raise Exception("no contract at the multicall address")
+        (outcomes,) = decode(['(bool,bytes)[]'], data)
+        for (key, _, _, outputs, _), (success, return_data) in zip(self.calls, outcomes):
+            self._store_call(results, key, outputs, return_data, None if success else 'reverted')
+
+    @staticmethod
+    def _call_request(call):
+        _, target, data, _, fallback = call
+        if fallback:
+            return fallback[0], fallback[1]
+        return 'eth_call', [{'to': target, 'data': '0x' + data.hex()}, 'latest']
+
+    @staticmethod
+    def _bytes(result):
+        return bytes.fromhex(result[2:]) if isinstance(result, str) else None
+
+    def _store_call(self, results, key, outputs, data, error):
+        results[key] = None
+        if error or not data:
+            self.errors[key] = (error.get('message', error) if isinstance(error, dict) else error) or 'empty result'
+            return
+        values = decode(list(outputs), data)
+        results[key] = values[0] if len(values) == 1 else values
+
+    def _store_rpc(self, results, key, convert, result, error):
+        results[key] = None
+        if error or result is None:
+            self.errors[key] = (error or {}).get('message', 'no result')
+            return
+        results[key] = convert(result)
@@ -0,0 +1,93 @@
+import threading
+
+# Node errors that mean the nonce we used is wrong, not the transaction
+NONCE_ERRORS = ('nonce too low', 'nonce too high', 'invalid nonce', 'already known', 'replacement transaction underpriced')
+
+
+def is_nonce_error(error):
+    message = str(error).lower()
+    return any(text in message for text in NONCE_ERRORS)
+
+
+class NonceManager:
+    """Hands out the account's nonces locally, one after another.
+
+    The next nonce is read from the chain (pending count) once; after that
+    each transaction gets the next number without an RPC call, so several
+    can be signed and broadcast back to back. Nonces are tracked until they
+    are sent or confirmed. The manager resyncs from the chain only when
+    something shows its count is off: a node rejecting a nonce, a nonce
+    given back out of order (which would leave a gap) or a chain count
+    that does not match what we have sent.
+    """
+
+    def __init__(self, fetch_nonce):
+        self._fetch_nonce = fetch_nonce
+        self._next = None
+        self.pending = {}  # nonce -> tx hash, None until broadcast
+        self.syncs = 0  # Times the next nonce was taken from the chain
+        self._lock = threading.Lock()
+
+    def allocate(self):
+        """Next nonce to use; every allocation must end in sent(), release() or failed()"""
+        with self._lock:
+            if self._next is None:
+                self._next = self._fetch_nonce()
+                self.syncs += 1
+            nonce = self._next
+            self._next += 1
+            self.pending[nonce] = None
+            return nonce
+
+    def sent(self, nonce, tx_hash):
+        """The transaction with this nonce was broadcast"""
+        with self._lock:
+            if nonce in self.pending:
+                self.pending[nonce] = tx_hash
+
+    def confirmed(self, nonce):
+        """The transaction with this nonce was mined"""
+        with self._lock:
+            self.pending.pop(nonce, None)
+
+    def release(self, nonce):
+        """The nonce was never broadcast; give it back"""
+        with self._lock:
+            self.pending.pop(nonce, None)
+            if self._next is not None and nonce == self._next - 1:
+                self._next = nonce
+            elif self._next is not None and nonce < self._next:
+                # Later nonces were handed out already: they'd wait on this one forever
+                self._next = None
+
+    def failed(self, nonce, error):
+        """A transaction with this nonce could not be sent. Returns True if the nonce was the problem.
+
+        On a nonce error the next allocation resyncs from the chain, so a
+        retry can go out immediately.
+        """
+        if not is_nonce_error(error):
+            self.release(nonce)
+            return False
+        with self._lock:
+            self.pending.pop(nonce, None)
+            self._next = None
+        return True
+
+    def observe(self, chain_nonce):
+        """Check the local count against the chain's pending count (e.g. from a batched read)"""
+        with self._lock:
+            if self._next is None or chain_nonce > self._next:
+                # First sync, or transactions sent from elsewhere
+                self._next = chain_nonce
+                self.syncs += 1
+            elif chain_nonce < self._next and chain_nonce not in self.pending:
+                # A nonce we moved past never reached the node: fill the gap
+                self._next = chain_nonce
+                self.syncs += 1
+            for nonce in [nonce for nonce in self.pending if nonce < chain_nonce and self.pending[nonce]]:
+                del self.pending[nonce]  # Already counted by the node
+
+    def get_stats(self):
+        with self._lock:
+            return {'next': self._next, 'pending': len(self.pending), 'syncs': self.syncs}
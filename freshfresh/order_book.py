@@ -0,0 +1,212 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+class BookSide:
+    """Price levels of one side of a book in two compact sorted arrays.
+
+    Keys are prices for asks and negated prices for bids, so the best
+    level is always at index 0 and a level is found by binary search.
+    Changing, adding or removing a level is O(log n) to locate plus a
+    short memmove, never a rebuild. At most `max_levels` levels are kept;
+    the worst ones are dropped.
+    """
+
+    __slots__ = ('is_bid', 'max_levels', 'keys', 'sizes')
+
+    def __init__(self, is_bid, max_levels):
+        self.is_bid = is_bid
+        self.max_levels = max_levels
+        self.keys = array('d')
+        self.sizes = array('d')
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _key(self, price):
+        return -price if self.is_bid else price
+
+    def _price(self, key):
+        return -key if self.is_bid else key
+
+    def clear(self):
+        del self.keys[:]
+        del self.sizes[:]
+
+    def set(self, price, size):
+        """Set a level's size; size 0 removes it"""
+        key = self._key(price)
+        index = bisect_left(self.keys, key)
+        exists = index < len(self.keys) and self.keys[index] == key
+
+        if size <= 0:
+            if exists:
+                del self.keys[index]
+                del self.sizes[index]
+        elif exists:
+            self.sizes[index] = size
+        elif index < self.max_levels:
+            self.keys.insert(index, key)
+            self.sizes.insert(index, size)
+            if len(self.keys) > self.max_levels:
+                del self.keys[self.max_levels:]
+                del self.sizes[self.max_levels:]
+
+    def best(self):
+        return self._price(self.keys[0]) if self.keys else None
+
+    def levels(self, count=None):
+        """[(price, size), ...] best first"""
+        count = len(self.keys) if count is None else min(count, len(self.keys))
+        return [(self._price(self.keys[i]), self.sizes[i]) for i in range(count)]
+
+    def volume(self, count):
+        """Base amount in the best `count` levels"""
+        return sum(self.sizes[:count])
+
+    def quote_within(self, limit_price):
+        """Quote value of the levels priced at or better than limit_price"""
+        end = bisect_right(self.keys, self._key(limit_price))
+        return sum(self._price(self.keys[i]) * self.sizes[i] for i in range(end))
+
+
+class OrderBook:
+    """Top-of-book depth for one exchange/symbol.
+
+    Loaded from a snapshot (REST or stream) and then kept current by diffs
+    where the venue streams them. Every snapshot and diff carries the
+    venue's sequence number: diffs older than the book are skipped and a
+    diff that leaves a gap marks the book out of sync until the next
+    snapshot.
+
+    Snapshots are top-N only (KuCoin's public REST book is level2_20 or
+    level2_100, while its stream sends diffs for the full book). A side
+    that came back with `depth` or more levels is truncated, so the book
+    only covers prices up to that snapshot's worst level: diffs beyond it
+    are ignored, because the levels behind them were never seen, and
+    covers() says whether the known range still reaches far enough from
+    the mid to measure depth.
+    """
+
+    def __init__(self, depth, max_levels=None):
+        self.depth = depth
+        self.bids = BookSide(True, max_levels or depth * 4)
+        self.asks = BookSide(False, max_levels or depth * 4)
+        self.bid_limit = None  # Worst price the last snapshot covered; None if it had the whole side
+        self.ask_limit = None
+        self.sequence = None
+        self.synced = False
+        self.updated_at = None
+        self.version = 0  # Bumped on every change, so readers can tell a book moved
+        self._lock = threading.Lock()
+
+    def apply_snapshot(self, bids, asks, sequence=None):
+        """Replace the book with [(price, size), ...] levels"""
+        with self._lock:
+            self.bids.clear()
+            self.asks.clear()
+            for level in bids:
+                self.bids.set(float(level[0]), float(level[1]))
+            for level in asks:
+                self.asks.set(float(level[0]), float(level[1]))
+            self.bid_limit = min(float(level[0]) for level in bids) if len(bids) >= self.depth else None
+            self.ask_limit = max(float(level[0]) for level in asks) if len(asks) >= self.depth else None
+            self.sequence = sequence
+            self.synced = True
+            self.updated_at = time.time()
+            self.version += 1
+
+    def apply_diff(self, bids, asks, sequence, first_sequence=None):
+        """Apply changed levels [(price, size[, level_sequence]), ...]; size 0 removes.
+
+        `first_sequence` is the first sequence number the diff covers. Levels
+        carrying their own sequence are skipped if the book already has it.
+        Returns True if the diff was applied.
+        """
+        with self._lock:
+            if not self.synced or self.sequence is None or sequence <= self.sequence:
+                return False
+            if first_sequence is not None and first_sequence > self.sequence + 1:
+                self.synced = False  # Missed updates; wait for the next snapshot
+                self.version += 1
+                return False
+            for side, levels, limit in ((self.bids, bids, self.bid_limit), (self.asks, asks, self.ask_limit)):
+                for level in levels:
+                    if len(level) > 2 and level[2] is not None and int(level[2]) <= self.sequence:
+                        continue
+                    price = float(level[0])
+                    if limit is not None and (price < limit if side.is_bid else price > limit):
+                        continue  # Outside the snapshot's range
+                    side.set(price, float(level[1]))
+            self.sequence = sequence
+            self.updated_at = time.time()
+            self.version += 1
+            return True
+
+    def levels(self, is_bid, count=None):
+        """Copy of one side's [(price, size), ...] levels, best first"""
+        with self._lock:
+            return (self.bids if is_bid else self.asks).levels(count)
+
+    def mid(self):
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return (bid + ask) / 2
+
+    def covers(self, percent):
+        """True if the known levels reach `percent` from the mid on both sides"""
+        with self._lock:
+            mid = self.mid()
+            if mid is None:
+                return False
+            bid_limit, ask_limit = self.bid_limit, self.ask_limit
+            if len(self.bids) >= self.bids.max_levels:
+                bid_limit = max(bid_limit or 0.0, self.bids.levels()[-1][0])
+            if len(self.asks) >= self.asks.max_levels:
+                ask_limit = min(ask_limit or float('inf'), self.asks.levels()[-1][0])
+        return (
+            (bid_limit is None or bid_limit <= mid * (1 - percent / 100)) and
+            (ask_limit is None or ask_limit >= mid * (1 + percent / 100))
+        )
+
+    def imbalance(self, levels=None):
+        """(bid volume - ask volume) / total over the top levels, from -1 (all asks) to 1 (all bids)"""
+        levels = levels or self.depth
+        with self._lock:
+            bid_volume = self.bids.volume(levels)
+            ask_volume = self.asks.volume(levels)
+        total = bid_volume + ask_volume
+        return (bid_volume - ask_volume) / total if total else 0.0
+
+    def depth_within(self, percent):
+        """Quote value (bids, asks) resting within `percent` of the mid price"""
+        with self._lock:
+            mid = self.mid()
+            if mid is None:
+                return 0.0, 0.0
+            return (
+                self.bids.quote_within(mid * (1 - percent / 100)),
+                self.asks.quote_within(mid * (1 + percent / 100))
+            )
+
+    def snapshot(self, depth_percent):
+        """Best prices and depth metrics as a dict"""
+        with self._lock:
+            best_bid, best_ask = self.bids.best(), self.asks.best()
+            mid = self.mid()
+        bid_depth, ask_depth = self.depth_within(depth_percent)
+        return {
+            'best_bid': best_bid,
+            'best_ask': best_ask,
+            'mid': mid,
+            'spread_pct': (best_ask - best_bid) / mid * 100 if mid else None,
+            'imbalance': self.imbalance(),
+            'bid_depth': bid_depth,
+            'ask_depth': ask_depth,
+            'depth_pct': depth_percent,
+            'synced': self.synced,
+            'updated_at': self.updated_at,
+        }
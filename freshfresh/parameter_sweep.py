@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Parallel parameter sweep for the spike strategy backtest
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+from config import (
+    SWEEP_SPACE, SWEEP_WORKERS, SWEEP_RANK_BY, SWEEP_PROGRESS_FILE, SWEEP_RESULTS_FILE
+)
+from backtester import Backtester
+
+# Backtest result fields kept for every run
+RESULT_COLUMNS = [
+    'pnl_pct', 'pnl', 'max_drawdown_pct', 'trades', 'buys', 'sells',
+    'skipped_signals', 'signals', 'fees_paid', 'final_equity'
+]
+
+# Set in each worker process by _init_worker
+_worker_series = None
+_worker_memory = None
+
+
+def grid_points(space):
+    """Every combination of the values in space (param -> list of values)"""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def random_points(space, samples, seed=None):
+    """`samples` distinct combinations drawn at random from space"""
+    points = grid_points(space)
+    return random.Random(seed).sample(points, min(samples, len(points)))
+
+
+def _point_key(point):
+    return json.dumps(point, sort_keys=True)
+
+
+def _dataset_key(series, base_params):
+    """Identifies the data and fixed params a sweep ran on, so progress is only reused for the same sweep"""
+    shape = {name: [len(ts), int(ts[0]) if len(ts) else None, int(ts[-1]) if len(ts) else None]
+             for name, (ts, _) in series.items()}
+    return json.dumps({'series': shape, 'base_params': base_params}, sort_keys=True)
+
+
+def share_series(series):
+    """Copy exchange name -> (timestamps, closes) into one shared memory block.
+
+    Returns the block and a layout describing where each array lives, which
+    is all a worker needs to rebuild the series as zero-copy views.
+    """
+    layout = []
+    size = 0
+    for name, (timestamps, closes) in series.items():
+        length = len(timestamps)
+        layout.append((name, size, length))
+        size += length * 16  # int64 timestamp + float64 close
+
+    memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for (name, offset, length), (timestamps, closes) in zip(layout, series.values()):
+        np.ndarray(length, dtype=np.int64, buffer=memory.buf, offset=offset)[:] = timestamps
+        np.ndarray(length, dtype=np.float64, buffer=memory.buf, offset=offset + length * 8)[:] = closes
+    return memory, layout
+
+
+def attach_series(memory, layout):
+    """Rebuild the series written by share_series as views into `memory`"""
+    series = {}
+    for name, offset, length in layout:
+        timestamps = np.ndarray(length, dtype=np.int64, buffer=memory.buf, offset=offset)
+        closes = np.ndarray(length, dtype=np.float64, buffer=memory.buf, offset=offset + length * 8)
+        series[name] = (timestamps, closes)
+    return series
+
+
+def _init_worker(memory_name, layout):
+    global _worker_series, _worker_memory
+    # Keep a reference so the mapping stays open for the worker's lifetime
+    _worker_memory = shared_memory.SharedMemory(name=memory_name)
+    _worker_series = attach_series(_worker_memory, layout)
+
+
+def _run_points(points):
+    """Backtest a batch of parameter points inside a worker"""
+    backtester = Backtester()
+    rows = []
+    for point in points:
+        result = backtester.run_arrays(_worker_series, point)
+        row = dict(point)
+        if result['success']:
+            result['signals'] = sum(result['signals'].values())
+            row.update({column: result[column] for column in RESULT_COLUMNS})
+        else:
+            row['error'] = result['error']
+        rows.append(row)
+    return rows
+
+
+class ParameterSweep:
+    """Backtest many parameter combinations in a process pool.
+
+    The candle history is placed in shared memory once and every worker
+    maps it, so nothing but the small parameter dicts and result rows is
+    pickled. Each finished run is appended to a progress file as soon as
+    its batch returns; rerunning the same sweep skips those runs, so an
+    interrupted sweep picks up where it stopped. When all runs are done a
+    results table ranked by `rank_by` is written.
+    """
+
+    def __init__(self, workers=SWEEP_WORKERS, progress_file=SWEEP_PROGRESS_FILE,
+                 results_file=SWEEP_RESULTS_FILE, rank_by=SWEEP_RANK_BY):
+        self.workers = workers or os.cpu_count() or 1
+        self.progress_file = progress_file
+        self.results_file = results_file
+        self.rank_by = rank_by
+
+    def load_progress(self, dataset):
+        """Rows of runs already finished on `dataset`, keyed by their parameters"""
+        done = {}
+        if not os.path.exists(self.progress_file):
+            return done
+        with open(self.progress_file) as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue  # Line cut short by an interrupted write
+                if row.get('dataset') == dataset:
+                    done[_point_key(row['params'])] = row
+        return done
+
+    def run(self, series, points, base_params=None):
+        """Backtest every point (merged over base_params) and return the ranked rows"""
+        started = time.perf_counter()
+        base_params = base_params or {}
+        dataset = _dataset_key(series, base_params)
+        done = self.load_progress(dataset)
+        pending = [point for point in points if _point_key(point) not in done]
+        print(f"🔍 Sweep: {len(points)} runs, {len(points) - len(pending)} already done, {self.workers} workers")
+
+        if pending:
+            # A few batches per worker keeps cores busy without pickling per run
+            batch_size = max(1, len(pending) // (self.workers * 4))
+            batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+
+            memory, layout = share_series(series)
+            try:
+                with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                         initargs=(memory.name, layout)) as executor, \
+                        open(self.progress_file, 'a') as progress:
+                    futures = {
+                        executor.submit(_run_points, [{**base_params, **point} for point in batch]): batch
+                        for batch in batches
+                    }
+                    finished = len(points) - len(pending)
+                    for future in as_completed(futures):
+                        for point, row in zip(futures[future], future.result()):
+                            record = {'dataset': dataset, 'params': point, 'result': row}
+                            progress.write(json.dumps(record) + '\n')
+                            done[_point_key(point)] = record
+                        progress.flush()
+                        finished += len(futures[future])
+                        print(f"  {finished}/{len(points)} runs done")
+            finally:
+                memory.close()
+                memory.unlink()
+
+        rows = [done[_point_key(point)]['result'] for point in points]
+        ranked = self.rank(rows)
+        self.write_results(ranked)
+        print(f"✅ Sweep finished in {time.perf_counter() - started:.1f}s, results in {self.results_file}")
+        return ranked
+
+    def rank(self, rows):
+        """Rows ordered best first by rank_by; failed runs last"""
+        ranked = sorted(rows, key=lambda row: row.get(self.rank_by, -np.inf), reverse=True)
+        return [{'rank': position, **row} for position, row in enumerate(ranked, 1)]
+
+    def write_results(self, ranked):
+        columns = []
+        for row in ranked:
+            columns.extend(column for column in row if column not in columns)
+        with open(self.results_file, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(ranked)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep spike strategy parameters over stored candles")
+    parser.add_argument('symbol', nargs='?', default='CRO/USDT')
+    parser.add_argument('timeframe', nargs='?', default='1m')
+    parser.add_argument('--random', type=int, metavar='N', help="try N random combinations instead of the full grid")
+    parser.add_argument('--seed', type=int, default=0, help="seed for --random")
+    parser.add_argument('--workers', type=int, default=SWEEP_WORKERS)
+    args = parser.parse_args()
+
+    series = Backtester().load(args.symbol, args.timeframe)
+    if not series:
+        print(f"❌ No stored {args.timeframe} candles for {args.symbol}")
+        return False
+
+    if args.random:
+        points = random_points(SWEEP_SPACE, args.random, args.seed)
+    else:
+        points = grid_points(SWEEP_SPACE)
+
+    ranked = ParameterSweep(workers=args.workers).run(series, points)
+    for row in ranked[:10]:
+        print(row)
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
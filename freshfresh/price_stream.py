@@ -0,0 +1,291 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+import requests
+import websockets
+
+KUCOIN_BULLET_URL = "https://api.kucoin.com/api/v1/bullet-public"
+CRYPTO_COM_WS_URL = "wss://stream.crypto.com/exchange/v1/market"
+
+
+class TradeFeed:
+    """Public trade channel of one exchange.
+
+    Subclasses know how to reach the exchange, subscribe to a symbol and
+    turn raw messages into (timestamp_ms, price, amount) trades. Passing
+    `url` connects to that WebSocket server instead of the exchange, e.g.
+    a local stand-in server when testing offline. With `book_depth` set,
+    feeds that support it also subscribe to order book updates.
+    """
+
+    connect_delay = 0  # Seconds to wait after connecting before subscribing
+
+    def __init__(self, symbol, url=None, book_depth=None):
+        self.symbol = symbol
+        self.url = url
+        self.book_depth = book_depth
+        self.ping_interval = None
+
+    def get_url(self):
+        return self.url
+
+    def subscribe_messages(self):
+        return []
+
+    def ping_message(self):
+        return None
+
+    def parse_message(self, message):
+        """Return (trades, reply) for a decoded message"""
+        return [], None
+
+    def parse_book(self, message):
+        """Return ('snapshot' or 'diff', bids, asks, sequence, first_sequence) for an order book message, else None"""
+        return None
+
+
+class KucoinTradeFeed(TradeFeed):
+    """KuCoin /market/match channel"""
+
+    def get_url(self):
+        if self.url:
+            return self.url
+        # KuCoin hands out the WebSocket endpoint together with a token
+        response = requests.post(KUCOIN_BULLET_URL, timeout=10)
+        response.raise_for_status()
+        data = response.json()['data']
+        server = data['instanceServers'][0]
+        self.ping_interval = server['pingInterval'] / 1000
+        return f"{server['endpoint']}?token={data['token']}&connectId={uuid.uuid4().hex}"
+
+    def subscribe_messages(self):
+        topics = [f"/market/match:{self.symbol.replace('/', '-')}"]
+        if self.book_depth:
+            # Incremental level 2 changes; the book itself comes from a REST snapshot
+            topics.append(f"/market/level2:{self.symbol.replace('/', '-')}")
+        return [{
+            'id': uuid.uuid4().hex,
+            'type': 'subscribe',
+            'topic': topic,
+            'response': True
+        } for topic in topics]
+
+    def ping_message(self):
+        return {'id': uuid.uuid4().hex, 'type': 'ping'}
+
+    def parse_message(self, message):
+        if message.get('type') != 'message' or not message.get('topic', '').startswith('/market/match'):
+            return [], None
+        data = message['data']
+        # KuCoin trade time is in nanoseconds
+        return [(int(data['time']) // 1_000_000, float(data['price']), float(data['size']))], None
+
+    def parse_book(self, message):
+        if message.get('type') != 'message' or not message.get('topic', '').startswith('/market/level2'):
+            return None
+        data = message['data']
+        changes = data['changes']
+        # Each change is [price, size, sequence]
+        return 'diff', changes.get('bids', []), changes.get('asks', []), int(data['sequenceEnd']), int(data['sequenceStart'])
+
+
+class CryptoComTradeFeed(TradeFeed):
+    """Crypto.com Exchange trade.{instrument} channel"""
+
+    connect_delay = 1  # Crypto.com rate-limits requests sent right after connecting
+
+    def get_url(self):
+        return self.url or CRYPTO_COM_WS_URL
+
+    def subscribe_messages(self):
+        instrument = self.symbol.replace('/', '_')
+        channels = [f"trade.{instrument}"]
+        params = {}
+        if self.book_depth:
+            # Crypto.com only offers books of 10 or 50 levels
+            channels.append(f"book.{instrument}.{10 if self.book_depth <= 10 else 50}")
+            params = {'book_subscription_type': 'SNAPSHOT_AND_UPDATE', 'book_update_frequency': 10}
+        return [{
+            'id': 1,
+            'method': 'subscribe',
+            'params': {'channels': channels, **params},
+            'nonce': int(time.time() * 1000)
+        }]
+
+    def parse_message(self, message):
+        if message.get('method') == 'public/heartbeat':
+            return [], {'id': message.get('id'), 'method': 'public/respond-heartbeat'}
+        result = message.get('result')
+        if not result or result.get('channel') != 'trade':
+            return [], None
+        return [(int(t['t']), float(t['p']), float(t['q'])) for t in result.get('data', [])], None
+
+    def parse_book(self, message):
+        result = message.get('result')
+        if not result or result.get('channel') not in ('book', 'book.update') or not result.get('data'):
+            return None
+        data = result['data'][0]
+        levels = data if result['channel'] == 'book' else data.get('update', {})
+        # Levels are [price, quantity, order count]
+        bids = [level[:2] for level in levels.get('bids', [])]
+        asks = [level[:2] for level in levels.get('asks', [])]
+        if result['channel'] == 'book':
+            return 'snapshot', bids, asks, int(data['u']), None
+        # pu is the sequence of the previous update; anything else means we missed one
+        return 'diff', bids, asks, int(data['u']), int(data['pu']) + 1
+
+
+# WebSocket trade feeds for the exchanges that support streaming mode
+TRADE_FEEDS = {
+    'kucoin': KucoinTradeFeed,
+    'crypto_com': CryptoComTradeFeed
+}
+
+
+class CandleAggregator:
+    """Builds OHLCV candles of a fixed timeframe from a stream of trades"""
+
+    def __init__(self, timeframe_ms):
+        self.timeframe_ms = timeframe_ms
+        self.candle = None  # [timestamp_ms, open, high, low, close, volume]
+        self.complete = False  # False while the first (partially seen) candle is open
+
+    def add_trade(self, timestamp, price, amount):
+        """Add a trade; returns the candle it closed, if any"""
+        bucket = timestamp - timestamp % self.timeframe_ms
+        closed = None
+
+        if self.candle is not None and bucket < self.candle[0]:
+            return None  # Late trade for a candle that is already closed
+
+        if self.candle is None or bucket > self.candle[0]:
+            if self.candle is not None:
+                closed = self.candle if self.complete else None
+                self.complete = True
+            self.candle = [bucket, price, price, price, price, amount]
+        else:
+            self.candle[2] = max(self.candle[2], price)
+            self.candle[3] = min(self.candle[3], price)
+            self.candle[4] = price
+            self.candle[5] += amount
+
+        return closed
+
+
+class PriceStream:
+    """Runs trade feeds on a background asyncio loop and builds candles.
+
+    on_candle(exchange_name, candle) is called with the in-progress candle
+    after every trade, once the first full candle has started, and
+    on_candle_close(exchange_name, candle) whenever a full candle closes.
+    If given, on_trades(exchange_name, trades) receives the raw
+    (timestamp, price, amount) trades of every message, and
+    on_book(exchange_name, kind, bids, asks, sequence, first_sequence)
+    every order book snapshot or diff. Callbacks run on the stream thread
+    and should return quickly.
+    """
+
+    def __init__(self, feeds, timeframe_ms, on_candle, on_candle_close, on_trades=None, on_book=None,
+                 reconnect_delay=5):
+        self.feeds = feeds
+        self.timeframe_ms = timeframe_ms
+        self.on_candle = on_candle
+        self.on_candle_close = on_candle_close
+        self.on_trades = on_trades
+        self.on_book = on_book
+        self.reconnect_delay = reconnect_delay
+        self.last_message_time = {}
+        self._loop = None
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        if self._running:
+            return False
+        self._running = True
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name='price-stream', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        if not self._running:
+            return False
+        self._running = False
+        self._loop.call_soon_threadsafe(self._cancel_tasks)
+        self._thread.join(timeout=5)
+        return True
+
+    def _cancel_tasks(self):
+        for task in asyncio.all_tasks(self._loop):
+            task.cancel()
+
+    def is_live(self, exchange_name, max_age):
+        """True if the exchange's feed delivered a message within max_age seconds"""
+        last = self.last_message_time.get(exchange_name)
+        return self._running and last is not None and time.time() - last <= max_age
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        tasks = [self._loop.create_task(self._run_feed(name, feed)) for name, feed in self.feeds.items()]
+        try:
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        finally:
+            self._loop.close()
+
+    async def _run_feed(self, exchange_name, feed):
+        """Keep one feed connected, reconnecting after errors"""
+        while self._running:
+            try:
+                await self._consume(exchange_name, feed)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"Price stream error on {exchange_name}: {str(e)}")
+            self.last_message_time.pop(exchange_name, None)
+            if self._running:
+                await asyncio.sleep(self.reconnect_delay)
+
+    async def _consume(self, exchange_name, feed):
+        url = await asyncio.get_running_loop().run_in_executor(None, feed.get_url)
+        aggregator = CandleAggregator(self.timeframe_ms)
+
+        async with websockets.connect(url) as ws:
+            if feed.connect_delay:
+                await asyncio.sleep(feed.connect_delay)
+            for message in feed.subscribe_messages():
+                await ws.send(json.dumps(message))
+
+            ping_task = None
+            if feed.ping_interval and feed.ping_message():
+                ping_task = asyncio.create_task(self._ping(ws, feed))
+
+            try:
+                async for raw in ws:
+                    self.last_message_time[exchange_name] = time.time()
+                    message = json.loads(raw)
+                    trades, reply = feed.parse_message(message)
+                    if reply is not None:
+                        await ws.send(json.dumps(reply))
+                    if self.on_book:
+                        book = feed.parse_book(message)
+                        if book is not None:
+                            self.on_book(exchange_name, *book)
+                    if trades and self.on_trades:
+                        self.on_trades(exchange_name, trades)
+                    for timestamp, price, amount in trades:
+                        closed = aggregator.add_trade(timestamp, price, amount)
+                        if closed is not None:
+                            self.on_candle_close(exchange_name, closed)
+                        if aggregator.complete:
+                            self.on_candle(exchange_name, list(aggregator.candle))
+            finally:
+                if ping_task:
+                    ping_task.cancel()
+
+    async def _ping(self, ws, feed):
+        while True:
+            await asyncio.sleep(feed.ping_interval)
+            await ws.send(json.dumps(feed.ping_message()))
@@ -0,0 +1,118 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """Token bucket for one exchange.
+
+    Requests reserve their slot under a lock and then sleep outside it, so
+    callers are served in arrival order and nobody spins. Up to `burst`
+    requests may go out back-to-back after an idle period.
+
+    The rate backs off multiplicatively when the exchange reports a rate
+    limit and recovers additively on every success, never exceeding the
+    configured rate.
+    """
+
+    def __init__(self, rate, burst=1, min_rate=None):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate or rate / 16
+        self._next_free = time.monotonic()  # Theoretical arrival time of the next request
+        self._lock = threading.Lock()
+
+    def acquire(self, cost=1, timeout=None):
+        """Wait for `cost` tokens. Returns False if that would take longer than timeout."""
+        with self._lock:
+            now = time.monotonic()
+            interval = 1 / self.rate
+            ready_at = max(now, self._next_free - (self.burst - 1) * interval)
+            wait_time = ready_at - now
+            if timeout is not None and wait_time > timeout:
+                return False
+            self._next_free = max(self._next_free, ready_at) + cost * interval
+
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return True
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * 0.05)
+
+    def on_rate_limited(self, pause):
+        """Halve the rate and hold every queued request back for `pause` seconds"""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            resume_at = time.monotonic() + pause + (self.burst - 1) / self.rate
+            self._next_free = max(self._next_free, resume_at)
+
+
+class RateLimiter:
+    """One token bucket per exchange; every exchange request goes through call().
+
+    A bucket is either charged once per call(), or, for a metered exchange,
+    per HTTP request through throttle(), with the request's own cost (ccxt
+    endpoints cost one or more units of the exchange's rateLimit). call()
+    then only retries rate-limited calls.
+    """
+
+    def __init__(self, limits, burst=1, max_retries=3, backoff=1.0, rate_limit_errors=()):
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.rate_limit_errors = rate_limit_errors
+        self.buckets = {}
+        self.metered = set()
+        self.stats = {}
+        self._waits = threading.local()  # Seconds each thread has spent waiting on buckets
+        for name, rate in limits.items():
+            self.add_bucket(name, rate)
+
+    def add_bucket(self, name, rate, metered=False):
+        """Start limiting an exchange to `rate` requests (cost units if metered) per second"""
+        self.buckets[name] = TokenBucket(rate, self.burst)
+        self.stats[name] = {'requests': 0, 'cost': 0, 'rate_limited': 0}
+        if metered:
+            self.metered.add(name)
+
+    def throttle(self, name, cost=None):
+        """Wait until a metered exchange's bucket allows one HTTP request of `cost` units"""
+        cost = 1 if cost is None else cost
+        bucket = self.buckets.get(name)
+        if bucket is None:
+            return
+        start = time.monotonic()
+        bucket.acquire(cost)
+        self._waits.total = self.waited() + time.monotonic() - start
+        self.stats[name]['requests'] += 1
+        self.stats[name]['cost'] += cost
+
+    def waited(self):
+        """Seconds the calling thread has spent waiting on buckets so far"""
+        return getattr(self._waits, 'total', 0.0)
+
+    def call(self, name, func, *args, **kwargs):
+        """Call func once the exchange's bucket allows it.
+
+        Rate-limit errors (HTTP 429) slow the bucket down and the call is
+        retried with exponential backoff, up to max_retries times.
+        """
+        bucket = self.buckets.get(name)
+        if bucket is None:
+            return func(*args, **kwargs)
+
+        for attempt in range(self.max_retries + 1):
+            if name not in self.metered:
+                self.throttle(name)
+            try:
+                result = func(*args, **kwargs)
+            except self.rate_limit_errors:
+                self.stats[name]['rate_limited'] += 1
+                if attempt == self.max_retries:
+                    raise
+                bucket.on_rate_limited(self.backoff * 2 ** attempt)
+                continue
+            bucket.on_success()
+            return result
@@ -0,0 +1,129 @@
+import threading
+import time
+from concurrent.futures import Future
+
+
+class ReceiptTracker:
+    """Waits for transaction receipts on one background thread.
+
+    track() returns a Future right after a transaction is broadcast, so the
+    sender never blocks. While anything is pending, the thread asks for the
+    block number and every pending receipt in one JSON-RPC batch each
+    `poll_interval` (about a block), and resolves each Future with a dict:
+    'status' is 'confirmed', 'reverted' or 'replaced' and 'success' is True
+    only for a confirmed one.
+
+    A transaction without a receipt after `timeout` seconds may still be
+    mined, so it stays pending ("stale") and is only checked every
+    `stale_poll_interval`. Stale checks also read the account's mined
+    transaction count: once it has passed the transaction's nonce without a
+    receipt, another transaction took the nonce and it is 'replaced'.
+    `on_mined(nonce)` is called for every nonce used on chain.
+    """
+
+    def __init__(self, client, poll_interval, timeout, on_mined=None, stale_poll_interval=None, address=None):
+        self.client = client
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.stale_poll_interval = stale_poll_interval or poll_interval * 10
+        self.address = address
+        self.on_mined = on_mined
+        self.last_block = None
+        self.polls = 0
+        self._pending = {}  # tx hash -> (future, nonce, broadcast time)
+        self._stale = {}  # tx hash -> time of its next check, once past `timeout`
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def track(self, tx_hash, nonce=None):
+        """Future resolved with the outcome of a broadcast transaction"""
+        future = Future()
+        with self._lock:
+            self._pending[tx_hash] = (future, nonce, time.time())
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='receipt-tracker', daemon=True)
+                self._thread.start()
+        return future
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def stale_count(self):
+        """Transactions still pending after `timeout` seconds"""
+        with self._lock:
+            return len(self._stale)
+
+    def _run(self):
+        while True:
+            time.sleep(self.poll_interval)
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Error polling transaction receipts: {str(e)}")
+
+    def poll(self):
+        """Fetch every receipt due for a check in one batch and resolve the ones that are final"""
+        now = time.time()
+        with self._lock:
+            due = [
+                (tx_hash, entry) for tx_hash, entry in self._pending.items()
+                if self._stale.get(tx_hash, 0) <= now
+            ]
+        if not due:
+            return
+
+        # The mined count comes before the receipts, so a transaction mined
+        # in between still has its receipt found
+        check_replaced = self.address is not None and any(tx_hash in self._stale for tx_hash, _ in due)
+        requests = [('eth_blockNumber', [])]
+        if check_replaced:
+            requests.append(('eth_getTransactionCount', [self.address, 'latest']))
+        replies = self.client.batch(requests + [('eth_getTransactionReceipt', [tx_hash]) for tx_hash, _ in due])
+        self.polls += 1
+        block, _ = replies[0]
+        if block:
+            self.last_block = int(block, 16)
+        mined_count = None
+        if check_replaced and replies[1][0]:
+            mined_count = int(replies[1][0], 16)
+
+        now = time.time()
+        for (tx_hash, (_, nonce, sent_at)), (receipt, _) in zip(due, replies[len(requests):]):
+            if receipt:
+                if self.on_mined and nonce is not None:
+                    self.on_mined(nonce)
+                success = int(receipt['status'], 16) == 1
+                self._settle(tx_hash, {
+                    'tx_hash': tx_hash,
+                    'success': success,
+                    'status': 'confirmed' if success else 'reverted',
+                    'block_number': int(receipt['blockNumber'], 16),
+                    'gas_used': int(receipt['gasUsed'], 16)
+                })
+            elif tx_hash in self._stale and mined_count is not None and nonce is not None and mined_count > nonce:
+                if self.on_mined:
+                    self.on_mined(nonce)
+                self._settle(tx_hash, {
+                    'tx_hash': tx_hash,
+                    'success': False,
+                    'status': 'replaced',
+                    'block_number': None,
+                    'gas_used': None
+                })
+            elif now - sent_at > self.timeout:
+                with self._lock:
+                    if tx_hash not in self._stale:
+                        print(f"Transaction {tx_hash} not mined after {self.timeout}s; "
+                              f"checking it every {self.stale_poll_interval}s")
+                    self._stale[tx_hash] = now + self.stale_poll_interval
+
+    def _settle(self, tx_hash, outcome):
+        with self._lock:
+            future, _, _ = self._pending.pop(tx_hash)
+            self._stale.pop(tx_hash, None)
+        future.set_result(outcome)
@@ -0,0 +1,59 @@
+from collections import deque
+
+
+class AdaptiveInterval:
+    """Signal check interval that follows market activity.
+
+    The base interval is scaled by how volatile the market is compared with
+    `reference_volatility` (the std of % returns considered normal) and
+    shortened further as the latest move approaches the spike threshold
+    (`spike_proximity` 0..1). The result is kept within
+    [min_interval, max_interval]: a dead market is polled rarely, a moving
+    one every few seconds. Without volatility data yet the base is used.
+    """
+
+    def __init__(self, min_interval, max_interval, reference_volatility, proximity_weight):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.reference_volatility = reference_volatility
+        self.proximity_weight = proximity_weight
+        self.interval = None
+
+    def next_interval(self, base, volatility=None, spike_proximity=0.0):
+        """Seconds until the next check"""
+        factor = 1.0
+        if volatility:
+            factor = self.reference_volatility / volatility
+        factor *= 1 - self.proximity_weight * min(max(spike_proximity, 0.0), 1.0)
+        self.interval = min(max(base * factor, self.min_interval), self.max_interval)
+        return self.interval
+
+
+def next_candle_close(now, timeframe_seconds, every=1):
+    """Epoch time of the next candle close after `now`, on every `every`-th candle"""
+    period = timeframe_seconds * max(int(every), 1)
+    return (now // period + 1) * period
+
+
+class DecisionLatency:
+    """Time from the latest candle close to each signal decision, over the last `window` checks"""
+
+    def __init__(self, timeframe_seconds, window=100):
+        self.timeframe_seconds = timeframe_seconds
+        self.latencies = deque(maxlen=window)
+
+    def record(self, decided_at):
+        """Record a decision made at epoch time `decided_at`; returns its latency in seconds"""
+        latency = decided_at % self.timeframe_seconds
+        self.latencies.append(latency)
+        return latency
+
+    def get_stats(self):
+        if not self.latencies:
+            return {'checks': 0, 'last': None, 'mean': None, 'max': None}
+        return {
+            'checks': len(self.latencies),
+            'last': round(self.latencies[-1], 3),
+            'mean': round(sum(self.latencies) / len(self.latencies), 3),
+            'max': round(max(self.latencies), 3),
+        }
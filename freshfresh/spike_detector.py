@@ -0,0 +1,72 @@
+import numpy as np
+
+
+def stack_closes(series, lookback):
+    """Stack the last lookback+1 values of each series into one 2-D array.
+
+    Series shorter than lookback+1 are left-padded with NaN, so the first
+    return of a series with exactly `lookback` values is NaN just as
+    pandas' pct_change would make it.
+    """
+    stacked = np.full((len(series), lookback + 1), np.nan)
+    for row, values in enumerate(series):
+        tail = np.asarray(values[-(lookback + 1):], dtype=np.float64)
+        if len(tail):
+            stacked[row, -len(tail):] = tail
+    return stacked
+
+
+def find_spikes(closes, threshold):
+    """Find the largest absolute % move in every row of a 2-D close array.
+
+    Returns (is_spike, spike_index, magnitude) with one entry per row:
+    whether the largest move reached `threshold`, the column of the close
+    that ended it and its signed % change. Ties go to the earliest column.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(closes, axis=1) / closes[:, :-1] * 100
+
+    abs_returns = np.abs(returns)
+    abs_returns[np.isnan(abs_returns)] = -np.inf
+
+    move_index = np.argmax(abs_returns, axis=1)
+    rows = np.arange(len(closes))
+    is_spike = abs_returns[rows, move_index] >= threshold
+    magnitude = returns[rows, move_index]
+
+    # Returns are one column shorter than closes
+    return is_spike, move_index + 1, magnitude
+
+
+def rolling_spikes(closes, lookback, threshold):
+    """find_spikes for every position of a 1-D close series in one pass.
+
+    Entry i describes the window of the `lookback` returns ending at close
+    i, i.e. what detect_spikes would report if close i were the newest
+    candle. Returns (is_spike, spike_index, magnitude); the first
+    lookback-1 positions never spike, as detect_spikes skips series shorter
+    than `lookback`.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    count = len(closes)
+    is_spike = np.zeros(count, dtype=bool)
+    spike_index = np.zeros(count, dtype=np.int64)
+    magnitude = np.full(count, np.nan)
+    if count < lookback:
+        return is_spike, spike_index, magnitude
+
+    returns = np.full(count, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = np.diff(closes) / closes[:-1] * 100
+
+    abs_returns = np.abs(returns)
+    abs_returns[np.isnan(abs_returns)] = -np.inf
+
+    windows = np.lib.stride_tricks.sliding_window_view(abs_returns, lookback)
+    move_index = np.argmax(windows, axis=1)
+    starts = np.arange(len(windows))
+
+    is_spike[lookback - 1:] = windows[starts, move_index] >= threshold
+    spike_index[lookback - 1:] = starts + move_index
+    magnitude[lookback - 1:] = returns[starts + move_index]
+    return is_spike, spike_index, magnitude
@@ -83,6 +83,9 @@ Failed Trades: {status['failed_trades']}
 Recent Activity:
 {status['recent_activity']}
 
+Exchange Health:
+{status['exchange_health']}
+
 Current Configuration:
 • Trade Amount: ${status['trade_amount']} USDC
 • Slippage: {status['slippage']}%
@@ -339,7 +342,7 @@ Min Balance Threshold: ${config['min_balance_threshold']} USDC
                 
                 if result['success']:
                     await query.edit_message_text(
-                        f"✅ Buy Order Executed\n\n"
+                        f"✅ Buy Order Submitted\n\n"
                         f"Transaction Hash: {result['tx_hash']}\n"
                         f"Amount: ${result['amount_in']} USDC\n"
                         f"Expected CRO: {result['expected_amount_out']:.4f} CRO",
@@ -360,7 +363,7 @@ Min Balance Threshold: ${config['min_balance_threshold']} USDC
                 
                 if result['success']:
                     await query.edit_message_text(
-                        f"✅ Sell Order Executed\n\n"
+                        f"✅ Sell Order Submitted\n\n"
                         f"Transaction Hash: {result['tx_hash']}\n"
                         f"Amount: {result['amount_in']:.4f} CRO\n"
                         f"Expected USDC: ${result['expected_amount_out']:.2f} USDC",
@@ -511,6 +514,9 @@ Failed Trades: {status['failed_trades']}
 Recent Activity:
 {status['recent_activity']}
 
+Exchange Health:
+{status['exchange_health']}
+
 Current Configuration:
 • Trade Amount: ${status['trade_amount']} USDC
 • Slippage: {status['slippage']}%
@@ -92,6 +92,1025 @@ def test_manual_trade():
         print(f"❌ Manual trade test failed: {str(e)}")
         return False
 
+class LocalRpcStandIn:
+    """Minimal JSON-RPC node on localhost answering the reads the bot batches.
+    
+    With multicall=False there is no contract at the Multicall3 address, as
+    on a chain without it. Raw transactions are accepted like a node's
+    mempool would: a nonce below the account's pending count is rejected
+    with "nonce too low", anything else is recorded in `transactions`.
+    """
+    
+    BALANCES = {'cro': 250 * 10**18, 'usdc': 1234 * 10**6, 'native': 5 * 10**18}
+    ALLOWANCE = 10**6
+    TIMESTAMP = 1700000000
+    NONCE = 7
+    GAS_PRICE = 5000 * 10**9
+    BLOCK = 100
+    
+    def __init__(self, multicall=True):
+        import json
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from eth_abi import encode, decode
+        from web3 import Web3
+        import rlp
+        from config import CRO_TOKEN_ADDRESS, USDC_TOKEN_ADDRESS, MULTICALL_ADDRESS
+        
+        def selector(signature):
+            return bytes(Web3.keccak(text=signature)[:4])
+        
+        balances = {CRO_TOKEN_ADDRESS.lower(): self.BALANCES['cro'], USDC_TOKEN_ADDRESS.lower(): self.BALANCES['usdc']}
+        
+        def contract_call(target, data):
+            function, args = data[:4], data[4:]
+            if function == selector('balanceOf(address)'):
+                return encode(['uint256'], [balances[target.lower()]])
+            if function == selector('allowance(address,address)'):
+                return encode(['uint256'], [self.ALLOWANCE])
+            if function == selector('getAmountsOut(uint256,address[])'):
+                amount, path = decode(['uint256', 'address[]'], args)
+                return encode(['uint256[]'], [[amount, amount * 10**12 * 10]])
+            if function == selector('getCurrentBlockTimestamp()'):
+                return encode(['uint256'], [self.TIMESTAMP])
+            if function == selector('getEthBalance(address)'):
+                return encode(['uint256'], [self.BALANCES['native']])
+            return None
+        
+        def eth_call(transaction):
+            target, data = transaction['to'], bytes.fromhex(transaction['data'][2:])
+            if target.lower() == MULTICALL_ADDRESS.lower():
+                if not multicall:
+                    return '0x'
+                (calls,) = decode(['(address,bool,bytes)[]'], data[4:])
+                outcomes = []
+                for call_target, _, call_data in calls:
+                    result = contract_call(call_target, call_data)
+                    outcomes.append((result is not None, result or b''))
+                return '0x' + encode(['(bool,bytes)[]'], [outcomes]).hex()
+            return '0x' + contract_call(target, data).hex()
+        
+        class RpcError(Exception):
+            pass
+        
+        def send_raw_transaction(raw):
+            raw = bytes.fromhex(raw[2:])
+            nonce = int.from_bytes(rlp.decode(raw)[0], 'big')  # Legacy transaction: nonce comes first
+            self.sent.append(nonce)
+            if nonce < self.nonce:
+                raise RpcError('nonce too low')
+            tx_hash = Web3.to_hex(Web3.keccak(raw))
+            self.transactions.append((nonce, tx_hash))
+            self.nonce = max(self.nonce, nonce + 1)
+            return tx_hash
+        
+        methods = {
+            'eth_call': lambda params: eth_call(params[0]),
+            'eth_getTransactionCount': lambda params: hex(self.nonce),
+            'eth_sendRawTransaction': lambda params: send_raw_transaction(params[0]),
+            'eth_gasPrice': lambda params: hex(self.GAS_PRICE),
+            'eth_getBalance': lambda params: hex(self.BALANCES['native']),
+            'eth_getBlockByNumber': lambda params: {'timestamp': hex(self.TIMESTAMP)},
+            'eth_blockNumber': lambda params: hex(self.BLOCK),
+            'eth_getTransactionReceipt': lambda params: self.receipts.get(params[0]),
+        }
+        stand_in = self
+        self.requests = 0
+        self.receipts = {}  # tx hash -> receipt, once "mined"
+        self.nonce = self.NONCE  # The account's pending transaction count
+        self.sent = []  # Nonce of every raw transaction received, rejected ones included
+        self.transactions = []  # (nonce, tx hash) of every accepted transaction
+        self.calls = {}  # Method -> number of requests
+        
+        def reply(request):
+            stand_in.calls[request['method']] = stand_in.calls.get(request['method'], 0) + 1
+            try:
+                return {'jsonrpc': '2.0', 'id': request['id'], 'result': methods[request['method']](request['params'])}
+            except RpcError as e:
+                return {'jsonrpc': '2.0', 'id': request['id'], 'error': {'code': -32000, 'message': e.args[0]}}
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                stand_in.requests += 1
+                batch = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                # web3 sends single requests, the bot's own client batches
+                replies = reply(batch) if isinstance(batch, dict) else [reply(request) for request in batch]
+                body = json.dumps(replies).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.server.shutdown()
+
+def test_rate_limiter():
+    """Test token bucket pacing and the backoff after an HTTP 429"""
+    print("\n🔍 Testing rate limiter...")
+    import ccxt
+    from rate_limiter import TokenBucket, RateLimiter
+    
+    try:
+        # 20 requests/s with a burst of 2: two go out at once, the rest 50 ms apart
+        bucket = TokenBucket(20, burst=2)
+        start = time.monotonic()
+        for _ in range(6):
+            assert bucket.acquire()
+        elapsed = time.monotonic() - start
+        assert 0.18 <= elapsed < 0.4, elapsed
+        bucket = TokenBucket(1)
+        assert bucket.acquire() and not bucket.acquire(timeout=0.5)  # The next slot is a second away
+        
+        # A 429 halves the rate and holds the queue back; successes recover it
+        bucket = TokenBucket(20)
+        bucket.on_rate_limited(0.2)
+        assert bucket.rate == 10
+        start = time.monotonic()
+        bucket.acquire()
+        assert time.monotonic() - start >= 0.19
+        for _ in range(30):
+            bucket.on_success()
+        assert bucket.rate == 20
+        
+        # call() retries rate-limited calls with exponential backoff, then gives up
+        limiter = RateLimiter({'kucoin': 100}, max_retries=2, backoff=0.05,
+                              rate_limit_errors=(ccxt.RateLimitExceeded,))
+        replies = iter([ccxt.RateLimitExceeded('429'), ccxt.RateLimitExceeded('429'), 'candles'])
+        
+        def request():
+            reply = next(replies)
+            if isinstance(reply, Exception):
+                raise reply
+            return reply
+        
+        start = time.monotonic()
+        assert limiter.call('kucoin', request) == 'candles'
+        assert time.monotonic() - start >= 0.05 + 0.1  # Paused 0.05s, then 0.1s
+        assert limiter.stats['kucoin'] == {'requests': 3, 'cost': 3, 'rate_limited': 2}, limiter.stats
+        assert limiter.buckets['kucoin'].rate < 100
+        
+        def always_limited():
+            raise ccxt.RateLimitExceeded('429')
+        try:
+            limiter.call('kucoin', always_limited)
+            raise AssertionError("call() retried forever")
+        except ccxt.RateLimitExceeded:
+            pass
+        assert limiter.stats['kucoin']['rate_limited'] == 5
+        print(f"✅ Bucket paced 6 requests over {elapsed:.2f}s; 429s backed off and retried")
+        return True
+    except Exception as e:
+        print(f"❌ Rate limiter failed: {str(e)}")
+        return False
+
+def test_exchange_health():
+    """Test the circuit breaker's open, half-open and closed transitions"""
+    print("\n🔍 Testing exchange health...")
+    from exchange_health import ExchangeHealth
+    
+    try:
+        health = ExchangeHealth(window=10, max_error_rate=0.5, min_requests=4, max_latency=1.0,
+                                cooldown=0.05, max_cooldown=0.2, probe_successes=2)
+        
+        # Opens once half of the last requests failed
+        health.record_success(0.1)
+        health.record_success(0.1)
+        health.record_failure(0.1, 'timeout')
+        assert health.state == 'closed' and health.allow_request()
+        health.record_failure(0.1, 'timeout')
+        assert health.state == 'open' and health.is_open() and not health.allow_request()
+        assert health.score == 0 and health.snapshot()['last_error'] == 'timeout'
+        
+        # After the cooldown one probe at a time goes through; a failed probe doubles the cooldown
+        time.sleep(0.06)
+        assert health.allow_request() and health.state == 'half_open'
+        assert not health.allow_request()  # Probe still in flight
+        health.record_failure(0.1, 'timeout')
+        assert health.state == 'open' and health.cooldown == 0.1
+        time.sleep(0.06)
+        assert not health.allow_request()
+        time.sleep(0.05)
+        
+        # Enough successful probes in a row close it and reset the cooldown
+        for _ in range(2):
+            assert health.allow_request() and health.state == 'half_open'
+            health.record_success(0.1)
+        assert health.state == 'closed' and health.cooldown == 0.05 and health.error_rate == 0.0
+        
+        # Slow replies open it too, even without errors
+        slow = ExchangeHealth(min_requests=3, max_latency=0.5, cooldown=60)
+        for _ in range(3):
+            slow.record_success(2.0)
+        assert slow.state == 'open' and not slow.allow_request()
+        print(f"✅ Breaker opened, probed, reopened and closed; latency {slow.latency:.1f}s opened it")
+        return True
+    except Exception as e:
+        print(f"❌ Exchange health failed: {str(e)}")
+        return False
+
+def test_market_cache():
+    """Test TTL hits, stale-while-revalidate and single-flight loads"""
+    print("\n🔍 Testing market cache...")
+    import threading
+    from market_cache import MarketDataCache
+    
+    try:
+        cache = MarketDataCache(ttl=0.1, stale_ttl=1.0)
+        loads = []
+        
+        def loader():
+            loads.append(time.monotonic())
+            time.sleep(0.1)  # A slow exchange
+            return len(loads)
+        
+        key = ('kucoin', 'CRO/USDT', '1m')
+        assert cache.get(key, loader) == 1 and cache.get(key, loader) == 1  # Miss, then hit
+        
+        # Past the TTL the stale value comes back at once while one refresh runs
+        time.sleep(0.11)
+        start = time.monotonic()
+        assert cache.get(key, loader) == 1 and cache.get(key, loader) == 1
+        assert time.monotonic() - start < 0.05
+        time.sleep(0.15)
+        assert cache.get(key, loader) == 2 and len(loads) == 2  # One background refresh
+        
+        # Callers that need fresh data wait for it
+        time.sleep(0.11)
+        assert cache.get(key, loader, allow_stale=False) == 3
+        
+        # Concurrent misses share one load
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get('other', loader))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == [4] * 4 and len(loads) == 4, (results, len(loads))
+        
+        # A failed load is not cached
+        def failing():
+            raise RuntimeError('exchange down')
+        try:
+            cache.get('down', failing)
+            raise AssertionError("error was swallowed")
+        except RuntimeError:
+            pass
+        assert cache.get('down', lambda: 'up') == 'up'
+        
+        stats = cache.get_stats()
+        assert (stats['stale_hits'], stats['shared'], stats['errors']) == (2, 3, 1), stats
+        print(f"✅ Stale value served in under 50 ms; hit rate {stats['hit_rate']:.0%}")
+        return True
+    except Exception as e:
+        print(f"❌ Market cache failed: {str(e)}")
+        return False
+
+def test_spike_detector():
+    """Test the vectorized spike detector against the per-exchange pandas loop"""
+    print("\n🔍 Testing spike detector...")
+    import numpy as np
+    import pandas as pd
+    from spike_detector import stack_closes, find_spikes, rolling_spikes
+    from config import PRICE_LOOKBACK_PERIODS, SPIKE_THRESHOLD
+    
+    try:
+        rng = np.random.default_rng(1)
+        series = []
+        for length in rng.integers(PRICE_LOOKBACK_PERIODS, 40, 300):
+            closes = 0.1 * np.cumprod(1 + rng.normal(0, 0.01, length))
+            closes[rng.integers(1, length)] *= rng.choice([0.95, 1, 1.05])
+            series.append(closes)
+        
+        # The old loop: pct_change over the frame, largest absolute move in the last lookback rows
+        is_spike, spike_index, magnitude = find_spikes(stack_closes(series, PRICE_LOOKBACK_PERIODS), SPIKE_THRESHOLD)
+        for row, closes in enumerate(series):
+            change = pd.Series(closes).pct_change() * 100
+            recent = change.tail(PRICE_LOOKBACK_PERIODS)
+            max_change = recent.abs().max()
+            assert is_spike[row] == (max_change >= SPIKE_THRESHOLD), row
+            position = recent.abs().idxmax()
+            assert np.isclose(magnitude[row], change[position]), row
+            assert spike_index[row] - PRICE_LOOKBACK_PERIODS == position - len(closes) + 1, row
+        
+        # rolling_spikes reports what find_spikes sees at every position of a series
+        closes = series[0]
+        rolling = rolling_spikes(closes, PRICE_LOOKBACK_PERIODS, SPIKE_THRESHOLD)
+        for end in range(PRICE_LOOKBACK_PERIODS, len(closes) + 1):
+            window = stack_closes([closes[:end]], PRICE_LOOKBACK_PERIODS)
+            spike, index, move = find_spikes(window, SPIKE_THRESHOLD)
+            assert rolling[0][end - 1] == spike[0] and rolling[2][end - 1] == move[0], end
+            assert rolling[1][end - 1] == end - 1 - PRICE_LOOKBACK_PERIODS + index[0], end
+        
+        # detect_spikes on frames matches the pandas reference
+        timestamps = pd.date_range('2024-01-01', periods=30, freq='1min')
+        price_data = {
+            f'exchange_{row}': pd.DataFrame({'timestamp': timestamps, 'close': closes[-30:]})
+            for row, closes in enumerate(series) if len(closes) >= 30
+        }
+        analyzer = MarketAnalyzer()
+        analyzer.tick_filter_enabled = False
+        vectorized = analyzer.detect_spikes(price_data)
+        reference = analyzer.detect_spikes_pandas({name: df.copy() for name, df in price_data.items()})
+        assert vectorized.keys() == reference.keys()
+        for name, spike in reference.items():
+            assert vectorized[name]['direction'] == spike['direction'], name
+            assert np.isclose(vectorized[name]['magnitude'], spike['magnitude']), name
+            assert vectorized[name]['timestamp'] == spike['timestamp'], name
+        print(f"✅ {len(series)} series match the loop; {len(reference)} of {len(price_data)} frames spiked")
+        return True
+    except Exception as e:
+        print(f"❌ Spike detector failed: {str(e)}")
+        return False
+
+def test_candle_alignment():
+    """Test the timestamp merge, as-of lookup and alignment against brute force and pandas"""
+    print("\n🔍 Testing candle alignment...")
+    import numpy as np
+    import pandas as pd
+    from candle_alignment import merge_timestamps, asof_index, align_candles, CLOSE, VOLUME
+    
+    try:
+        rng = np.random.default_rng(2)
+        timestamps = [np.sort(rng.choice(200, size, replace=False)) * 60_000 for size in (120, 80, 1, 0, 150)]
+        
+        grid, positions = merge_timestamps(timestamps)
+        assert grid.tolist() == sorted(set(np.concatenate(timestamps).tolist()))
+        for ts, position in zip(timestamps, positions):
+            assert grid[position].tolist() == ts.tolist()
+        
+        # Newest row at or before every slot, -1 before the first
+        for position in positions:
+            index = asof_index(position, len(grid))
+            expected = [max([row for row, slot in enumerate(position) if slot <= j], default=-1) for j in range(len(grid))]
+            assert index.tolist() == expected
+        assert asof_index(np.empty(0, dtype=np.int64), 0).tolist() == []
+        
+        # Aligned closes match a pandas outer join with forward fill
+        candles = {}
+        for name, ts in zip('abcde', timestamps):
+            candles[name] = np.column_stack([ts] + [rng.uniform(0.09, 0.11, len(ts))] * 4 + [rng.uniform(1, 10, len(ts))])
+        aligned = align_candles(candles, fill='ffill')
+        frame = pd.concat(
+            {name: pd.Series(array[:, CLOSE], index=array[:, 0].astype(np.int64)) for name, array in candles.items()},
+            axis=1
+        ).sort_index().ffill()
+        assert aligned['timestamp'].tolist() == frame.index.tolist()
+        for name in candles:
+            bars = aligned['candles'][name]
+            assert np.array_equal(bars[:, CLOSE], frame[name].to_numpy(), equal_nan=True), name
+            assert (bars[~aligned['present'][name] & ~np.isnan(bars[:, CLOSE]), VOLUME] == 0).all(), name
+        print(f"✅ {len(timestamps)} series merged onto {len(grid)} slots, matching pandas")
+        return True
+    except Exception as e:
+        print(f"❌ Candle alignment failed: {str(e)}")
+        return False
+
+def test_incremental_indicators():
+    """Test the O(1) indicators against a full recompute over the same candles"""
+    print("\n🔍 Testing incremental indicators...")
+    import numpy as np
+    import pandas as pd
+    from indicators import IndicatorSet
+    from config import INDICATOR_EMA_PERIOD, INDICATOR_WINDOW, INDICATOR_ATR_PERIOD, INDICATOR_VWAP_WINDOW
+    
+    def recompute(candles):
+        frame = pd.DataFrame(candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        close, high, low = frame['close'], frame['high'], frame['low']
+        returns = (close.pct_change() * 100).dropna()
+        previous = returns.iloc[:-1].tail(INDICATOR_WINDOW)
+        
+        true_range = pd.concat([high - low, (high - close.shift()).abs(), (low - close.shift()).abs()], axis=1).max(axis=1)
+        atr = true_range.iloc[:INDICATOR_ATR_PERIOD].mean()
+        for value in true_range.iloc[INDICATOR_ATR_PERIOD:]:
+            atr += (value - atr) / INDICATOR_ATR_PERIOD
+        
+        recent = frame.tail(INDICATOR_VWAP_WINDOW) if INDICATOR_VWAP_WINDOW else frame
+        typical_price = (recent['high'] + recent['low'] + recent['close']) / 3
+        return {
+            'ema': close.ewm(span=INDICATOR_EMA_PERIOD, adjust=False).mean().iloc[-1],
+            'mean': close.tail(INDICATOR_WINDOW).mean(),
+            'std': close.tail(INDICATOR_WINDOW).std(),
+            'return_mean': returns.tail(INDICATOR_WINDOW).mean(),
+            'return_std': returns.tail(INDICATOR_WINDOW).std(),
+            'return_zscore': (returns.iloc[-1] - previous.mean()) / previous.std(),
+            'atr': atr,
+            'vwap': (typical_price * recent['volume']).sum() / recent['volume'].sum(),
+        }
+    
+    try:
+        rng = np.random.default_rng(3)
+        count = 1500
+        close = 0.1 * np.cumprod(1 + rng.normal(0, 0.005, count))
+        spread = close * rng.uniform(0.001, 0.01, count)
+        candles = np.column_stack([
+            np.arange(count) * 60_000, close, close + spread, close - spread, close, rng.uniform(100, 10_000, count)
+        ]).tolist()
+        
+        # Fed in overlapping batches, as the analyzer offers its candle buffer
+        indicators = IndicatorSet(INDICATOR_EMA_PERIOD, INDICATOR_WINDOW, INDICATOR_ATR_PERIOD, INDICATOR_VWAP_WINDOW)
+        checked = 0
+        for end in range(100, count + 1, 100):
+            assert indicators.extend(candles[max(end - 500, 0):end]) == 100
+            snapshot = indicators.snapshot()
+            for name, expected in recompute(candles[:end]).items():
+                assert np.isclose(snapshot[name], expected, rtol=1e-7), (end, name, snapshot[name], expected)
+                checked += 1
+        assert indicators.extend(candles) == 0  # Nothing new
+        print(f"✅ {checked} indicator values match a full recompute over {count} candles")
+        return True
+    except Exception as e:
+        print(f"❌ Incremental indicators failed: {str(e)}")
+        return False
+
+def test_throttled_health():
+    """Test that waiting on our own rate limiter is not counted as exchange latency"""
+    print("\n🔍 Testing rate-limited exchange health...")
+    import ccxt
+    from exchange_health import ExchangeHealth
+    
+    try:
+        analyzer = MarketAnalyzer()
+        exchange = ccxt.kucoin({'enableRateLimit': True})
+        exchange.load_markets = lambda *args, **kwargs: {}
+        analyzer._on_exchange_created('kucoin', exchange)
+        exchange.fetch = lambda *args, **kwargs: {'code': '200000', 'data': []}  # Instant replies, no network
+        
+        # 30 cost units/s: each candle request (cost 3) waits 0.1s on the bucket,
+        # twice the latency that would trip the breaker
+        analyzer.rate_limiter.add_bucket('kucoin', 30, metered=True)
+        health = analyzer.exchange_health['kucoin'] = ExchangeHealth(min_requests=3, max_latency=0.05)
+        
+        start = time.monotonic()
+        for _ in range(6):
+            analyzer._call_exchange('kucoin', exchange.publicGetMarketCandles, {'symbol': 'CRO-USDT', 'type': '1min'})
+        elapsed = time.monotonic() - start
+        
+        assert elapsed >= 0.3, elapsed  # The calls really were throttled (after a burst)
+        assert health.state == 'closed' and health.latency < 0.05, health.snapshot()
+        assert analyzer.rate_limiter.stats['kucoin']['cost'] == 18
+        print(f"✅ 6 throttled calls over {elapsed:.2f}s, exchange latency {health.latency * 1000:.1f} ms, breaker closed")
+        return True
+    except Exception as e:
+        print(f"❌ Rate-limited exchange health failed: {str(e)}")
+        return False
+
+def _tick_filter_case(kucoin_moves, crypto_com_moves, candles=20):
+    """Flat candles for two exchanges with % moves applied from given bars on (bar -> % change)"""
+    import numpy as np
+    import pandas as pd
+    
+    rng = np.random.default_rng(0)
+    timestamps = pd.date_range('2024-01-01', periods=candles, freq='1min')
+    price_data = {}
+    for name, moves in (('kucoin', kucoin_moves), ('crypto_com', crypto_com_moves)):
+        close = 0.1 * (1 + rng.normal(0, 0.0005, candles))
+        for bar, change in moves.items():
+            close[bar:] *= 1 + change / 100
+        price_data[name] = pd.DataFrame({'timestamp': timestamps, 'close': close})
+    return price_data
+
+def test_tick_filter():
+    """Test that single-venue prints are held back on the newest bar and rejected only if they revert"""
+    print("\n🔍 Testing bad-tick filter...")
+    import numpy as np
+    from tick_filter import find_bad_ticks
+    from config import (
+        TICK_FILTER_WINDOW, TICK_FILTER_THRESHOLD, TICK_FILTER_MIN_DEVIATION, TICK_FILTER_MAX_CROSS_DEVIATION
+    )
+    
+    def bad_ticks(price_data):
+        closes = np.stack([df['close'].to_numpy() for df in price_data.values()])
+        return find_bad_ticks(
+            closes, np.ones(closes.shape, dtype=bool), TICK_FILTER_WINDOW, TICK_FILTER_THRESHOLD,
+            TICK_FILTER_MIN_DEVIATION, TICK_FILTER_MAX_CROSS_DEVIATION
+        )
+    
+    try:
+        # Isolated bad print: kucoin jumps 5% for one bar and comes straight back
+        price_data = _tick_filter_case({15: 5.0, 16: -100 * 0.05 / 1.05}, {})
+        rejected = bad_ticks(price_data)
+        assert np.argwhere(rejected).tolist() == [[0, 15]], np.argwhere(rejected).tolist()
+        
+        # A bad print on the newest bar is held back, so it never becomes a signal
+        price_data = _tick_filter_case({19: 50.0}, {})
+        assert np.argwhere(bad_ticks(price_data)).tolist() == [[0, 19]]
+        analyzer = MarketAnalyzer()
+        signal, message = analyzer.evaluate_spikes(analyzer.detect_spikes(price_data))
+        assert signal is None, message
+        assert analyzer.get_tick_filter_stats()['kucoin']['rejected'] == 1
+        
+        # Sustained single-venue move: kucoin leads +3% and holds; it is kept
+        # once the next bar confirms it, and only the newest bar is held back
+        price_data = _tick_filter_case({18: 3.0}, {})
+        assert np.argwhere(bad_ticks(price_data)).tolist() == [[0, 19]]
+        analyzer = MarketAnalyzer()
+        for end in (19, 20):
+            spikes = analyzer.detect_spikes({name: df.iloc[:end] for name, df in price_data.items()}, scope='CRO/USDT')
+            signal, message = analyzer.evaluate_spikes(spikes)
+            assert (signal is not None) == (end == 20), message
+        assert list(spikes) == ['kucoin'] and signal['type'] == 'strong_upward', message
+        stats = analyzer.get_tick_filter_stats()
+        assert stats['kucoin'] == {'checked': 20, 'rejected': 1, 'rejection_rate': 0.05}, stats  # Bar 19, still held
+        
+        # Cross-confirmed move: both venues drop 5% on the same bar and the price recovers
+        price_data = _tick_filter_case({15: -5.0, 16: 100 * 0.05 / 0.95}, {15: -5.0, 16: 100 * 0.05 / 0.95})
+        assert not bad_ticks(price_data).any()
+        
+        # The newest bar is counted as checked, and a print once, when it is first held back
+        analyzer = MarketAnalyzer()
+        price_data = _tick_filter_case({15: 5.0, 16: -100 * 0.05 / 1.05}, {})
+        for end in (16, 17, 18):
+            analyzer.detect_spikes({name: df.iloc[:end] for name, df in price_data.items()}, scope='CRO/USDT')
+        stats = analyzer.get_tick_filter_stats()
+        assert stats['kucoin']['checked'] == 18 and stats['kucoin']['rejected'] == 1, stats
+        print("✅ Newest bad prints held back; sustained and cross-confirmed moves kept")
+        return True
+    except Exception as e:
+        print(f"❌ Bad-tick filter failed: {str(e)}")
+        return False
+
+def test_order_book_filter():
+    """Test top-N book range tracking and that spikes on thin books are dropped"""
+    print("\n🔍 Testing order book filter...")
+    from order_book import OrderBook
+    from config import ORDER_BOOK_MIN_DEPTH, ORDER_BOOK_DEPTH_PCT
+    
+    try:
+        # A truncated snapshot only covers prices up to its worst level
+        book = OrderBook(3)
+        book.apply_snapshot([(100, 1), (99, 1), (98, 1)], [(101, 1), (102, 1), (103, 1)], 1)
+        assert (book.bid_limit, book.ask_limit) == (98, 103)
+        assert book.apply_diff([(97, 5), (99.5, 2)], [(101, 0)], 2)
+        assert book.levels(True) == [(100, 1), (99.5, 2), (99, 1), (98, 1)], book.levels(True)  # 97 was never seen
+        assert book.levels(False) == [(102, 1), (103, 1)]
+        assert book.covers(1.0) and not book.covers(3.0)
+        
+        # Thin-book spikes are dropped; exchanges without a book keep theirs
+        def make_book(size):
+            book = OrderBook(20)
+            book.apply_snapshot([(0.0999, size)], [(0.1001, size)])
+            return book
+        
+        thick_size = ORDER_BOOK_MIN_DEPTH / 0.0999 * 2
+        books = {'binance': make_book(thick_size), 'kucoin': make_book(thick_size / 100)}
+        analyzer = MarketAnalyzer()
+        analyzer._load_order_books = lambda symbol: books
+        spikes = {name: {'direction': 'up', 'change_percent': 3.0} for name in ('binance', 'kucoin', 'crypto_com')}
+        kept, metrics = analyzer._drop_thin_book_spikes('CRO/USDT', spikes)
+        assert sorted(kept) == ['binance', 'crypto_com'], kept
+        assert metrics['binance']['bid_depth'] >= ORDER_BOOK_MIN_DEPTH > metrics['kucoin']['ask_depth']
+        assert metrics['kucoin']['depth_pct'] == ORDER_BOOK_DEPTH_PCT
+        print(f"✅ Kept spikes on {sorted(kept)}, dropped the thin kucoin book")
+        return True
+    except Exception as e:
+        print(f"❌ Order book filter failed: {str(e)}")
+        return False
+
+def test_consolidated_book():
+    """Test the heap-merged book against a brute-force merge and the pool curve against x * y = k"""
+    print("\n🔍 Testing consolidated book...")
+    import numpy as np
+    from order_book import OrderBook
+    from consolidated_book import ConsolidatedBook, PoolCurve
+    
+    try:
+        # Pool levels add up to the exact constant-product quote for each amount of base
+        x, y, fee = 50_000_000.0, 5_000_000.0, 0.3
+        after_fee = 1 - fee / 100
+        pool = PoolCurve(fee, 50, 400)
+        pool.set_reserves(x, y)
+        for is_bid in (True, False):
+            base = quote = 0.0
+            for price, size in pool.levels(is_bid):
+                base += size
+                quote += price * size
+                exact = y * base * after_fee / (x + base * after_fee) if is_bid else y * base / ((x - base) * after_fee)
+                assert abs(quote - exact) <= exact * 1e-9, (is_bid, base, quote, exact)
+        
+        # The lazily merged ladder matches sorting every source's levels
+        rng = np.random.default_rng(0)
+        book = ConsolidatedBook()
+        sources = {}
+        for name, offset in (('kucoin', 0.0), ('crypto_com', 0.00005), ('binance', -0.00003)):
+            exchange_book = OrderBook(20)
+            exchange_book.apply_snapshot(
+                [(round(0.1 + offset - i * 0.0001, 6), float(size)) for i, size in enumerate(rng.uniform(100, 5000, 20))],
+                [(round(0.1001 + offset + i * 0.0001, 6), float(size)) for i, size in enumerate(rng.uniform(100, 5000, 20))],
+                0
+            )
+            sources[name] = exchange_book
+        sources['vvs'] = pool
+        for name, source in sources.items():
+            book.add_source(name, source)
+        
+        for is_bid in (True, False):
+            brute = sorted(
+                ((price, size, name) for name, source in sources.items() for price, size in source.levels(is_bid)),
+                key=lambda level: -level[0] if is_bid else level[0]
+            )
+            merged = book.levels(is_bid, len(brute))
+            assert [level[0] for level in merged] == [level[0] for level in brute]
+            assert sorted(merged) == sorted(brute)
+            
+            # Walking the brute-force ladder gives the same executable price
+            remaining, base = 2000.0, 0.0
+            for price, size, _ in brute:
+                quote = min(price * size, remaining)
+                base += quote / price
+                remaining -= quote
+                if remaining <= 1e-12:
+                    break
+            execution = book.executable_price(2000.0, 'sell' if is_bid else 'buy')
+            assert execution['complete'] and abs(execution['average_price'] - 2000.0 / base) < 1e-12, execution
+        
+        # A changed source is picked up on the next query
+        sources['kucoin'].apply_diff([], [(0.09, 1000.0)], 1)
+        assert book.levels(False, 1)[0] == (0.09, 1000.0, 'kucoin')
+        print(f"✅ Merged ladder matches brute force; best ask {book.snapshot()['best_ask_venue']}")
+        return True
+    except Exception as e:
+        print(f"❌ Consolidated book failed: {str(e)}")
+        return False
+
+def test_signal_schedule():
+    """Test the adaptive check interval and how the bot reschedules its signal check"""
+    print("\n🔍 Testing signal check scheduling...")
+    import schedule
+    from signal_schedule import AdaptiveInterval
+    
+    try:
+        # Scaled by reference / current volatility, shortened near a spike, clamped
+        adaptive = AdaptiveInterval(10, 300, 0.2, 0.75)
+        assert adaptive.next_interval(60) == 60  # No volatility data yet
+        assert adaptive.next_interval(60, 0.4) == 30
+        assert adaptive.next_interval(60, 0.05) == 240
+        assert adaptive.next_interval(60, 0.01) == 300
+        assert adaptive.next_interval(60, 0.2, 1.0) == 15
+        assert adaptive.next_interval(60, 0.2, 5.0) == 15  # Proximity is capped at 1
+        assert adaptive.next_interval(60, 1.0, 1.0) == 10
+        
+        bot = TradingBot()
+        bot.config['signal_check_interval'] = 60
+        bot._reschedule_signal_check()  # Not scheduled yet: nothing to do
+        bot._signal_job = schedule.Scheduler().every(60).seconds.do(lambda: None)
+        activity = {'volatility': 0.4, 'spike_proximity': 0.5}
+        bot.market_analyzer.get_market_activity = lambda: activity
+        
+        # Fixed mode keeps the configured interval whatever the market does
+        bot.signal_check_mode = 'fixed'
+        bot._reschedule_signal_check()
+        assert bot._signal_job.interval == 60
+        
+        # Adaptive mode follows the market and logs the change
+        bot.signal_check_mode = 'adaptive'
+        bot._reschedule_signal_check()
+        expected = round(AdaptiveInterval(10, 300, 0.2, 0.75).next_interval(60, 0.4, 0.5))
+        assert bot._signal_job.interval == expected == 19, bot._signal_job.interval
+        assert '60s → 19s' in bot.recent_activity[-1], bot.recent_activity[-1]
+        
+        # Without activity data the base interval is used
+        def fail():
+            raise RuntimeError("no candles")
+        bot.market_analyzer.get_market_activity = fail
+        bot._reschedule_signal_check()
+        assert bot._signal_job.interval == 60
+        print(f"✅ Adaptive interval {expected}s at 0.4% volatility, fixed mode stays at 60s")
+        return True
+    except Exception as e:
+        print(f"❌ Signal check scheduling failed: {str(e)}")
+        return False
+
+def test_closed_candle_storage():
+    """Test that each closed candle reaches the indicators once, without re-copying the buffer"""
+    print("\n🔍 Testing closed candle storage...")
+    from candle_buffer import CandleBuffer
+    
+    try:
+        analyzer = MarketAnalyzer()
+        fed = []
+        analyzer._update_indicators = lambda exchange_name, symbol, timeframe, closed: fed.append([c[0] for c in closed])
+        buffer = CandleBuffer(500)
+        candle = lambda minute: [minute * 60_000, 0.1, 0.1, 0.1, 0.1, 1000.0]
+        
+        buffer.extend([candle(minute) for minute in range(500)])
+        analyzer._store_closed_candles('kucoin', 'CRO/USDT', '1m', buffer)
+        analyzer._store_closed_candles('kucoin', 'CRO/USDT', '1m', buffer)  # Nothing new closed
+        buffer.extend([candle(499), candle(500), candle(501)])  # The forming candle closes, two more arrive
+        analyzer._store_closed_candles('kucoin', 'CRO/USDT', '1m', buffer)
+        
+        assert len(fed) == 2 and len(fed[0]) == 499, [len(closed) for closed in fed]
+        assert fed[1] == [minute * 60_000 for minute in (499, 500)], fed[1]
+        print(f"✅ {len(fed[0])} closed candles stored, then only the {len(fed[1])} new ones")
+        return True
+    except Exception as e:
+        print(f"❌ Closed candle storage failed: {str(e)}")
+        return False
+
+def test_multicall_batching():
+    """Test that pre-trade and balance reads take one round trip, against a local JSON-RPC stand-in"""
+    print("\n🔍 Testing multicall batching...")
+    from dex_trader import DEXTrader
+    from multicall import JsonRpcClient, Multicall
+    from config import USDC_TOKEN_ADDRESS, CRO_TOKEN_ADDRESS, MULTICALL_ADDRESS
+    
+    try:
+        for multicall in (True, False):
+            node = LocalRpcStandIn(multicall=multicall)
+            try:
+                wallet = WalletManager()
+                wallet.rpc = JsonRpcClient(node.url)
+                wallet.multicall = Multicall(wallet.rpc, wallet.contracts, MULTICALL_ADDRESS)
+                trader = DEXTrader(wallet)
+                path = trader.get_swap_path(USDC_TOKEN_ADDRESS, CRO_TOKEN_ADDRESS)
+                
+                for attempt in range(2):
+                    before = node.requests
+                    reads = trader.prepare_swap(USDC_TOKEN_ADDRESS, 100 * 10**6, path)
+                    expected = {
+                        'amounts': (100 * 10**6, 100 * 10**6 * 10**13),
+                        'allowance': LocalRpcStandIn.ALLOWANCE,
+                        'timestamp': LocalRpcStandIn.TIMESTAMP,
+                        'nonce': LocalRpcStandIn.NONCE,
+                        'gas_price': LocalRpcStandIn.GAS_PRICE,
+                    }
+                    assert reads == expected, reads
+                    # Without multicall the first batch finds no contract and is resent as plain eth_calls
+                    round_trips = node.requests - before
+                    assert round_trips == (2 if not multicall and attempt == 0 else 1), round_trips
+                
+                before = node.requests
+                balances = trader.get_balances()
+                assert balances == {'cro': 250.0, 'usdc': 1234.0, 'native': 5.0}, balances
+                assert node.requests - before == 1
+                print(f"✅ {'Multicall' if multicall else 'JSON-RPC batch'}: swap reads and balances in one round trip")
+            finally:
+                node.close()
+        return True
+    except Exception as e:
+        print(f"❌ Multicall batching failed: {str(e)}")
+        return False
+
+def test_nonce_allocation():
+    """Test local nonce allocation, resync on a rejected nonce and on a released one, against the stand-in"""
+    print("\n🔍 Testing nonce allocation...")
+    from web3 import Web3
+    from dex_trader import DEXTrader
+    from multicall import JsonRpcClient, Multicall
+    from receipt_tracker import ReceiptTracker
+    from config import USDC_TOKEN_ADDRESS, CRO_TOKEN_ADDRESS, MULTICALL_ADDRESS, CRONOS_CHAIN_ID
+    
+    node = LocalRpcStandIn()
+    try:
+        wallet = WalletManager()
+        wallet.w3 = Web3(Web3.HTTPProvider(node.url))
+        wallet.rpc = JsonRpcClient(node.url)
+        wallet.multicall = Multicall(wallet.rpc, wallet.contracts, MULTICALL_ADDRESS)
+        wallet.receipts = ReceiptTracker(wallet.rpc, 0.05, 5, on_mined=wallet.nonces.confirmed)
+        trader = DEXTrader(wallet)
+        n = LocalRpcStandIn.NONCE
+        
+        # Approve and swap back to back: n and n+1 from the pre-trade batch's single count read
+        result = trader.swap_tokens(USDC_TOKEN_ADDRESS, CRO_TOKEN_ADDRESS, 100)
+        assert result['success'], result.get('error')
+        assert [nonce for nonce, _ in node.transactions] == [n, n + 1], node.transactions
+        assert result['tx_hash'] == node.transactions[1][1]
+        assert node.calls['eth_getTransactionCount'] == 1 and wallet.nonces.syncs == 1, node.calls
+        
+        # Another sender takes nonce n+2: ours is rejected, resynced once and resent once
+        node.nonce += 1
+        transfer = lambda nonce: {
+            'to': wallet.address, 'value': 0, 'gas': 21000, 'gasPrice': LocalRpcStandIn.GAS_PRICE,
+            'nonce': nonce, 'chainId': CRONOS_CHAIN_ID
+        }
+        sent_before = len(node.sent)
+        tx_hash, receipt = wallet.send_with_nonce(transfer)
+        assert node.sent[sent_before:] == [n + 2, n + 3], node.sent
+        assert node.transactions[-1] == (n + 3, tx_hash)
+        assert node.calls['eth_getTransactionCount'] == 2 and wallet.nonces.syncs == 2, node.calls
+        
+        # Giving back the last nonce issued reuses it locally...
+        last = wallet.nonces.allocate()
+        wallet.nonces.release(last)
+        assert wallet.nonces.allocate() == last and node.calls['eth_getTransactionCount'] == 2
+        # ...but one with later nonces already out would leave a gap, so the next comes from the chain
+        later = wallet.nonces.allocate()
+        wallet.nonces.release(last)
+        wallet.nonces.release(later)
+        node.nonce = last  # Neither reached the node
+        assert wallet.nonces.allocate() == last and wallet.nonces.syncs == 3
+        assert node.calls['eth_getTransactionCount'] == 3, node.calls
+        
+        for _, mined_hash in node.transactions:
+            node.receipts[mined_hash] = {'status': '0x1', 'blockNumber': hex(101), 'gasUsed': hex(21000)}
+        receipt.result(timeout=5)
+        print(f"✅ Nonces {n}..{n + 3} allocated with {wallet.nonces.syncs} chain reads")
+        return True
+    except Exception as e:
+        print(f"❌ Nonce allocation failed: {str(e)}")
+        return False
+    finally:
+        node.close()
+
+def test_receipt_tracking():
+    """Test that receipts are polled in one batch and resolve confirmed, reverted, late and replaced transactions"""
+    print("\n🔍 Testing receipt tracking...")
+    from multicall import JsonRpcClient
+    from receipt_tracker import ReceiptTracker
+    
+    node = LocalRpcStandIn()
+    try:
+        mined = []
+        node.nonce = 0  # Nothing mined from the account yet
+        tracker = ReceiptTracker(
+            JsonRpcClient(node.url), poll_interval=0.05, timeout=0.3, on_mined=mined.append,
+            stale_poll_interval=0.25, address='0x' + '11' * 20
+        )
+        tx_hashes = ['0xok', '0xbad', '0xlost', '0xlate']
+        futures = {tx_hash: tracker.track(tx_hash, nonce) for nonce, tx_hash in enumerate(tx_hashes)}
+        
+        time.sleep(0.2)
+        assert not any(future.done() for future in futures.values())
+        node.receipts['0xok'] = {'status': '0x1', 'blockNumber': hex(101), 'gasUsed': hex(21000)}
+        node.receipts['0xbad'] = {'status': '0x0', 'blockNumber': hex(101), 'gasUsed': hex(30000)}
+        node.nonce = 2
+        
+        # Past the timeout the other two stay pending and are polled less often
+        time.sleep(0.5)
+        assert futures['0xok'].done() and futures['0xbad'].done()
+        assert not futures['0xlost'].done() and not futures['0xlate'].done()
+        assert tracker.stale_count() == 2
+        polls = tracker.polls
+        time.sleep(0.5)
+        assert tracker.polls - polls <= 3, tracker.polls - polls  # Not 10 at the normal rate
+        
+        # One is mined late; another transaction took the other one's nonce
+        node.receipts['0xlate'] = {'status': '0x1', 'blockNumber': hex(120), 'gasUsed': hex(21000)}
+        node.nonce = 4
+        
+        outcomes = {tx_hash: future.result(timeout=5) for tx_hash, future in futures.items()}
+        assert outcomes['0xok']['status'] == 'confirmed' and outcomes['0xok']['success']
+        assert outcomes['0xbad']['status'] == 'reverted' and not outcomes['0xbad']['success']
+        assert outcomes['0xlate']['status'] == 'confirmed' and outcomes['0xlate']['block_number'] == 120
+        assert outcomes['0xlost']['status'] == 'replaced' and not outcomes['0xlost']['success']
+        assert sorted(mined) == [0, 1, 2, 3], mined
+        assert tracker.stale_count() == 0
+        assert node.requests == tracker.polls, (node.requests, tracker.polls)  # One batch per poll
+        print(f"✅ {len(futures)} transactions settled in {tracker.polls} batched polls")
+        return True
+    except Exception as e:
+        print(f"❌ Receipt tracking failed: {str(e)}")
+        return False
+    finally:
+        node.close()
+
+def test_allowance_tracking():
+    """Test that a standing approval covers later swaps without allowance reads"""
+    print("\n🔍 Testing allowance tracking...")
+    from concurrent.futures import Future
+    from dex_trader import DEXTrader
+    from multicall import JsonRpcClient, Multicall
+    from config import USDC_TOKEN_ADDRESS, CRO_TOKEN_ADDRESS, VVS_ROUTER_ADDRESS, MULTICALL_ADDRESS
+    
+    node = LocalRpcStandIn()
+    try:
+        wallet = WalletManager()
+        wallet.rpc = JsonRpcClient(node.url)
+        wallet.multicall = Multicall(wallet.rpc, wallet.contracts, MULTICALL_ADDRESS)
+        trader = DEXTrader(wallet)
+        allowances = trader.allowances
+        amount = 100 * 10**6
+        
+        # Standing policy: one approval covers several trades, up to the ceiling
+        approve = allowances.approval_amount(USDC_TOKEN_ADDRESS, amount)
+        assert approve == min(amount * allowances.standing_trades, allowances.ceilings[USDC_TOKEN_ADDRESS.lower()])
+        assert approve >= amount
+        
+        allowances.approved(USDC_TOKEN_ADDRESS, VVS_ROUTER_ADDRESS, approve)
+        for _ in range(approve // amount):
+            assert allowances.get(USDC_TOKEN_ADDRESS, VVS_ROUTER_ADDRESS) >= amount  # No approval needed
+            allowances.spent(USDC_TOKEN_ADDRESS, VVS_ROUTER_ADDRESS, amount)
+        assert allowances.get(USDC_TOKEN_ADDRESS, VVS_ROUTER_ADDRESS) < amount
+        
+        # A tracked allowance is left out of the pre-trade batch
+        path = trader.get_swap_path(USDC_TOKEN_ADDRESS, CRO_TOKEN_ADDRESS)
+        reads = trader.prepare_swap(USDC_TOKEN_ADDRESS, amount, path, read_allowance=False)
+        assert reads['allowance'] is None and reads['nonce'] == LocalRpcStandIn.NONCE, reads
+        
+        # A failed transaction drops the entry so the next swap reads it again
+        receipt = Future()
+        trader._invalidate_allowance_on_failure(receipt, USDC_TOKEN_ADDRESS, VVS_ROUTER_ADDRESS)
+        receipt.set_result({'success': False, 'status': 'reverted'})
+        assert allowances.get(USDC_TOKEN_ADDRESS, VVS_ROUTER_ADDRESS) is None
+        print(f"✅ One approval of {approve / 10**6} USDC covers {approve // amount} swaps")
+        return True
+    except Exception as e:
+        print(f"❌ Allowance tracking failed: {str(e)}")
+        return False
+    finally:
+        node.close()
+
+class LocalWebSocketStandIn:
+    """WebSocket server on localhost that plays a list of messages to each client.
+    
+    It waits for the client's first (subscribe) message, records it in
+    `subscriptions` and then sends every message in order.
+    """
+    
+    def __init__(self, messages):
+        import asyncio
+        import json
+        import threading
+        import websockets
+        
+        self.subscriptions = []
+        ready = threading.Event()
+        
+        async def handler(ws):
+            self.subscriptions.append(json.loads(await ws.recv()))
+            for message in messages:
+                await ws.send(json.dumps(message))
+            await ws.wait_closed()
+        
+        async def serve():
+            self._stop = asyncio.get_running_loop().create_future()
+            async with websockets.serve(handler, '127.0.0.1', 0) as server:
+                self.url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+                ready.set()
+                await self._stop
+        
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_until_complete, args=(serve(),), daemon=True)
+        self._thread.start()
+        ready.wait(5)
+    
+    def close(self):
+        self._loop.call_soon_threadsafe(self._stop.set_result, None)
+        self._thread.join(timeout=5)
+
+def test_price_streaming():
+    """Test that streamed trades are built into candles, against a local WebSocket stand-in"""
+    print("\n🔍 Testing price streaming...")
+    from price_stream import PriceStream, KucoinTradeFeed
+    
+    minute = 60_000
+    start = 1_700_000_040_000  # A minute boundary
+    # (ms offset, price, size): one trade in the partially seen first minute, then three full minutes
+    trades = [
+        (10_000, 0.100, 5),
+        (minute + 1_000, 0.100, 10), (minute + 20_000, 0.103, 1), (minute + 40_000, 0.098, 2), (minute + 59_000, 0.101, 3),
+        (2 * minute + 5_000, 0.102, 4),
+        (3 * minute + 5_000, 0.104, 6), (3 * minute + 30_000, 0.099, 1),
+        (4 * minute + 1_000, 0.105, 2),
+    ]
+    messages = [{'type': 'welcome'}] + [{
+        'type': 'message',
+        'topic': '/market/match:CRO-USDT',
+        'data': {'time': str((start + offset) * 1_000_000), 'price': str(price), 'size': str(size)}  # Time in ns
+    } for offset, price, size in trades]
+    expected = [
+        [start + minute, 0.100, 0.103, 0.098, 0.101, 16.0],
+        [start + 2 * minute, 0.102, 0.102, 0.102, 0.102, 4.0],
+        [start + 3 * minute, 0.104, 0.104, 0.099, 0.099, 7.0],
+    ]
+    
+    server = LocalWebSocketStandIn(messages)
+    stream = None
+    try:
+        closed, updates = [], []
+        stream = PriceStream(
+            {'kucoin': KucoinTradeFeed('CRO/USDT', url=server.url)}, minute,
+            on_candle=lambda name, candle: updates.append(candle),
+            on_candle_close=lambda name, candle: closed.append(candle)
+        )
+        stream.start()
+        deadline = time.time() + 5
+        while len(updates) < len(trades) - 1 and time.time() < deadline:
+            time.sleep(0.05)
+        
+        assert server.subscriptions[0]['topic'] == '/market/match:CRO-USDT', server.subscriptions
+        assert closed == expected, closed
+        # In-progress candles start with the first full minute; the last one is still open
+        assert updates[-1] == [start + 4 * minute, 0.105, 0.105, 0.105, 0.105, 2.0], updates[-1]
+        assert len(updates) == len(trades) - 1
+        assert stream.is_live('kucoin', 5)
+        print(f"✅ {len(trades)} streamed trades built {len(closed)} closed candles")
+        return True
+    except Exception as e:
+        print(f"❌ Price streaming failed: {str(e)}")
+        return False
+    finally:
+        if stream is not None:
+            stream.stop()
+        server.close()
+
 def main():
     """Run all tests"""
     print("🚀 Starting CRO/USDC Trading Bot Tests\n")
@@ -100,7 +1119,24 @@ def main():
         ("Wallet Connection", test_wallet_connection),
         ("Market Analyzer", test_market_analyzer),
         ("Trading Bot", test_trading_bot),
-        ("Manual Trade", test_manual_trade)
+        ("Manual Trade", test_manual_trade),
+        ("Rate Limiter", test_rate_limiter),
+        ("Exchange Health", test_exchange_health),
+        ("Market Cache", test_market_cache),
+        ("Spike Detector", test_spike_detector),
+        ("Candle Alignment", test_candle_alignment),
+        ("Incremental Indicators", test_incremental_indicators),
+        ("Rate-Limited Exchange Health", test_throttled_health),
+        ("Bad-Tick Filter", test_tick_filter),
+        ("Order Book Filter", test_order_book_filter),
+        ("Consolidated Book", test_consolidated_book),
+        ("Signal Check Scheduling", test_signal_schedule),
+        ("Closed Candle Storage", test_closed_candle_storage),
+        ("Multicall Batching", test_multicall_batching),
+        ("Nonce Allocation", test_nonce_allocation),
+        ("Receipt Tracking", test_receipt_tracking),
+        ("Allowance Tracking", test_allowance_tracking),
+        ("Price Streaming", test_price_streaming)
     ]
     
     passed = 0
@@ -0,0 +1,161 @@
+import threading
+import warnings
+import numpy as np
+from candle_alignment import CLOSE, fill_gaps
+
+# Scales a median absolute deviation to a normal distribution's standard deviation
+MAD_SCALE = 1.4826
+
+
+def find_bad_ticks(closes, present, window, threshold, min_deviation, max_cross_deviation, min_periods=5):
+    """Flag bad-tick closes on aligned bars (exchanges x bars).
+
+    A real candle is an outlier if its close lies more than `threshold`
+    scaled MADs (at least `min_deviation` %) from the median of the same
+    exchange's previous `window` real closes. An outlier is kept if the
+    other exchanges confirm it, i.e. the median of their closes on the same
+    bar is within `max_cross_deviation` %. An unconfirmed outlier that is
+    an exchange's newest candle is held back until the next candle shows
+    what it was: rejected if that close is back within tolerance of the
+    median, kept if the move held. So a move one venue leads is traded a
+    candle late, and a single bad print never is. Returns a bool array
+    like `closes`.
+    """
+    return classify_ticks(closes, present, window, threshold, min_deviation, max_cross_deviation, min_periods)[0]
+
+
+def classify_ticks(closes, present, window, threshold, min_deviation, max_cross_deviation, min_periods=5):
+    """find_bad_ticks, plus the candles that were held back as the newest candle and then kept.
+
+    Returns (rejected, held) bool arrays like `closes`.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    present = np.asarray(present, dtype=bool)
+    exchanges, bars = closes.shape
+    if not bars:
+        return np.zeros_like(present)
+
+    # Previous `window` real closes of every bar
+    real = np.where(present, closes, np.nan)
+    padded = np.concatenate([np.full((exchanges, window), np.nan), real[:, :-1]], axis=1)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window, axis=1)
+
+    with np.errstate(invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # All-NaN windows before an exchange's first candles
+        history = np.count_nonzero(~np.isnan(windows), axis=2)
+        median = _window_median(windows, history == window)
+        mad = _window_median(np.abs(windows - median[:, :, None]), history == window)
+
+        tolerance = np.maximum(threshold * MAD_SCALE * mad, np.abs(median) * min_deviation / 100)
+        outlier = present & (history >= min_periods) & (np.abs(closes - median) > tolerance)
+        if not outlier.any():
+            return outlier, outlier.copy()
+
+        # Cross-exchange check against the other exchanges on the same bar
+        confirmed = np.zeros_like(outlier)
+        if exchanges > 1:
+            for row in np.flatnonzero(outlier.any(axis=1)):
+                others = np.nanmedian(np.delete(closes, row, axis=0), axis=0)
+                deviation = np.abs(closes[row] - others) / others * 100
+                confirmed[row] = deviation <= max_cross_deviation
+
+        # Did the exchange's next real close come back to the median?
+        following = next_real_index(present)
+        has_next = following < bars
+        next_close = np.take_along_axis(closes, np.minimum(following, bars - 1), axis=1)
+        reverted = has_next & (np.abs(next_close - median) <= tolerance)
+
+    unconfirmed = outlier & ~confirmed
+    rejected = unconfirmed & (reverted | ~has_next)
+    return rejected, unconfirmed & ~rejected
+
+
+def next_real_index(present):
+    """For every bar, the index of the exchange's next real bar after it (the bar count if none)"""
+    present = np.asarray(present, dtype=bool)
+    bars = present.shape[-1]
+    index = np.where(present, np.arange(bars), bars)
+    following = np.full(present.shape, bars, dtype=np.int64)
+    following[..., :-1] = np.minimum.accumulate(index[..., ::-1], axis=-1)[..., ::-1][..., 1:]
+    return following
+
+
+def _window_median(windows, full):
+    """Median of every window; the plain median is much faster, so nanmedian only runs where a window has gaps"""
+    median = np.median(windows, axis=2)
+    if not full.all():
+        median[~full] = np.nanmedian(windows[~full], axis=1)
+    return median
+
+
+class TickFilter:
+    """Drops bad ticks from aligned candles and counts what it rejected.
+
+    Metrics are kept per exchange. Keys of the aligned candles are exchange
+    names, or tuples ending in one (as in scan_markets). The same recent
+    candles are filtered on every check, so each candle only counts once
+    within its `scope` (e.g. the symbol and timeframe): as checked the
+    first time it is seen, and as rejected the first time it is rejected.
+    A newest candle held back and then kept once the move held is taken
+    out of the rejected count again.
+    """
+
+    def __init__(self, window, threshold, min_deviation, max_cross_deviation, min_periods=5):
+        self.window = window
+        self.threshold = threshold
+        self.min_deviation = min_deviation
+        self.max_cross_deviation = max_cross_deviation
+        self.min_periods = min_periods
+        self.stats = {}  # exchange name -> {'checked': n, 'rejected': n}
+        self._counted_until = {}  # (scope, key) -> newest checked candle timestamp
+        self._rejected_until = {}  # (scope, key) -> newest rejected candle timestamp
+        self._held = {}  # (scope, key) -> timestamp of the newest candle, if it was held back
+        self._lock = threading.Lock()
+
+    def filter(self, aligned, fill='ffill', scope=None):
+        """Reject bad ticks in align_candles output in place; returns key -> rejected count in this call"""
+        keys = list(aligned['candles'])
+        if not keys:
+            return {}
+
+        closes = np.stack([aligned['candles'][key][:, CLOSE] for key in keys])
+        present = np.stack([aligned['present'][key] for key in keys])
+        rejected = find_bad_ticks(
+            closes, present, self.window, self.threshold,
+            self.min_deviation, self.max_cross_deviation, self.min_periods
+        )
+
+        timestamps = aligned['timestamp']
+        result = {}
+        for row, key in enumerate(keys):
+            if rejected[row].any():
+                aligned['present'][key] = present[row] & ~rejected[row]
+                fill_gaps(aligned['candles'][key], aligned['present'][key], fill)
+            result[key] = int(rejected[row].sum())
+            self._count(key, scope, timestamps, present[row], rejected[row])
+        return result
+
+    def _count(self, key, scope, timestamps, present, rejected):
+        with self._lock:
+            exchange_name = key[-1] if isinstance(key, tuple) else key
+            stats = self.stats.setdefault(exchange_name, {'checked': 0, 'rejected': 0})
+            held = self._held.pop((scope, key), None)
+            if held is not None and (timestamps == held).any() and not rejected[timestamps == held].any():
+                stats['rejected'] -= 1  # The move held, so the candle was kept after all
+            for counter, mask, until in (('checked', present, self._counted_until),
+                                         ('rejected', present & rejected, self._rejected_until)):
+                since = until.get((scope, key))
+                new = mask if since is None else mask & (timestamps > since)
+                if new.any():
+                    stats[counter] += int(new.sum())
+                    until[(scope, key)] = int(timestamps[np.flatnonzero(new)[-1]])
+            real = np.flatnonzero(present)
+            if len(real) and rejected[real[-1]]:
+                self._held[(scope, key)] = int(timestamps[real[-1]])
+
+    def get_stats(self):
+        with self._lock:
+            stats = {key: dict(value) for key, value in self.stats.items()}
+        for value in stats.values():
+            value['rejection_rate'] = round(value['rejected'] / value['checked'], 4) if value['checked'] else 0.0
+        return stats
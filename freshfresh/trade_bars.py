@@ -0,0 +1,106 @@
+import threading
+import numpy as np
+from candle_buffer import CandleBuffer
+
+_TIMEFRAME_UNITS_MS = {'s': 1000, 'm': 60 * 1000}
+
+
+def timeframe_ms(timeframe):
+    """'5s' -> 5000, '1m' -> 60000"""
+    return int(timeframe[:-1]) * _TIMEFRAME_UNITS_MS[timeframe[-1]]
+
+
+class TradeBarBuilder:
+    """Builds bars of several sub-minute timeframes from raw trades.
+
+    Each timeframe's bars live in a preallocated CandleBuffer; the newest
+    bar of each is the one still forming. Trades are aggregated a batch at
+    a time with NumPy (bucket boundaries, then reduceat for high, low and
+    volume), so the per-trade cost is a few array operations shared by the
+    whole batch rather than Python work per trade. Trades for a bar that
+    has already closed are dropped.
+    """
+
+    def __init__(self, timeframes, capacity):
+        self.timeframes = {timeframe: timeframe_ms(timeframe) for timeframe in timeframes}
+        self.buffers = {timeframe: CandleBuffer(capacity) for timeframe in timeframes}
+        self.last_trade_timestamp = None
+        self._last_trade_ids = set()  # ids of the trades at last_trade_timestamp
+        self._lock = threading.Lock()
+
+    def add_trades(self, timestamps, prices, amounts):
+        """Aggregate a batch of trades (ms timestamps); returns the number added"""
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        amounts = np.asarray(amounts, dtype=np.float64)
+        if not len(timestamps):
+            return 0
+
+        if np.any(timestamps[1:] < timestamps[:-1]):
+            order = np.argsort(timestamps, kind='stable')
+            timestamps, prices, amounts = timestamps[order], prices[order], amounts[order]
+
+        with self._lock:
+            for timeframe, length in self.timeframes.items():
+                self._add_to_buffer(self.buffers[timeframe], length, timestamps, prices, amounts)
+            if self.last_trade_timestamp is None or timestamps[-1] > self.last_trade_timestamp:
+                self.last_trade_timestamp = int(timestamps[-1])
+                self._last_trade_ids = set()
+        return len(timestamps)
+
+    def add_ccxt_trades(self, trades):
+        """Aggregate trades in ccxt fetch_trades format, skipping ones already seen.
+
+        Fetching with since=last_trade_timestamp returns the trades at that
+        millisecond again, so those are recognised by id.
+        """
+        last = self.last_trade_timestamp
+        new = [
+            trade for trade in trades
+            if last is None or trade['timestamp'] > last
+            or (trade['timestamp'] == last and trade.get('id') not in self._last_trade_ids)
+        ]
+        if not new:
+            return 0
+
+        added = self.add_trades(
+            [trade['timestamp'] for trade in new],
+            [trade['price'] for trade in new],
+            [trade['amount'] for trade in new]
+        )
+        with self._lock:
+            self._last_trade_ids.update(
+                trade.get('id') for trade in new if trade['timestamp'] == self.last_trade_timestamp
+            )
+        return added
+
+    def _add_to_buffer(self, buffer, length, timestamps, prices, amounts):
+        buckets = timestamps - timestamps % length
+
+        forming = buffer.to_array(1)
+        if len(forming):
+            # Trades for bars that already closed can't be added any more
+            first = np.searchsorted(buckets, forming[0, 0], side='left')
+            buckets, prices, amounts = buckets[first:], prices[first:], amounts[first:]
+            if not len(buckets):
+                return
+
+        starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+        ends = np.append(starts[1:], len(buckets)) - 1
+
+        bars = np.empty((len(starts), 6))
+        bars[:, 0] = buckets[starts]
+        bars[:, 1] = prices[starts]
+        bars[:, 2] = np.maximum.reduceat(prices, starts)
+        bars[:, 3] = np.minimum.reduceat(prices, starts)
+        bars[:, 4] = prices[ends]
+        bars[:, 5] = np.add.reduceat(amounts, starts)
+
+        if len(forming) and bars[0, 0] == forming[0, 0]:
+            # Continue the bar that was still forming
+            bars[0, 1] = forming[0, 1]
+            bars[0, 2] = max(bars[0, 2], forming[0, 2])
+            bars[0, 3] = min(bars[0, 3], forming[0, 3])
+            bars[0, 5] += forming[0, 5]
+
+        buffer.extend(bars[-buffer.capacity:])
@@ -1,3 +1,4 @@
+import math
 import time
 import schedule
 import threading
@@ -10,22 +11,44 @@ from dex_trader import DEXTrader
 from config import (
     DEFAULT_TRADE_AMOUNT, DEFAULT_SLIPPAGE, MIN_PRICE_CHANGE,
     MAX_DAILY_TRADES, MAX_TRADE_AMOUNT, MIN_BALANCE_THRESHOLD,
-    SIGNAL_CHECK_INTERVAL
+    SIGNAL_CHECK_INTERVAL, STREAMING_ENABLED,
+    SIGNAL_CHECK_MODE, ADAPTIVE_MIN_INTERVAL, ADAPTIVE_MAX_INTERVAL,
+    ADAPTIVE_REFERENCE_VOLATILITY, ADAPTIVE_PROXIMITY_WEIGHT,
+    ALIGNED_CHECK_TIMEFRAME, ALIGNED_SETTLE_DELAY
 )
+from signal_schedule import AdaptiveInterval, DecisionLatency, next_candle_close
+from trade_bars import timeframe_ms
 
 class TradingBot:
     def __init__(self):
         self.wallet = WalletManager()
         self.market_analyzer = MarketAnalyzer()
         self.dex_trader = DEXTrader(self.wallet)
+        # The VVS pool is one of the venues in the consolidated order book
+        self.market_analyzer.set_pool_source(self.dex_trader)
         
         # Bot state
         self.is_running = False
         self.trades_today = 0
         self.successful_trades = 0
         self.failed_trades = 0
+        self.pending_trades = 0  # Broadcast, receipt not in yet
+        # Counters are also updated from the receipt tracker's thread
+        self._counters_lock = threading.Lock()
         self.last_check = None
         self.recent_activity = []
+        self._signal_job = None
+        self.signal_check_mode = SIGNAL_CHECK_MODE
+        # Adaptive mode: check more often when the market moves, less when it is quiet
+        self.check_interval = AdaptiveInterval(
+            ADAPTIVE_MIN_INTERVAL, ADAPTIVE_MAX_INTERVAL,
+            ADAPTIVE_REFERENCE_VOLATILITY, ADAPTIVE_PROXIMITY_WEIGHT
+        )
+        # Seconds from the latest candle close to each signal decision
+        self.decision_latency = DecisionLatency(timeframe_ms(ALIGNED_CHECK_TIMEFRAME) / 1000)
+        self._stop_event = threading.Event()
+        # Signals can arrive from the scheduler and the market data stream
+        self._signal_lock = threading.Lock()
         
         # Default configuration file path
         self.default_config_file = 'default_config.json'
@@ -53,7 +76,10 @@ class TradingBot:
             return False
         
         self.is_running = True
+        self._stop_event.clear()
         self._schedule_tasks()
+        if STREAMING_ENABLED and self.market_analyzer.start_streaming(on_signal=self._on_stream_signal):
+            self._log_activity("📡 Streaming market data enabled")
         self._log_activity("Bot started")
         return True
     
@@ -63,14 +89,22 @@ class TradingBot:
             return False
         
         self.is_running = False
+        self._stop_event.set()
         schedule.clear()
+        self._signal_job = None
+        self.market_analyzer.stop_streaming()
         self._log_activity("Bot stopped")
         return True
     
     def _schedule_tasks(self):
         """Schedule periodic tasks"""
-        # Schedule signal checking every 60 seconds for more aggressive monitoring
-        schedule.every(60).seconds.do(self._check_signals)
+        if self.signal_check_mode == 'aligned':
+            # Checks run on their own thread, timed to candle closes
+            threading.Thread(target=self._run_aligned_checks, daemon=True).start()
+        else:
+            # Schedule signal checking every signal_check_interval seconds; in
+            # adaptive mode the interval is recalculated after every check
+            self._signal_job = schedule.every(self.config['signal_check_interval']).seconds.do(self._check_signals)
         
         # Schedule daily reset at midnight
         schedule.every().day.at("00:00").do(self._daily_reset)
@@ -84,14 +118,74 @@ class TradingBot:
         scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
         scheduler_thread.start()
     
+    def _run_aligned_checks(self):
+        """Check ALIGNED_SETTLE_DELAY seconds after candle closes, at most every signal_check_interval.
+        
+        The scheduler thread only wakes once a second, so aligned checks
+        wait on an event instead and start within milliseconds of the
+        target time; stop() wakes them immediately.
+        """
+        timeframe_seconds = self.decision_latency.timeframe_seconds
+        while self.is_running:
+            every = math.ceil(self.config['signal_check_interval'] / timeframe_seconds)
+            run_at = next_candle_close(time.time(), timeframe_seconds, every) + ALIGNED_SETTLE_DELAY
+            if self._stop_event.wait(max(run_at - time.time(), 0)):
+                break
+            self._check_signals()
+    
     def _check_signals(self):
-        """Check for trading signals - runs every 60 seconds"""
+        """Check for trading signals - runs every check interval"""
         try:
             self.last_check = datetime.now()
             self._log_activity("🔍 Checking for trading signals...")
             
             signal, message = self.market_analyzer.analyze_market_signal()
-            
+            latency = self.decision_latency.record(time.time())
+            self._handle_signal(signal, f"{message} (decided {latency:.2f}s after candle close)")
+                
+        except Exception as e:
+            self._log_activity(f"❌ Error checking signals: {str(e)}")
+            import traceback
+            self._log_activity(f"Error details: {traceback.format_exc()}")
+        finally:
+            self._reschedule_signal_check()
+    
+    def _reschedule_signal_check(self):
+        """Set the delay before the next scheduled check (schedule reads it after the job returns)"""
+        if self._signal_job is None:
+            return
+        base = self.config['signal_check_interval']
+        if self.signal_check_mode != 'adaptive':
+            self._signal_job.interval = base
+            return
+        
+        try:
+            activity = self.market_analyzer.get_market_activity()
+        except Exception as e:
+            print(f"Error measuring market activity: {str(e)}")
+            activity = {'volatility': None, 'spike_proximity': 0.0}
+        interval = max(1, round(self.check_interval.next_interval(
+            base, activity['volatility'], activity['spike_proximity']
+        )))
+        if interval != self._signal_job.interval:
+            volatility = f"{activity['volatility']:.3f}%" if activity['volatility'] else "n/a"
+            self._log_activity(
+                f"⏱️ Check interval {self._signal_job.interval}s → {interval}s "
+                f"(volatility {volatility}, spike proximity {activity['spike_proximity']:.0%})"
+            )
+        self._signal_job.interval = interval
+    
+    def _on_stream_signal(self, signal, message):
+        """Handle a signal found by the streaming market data feed"""
+        if not self.is_running:
+            return
+        self.last_check = datetime.now()
+        self._log_activity("📡 Streamed candle closed")
+        self._handle_signal(signal, message)
+    
+    def _handle_signal(self, signal, message):
+        """Log a market signal and trade on it if allowed"""
+        with self._signal_lock:
             if signal:
                 self._log_activity(f"🚨 SIGNAL DETECTED: {signal['type']} - {message}")
                 # Log signal details in a cleaner format
@@ -116,11 +210,6 @@ class TradingBot:
                         self._log_activity(f"Insufficient USDC for trade: {usdc_balance:.2f} < {self.config['trade_amount']}")
             else:
                 self._log_activity(f"📊 No signal detected: {message}")
-                
-        except Exception as e:
-            self._log_activity(f"❌ Error checking signals: {str(e)}")
-            import traceback
-            self._log_activity(f"Error details: {traceback.format_exc()}")
     
     def _can_trade(self):
         """Check if trading is allowed"""
@@ -171,10 +260,9 @@ class TradingBot:
             )
             
             if result['success']:
-                self.trades_today += 1
-                self.successful_trades += 1
+                self._track_trade(result, f"Buy ${trade_amount} USDC")
                 self._log_activity(
-                    f"Buy executed: ${trade_amount} USDC -> {result['expected_amount']:.4f} CRO "
+                    f"Buy sent: ${trade_amount} USDC -> {result['expected_amount_out']:.4f} CRO "
                     f"(TX: {result['tx_hash'][:10]}...)"
                 )
             else:
@@ -202,10 +290,9 @@ class TradingBot:
             )
             
             if result['success']:
-                self.trades_today += 1
-                self.successful_trades += 1
+                self._track_trade(result, f"Sell {sell_amount:.4f} CRO")
                 self._log_activity(
-                    f"Sell executed: {sell_amount:.4f} CRO -> ${result['expected_amount']:.2f} USDC "
+                    f"Sell sent: {sell_amount:.4f} CRO -> ${result['expected_amount_out']:.2f} USDC "
                     f"(TX: {result['tx_hash'][:10]}...)"
                 )
             else:
@@ -216,6 +303,40 @@ class TradingBot:
             self.failed_trades += 1
             self._log_activity(f"Sell error: {str(e)}")
     
+    def _track_trade(self, result, description):
+        """Count a broadcast trade and settle it as successful or failed when its receipt comes in.
+        
+        It counts towards the daily limit straight away, so pending trades
+        cannot exceed it; a trade that fails on chain is given back. A trade
+        without a receipt after RECEIPT_TIMEOUT is still pending (it may yet
+        be mined), so it keeps counting until it is mined or replaced.
+        """
+        with self._counters_lock:
+            self.trades_today += 1
+            self.pending_trades += 1
+        trade_date = self.last_reset_date
+        result['receipt'].add_done_callback(
+            lambda future: self._on_trade_settled(description, trade_date, future.result())
+        )
+    
+    def _on_trade_settled(self, description, trade_date, outcome):
+        """Update the trade counters from a trade's on-chain outcome"""
+        with self._counters_lock:
+            self.pending_trades -= 1
+            if outcome['success']:
+                self.successful_trades += 1
+            else:
+                self.failed_trades += 1
+                if trade_date == self.last_reset_date:
+                    self.trades_today = max(self.trades_today - 1, 0)
+        
+        if outcome['success']:
+            self._log_activity(f"✅ {description} confirmed in block {outcome['block_number']}")
+        elif outcome['status'] == 'reverted':
+            self._log_activity(f"❌ {description} reverted in block {outcome['block_number']} (TX: {outcome['tx_hash'][:10]}...)")
+        else:
+            self._log_activity(f"❌ {description} replaced by another transaction with its nonce (TX: {outcome['tx_hash'][:10]}...)")
+    
     def execute_manual_trade(self, action):
         """Execute manual trade (buy/sell)"""
         try:
@@ -226,8 +347,7 @@ class TradingBot:
                     self.config['slippage']
                 )
                 if result['success']:
-                    self.trades_today += 1
-                    self.successful_trades += 1
+                    self._track_trade(result, f"Manual buy ${trade_amount} USDC")
                     self._log_activity(f"Manual buy: ${trade_amount} USDC")
                 return result
                 
@@ -246,8 +366,7 @@ class TradingBot:
                     self.config['slippage']
                 )
                 if result['success']:
-                    self.trades_today += 1
-                    self.successful_trades += 1
+                    self._track_trade(result, f"Manual sell {sell_amount:.4f} CRO")
                     self._log_activity(f"Manual sell: {sell_amount:.4f} CRO")
                 return result
                 
@@ -276,13 +395,63 @@ class TradingBot:
         self._check_signals()
         return self.get_status()
     
+    def get_price_info(self):
+        """Get CRO price summary, a small sparkline and market pulse for the chat UIs.
+        
+        Served from the market analyzer's shared cache, so repeated menu
+        clicks do not hit the exchanges again.
+        """
+        try:
+            prices = self.market_analyzer.get_current_price()
+            if not prices:
+                raise Exception("No price data available")
+            price_summary = '\n'.join(
+                f"• {exchange_name}: ${data['price']:.5f}" for exchange_name, data in prices.items()
+            )
+            
+            price_data = self.market_analyzer.get_price_data(limit=12)
+            closes = next(iter(price_data.values()))['close'].tolist() if price_data else []
+            if len(closes) < 2:
+                return {
+                    'price_summary': price_summary,
+                    'simple_chart': '',
+                    'market_pulse': 'Unknown'
+                }
+            
+            low, high = min(closes), max(closes)
+            bars = '▁▂▃▄▅▆▇█'
+            simple_chart = ''.join(
+                bars[int((close - low) / (high - low) * (len(bars) - 1))] if high > low else bars[0]
+                for close in closes
+            )
+            change = (closes[-1] - closes[0]) / closes[0] * 100
+            if change >= 1:
+                market_pulse = f"📈 Rising ({change:+.2f}% over {len(closes)}m)"
+            elif change <= -1:
+                market_pulse = f"📉 Falling ({change:+.2f}% over {len(closes)}m)"
+            else:
+                market_pulse = f"➡️ Calm ({change:+.2f}% over {len(closes)}m)"
+            
+            return {
+                'price_summary': price_summary,
+                'simple_chart': simple_chart,
+                'market_pulse': market_pulse
+            }
+        except Exception as e:
+            return {
+                'price_summary': f"Price unavailable: {str(e)}",
+                'simple_chart': '',
+                'market_pulse': 'Unknown'
+            }
+    
     def get_balances(self):
         """Get wallet balances"""
         try:
+            balances = self.dex_trader.get_balances()  # One round trip for all three
             return {
-                'cro': self.dex_trader.get_cro_balance(),  # Wrapped CRO for trading
-                'usdc': self.dex_trader.get_usdc_balance(),
-                'wcro': float(self.wallet.get_balance())  # Native WCRO balance
+                'cro': balances['cro'],  # Wrapped CRO for trading
+                'usdc': balances['usdc'],
+                'wcro': balances['native']  # Native WCRO balance
             }
         except Exception as e:
             raise Exception(f"Error fetching balances: {str(e)}")
@@ -295,12 +464,35 @@ class TradingBot:
             'trades_today': self.trades_today,
             'successful_trades': self.successful_trades,
             'failed_trades': self.failed_trades,
+            'pending_trades': self.pending_trades,
+            'stale_transactions': self.wallet.receipts.stale_count(),
             'recent_activity': '\n'.join(self.recent_activity[-5:]) if self.recent_activity else 'No recent activity',
+            'exchange_health': self._format_exchange_health(),
+            'tick_filter': self.market_analyzer.get_tick_filter_stats(),
+            'check_interval': self._signal_job.interval if self._signal_job else self.config['signal_check_interval'],
+            'decision_latency': self.decision_latency.get_stats(),
+            'nonces': self.wallet.nonces.get_stats(),
+            'allowances': self.dex_trader.allowances.get_stats(),
             'trade_amount': self.config['trade_amount'],
             'slippage': self.config['slippage'],
             'min_price_change': self.config['min_price_change']
         }
     
+    def _format_exchange_health(self):
+        """One status line per exchange with its health score and breaker state"""
+        lines = []
+        for exchange_name, health in self.market_analyzer.get_exchange_health().items():
+            if health['state'] == 'open':
+                lines.append(f"• {exchange_name}: 🔴 Paused (cooling down after errors)")
+                continue
+            icon = '🟡' if health['state'] == 'half_open' or health['score'] < 70 else '🟢'
+            latency = f"{health['latency_ms']} ms" if health['latency_ms'] is not None else 'no requests yet'
+            lines.append(
+                f"• {exchange_name}: {icon} {health['score']}/100 "
+                f"({latency}, {health['error_rate'] * 100:.0f}% errors)"
+            )
+        return '\n'.join(lines) if lines else 'No exchanges configured'
+    
     def update_config(self, key, value):
         """Update configuration"""
         if key in self.config:
@@ -1,7 +1,15 @@
 import os
 from eth_account import Account
 from web3 import Web3
-from config import WALLET_ADDRESS, RECOVERY_PHRASE, CRONOS_RPC_URL, CRONOS_CHAIN_ID
+from contract_registry import ContractRegistry
+from multicall import JsonRpcClient, Multicall
+from nonce_manager import NonceManager
+from receipt_tracker import ReceiptTracker
+from config import (
+    WALLET_ADDRESS, RECOVERY_PHRASE, CRONOS_RPC_URL, CRONOS_CHAIN_ID,
+    MULTICALL_ADDRESS, MULTICALL_ENABLED, RPC_TIMEOUT,
+    RECEIPT_POLL_INTERVAL, RECEIPT_TIMEOUT, RECEIPT_STALE_POLL_INTERVAL
+)
 
 # Enable mnemonic features
 Account.enable_unaudited_hdwallet_features()
@@ -11,6 +19,18 @@ class WalletManager:
         self.w3 = Web3(Web3.HTTPProvider(CRONOS_RPC_URL))
         self.account = self._load_account()
         self.address = WALLET_ADDRESS
+        # Contract objects, checksummed addresses and call data, shared with DEXTrader
+        self.contracts = ContractRegistry(self.w3)
+        # Read-only calls for one decision go out in a single round trip
+        self.rpc = JsonRpcClient(CRONOS_RPC_URL, RPC_TIMEOUT)
+        self.multicall = Multicall(self.rpc, self.contracts, MULTICALL_ADDRESS, MULTICALL_ENABLED)
+        # Nonces are handed out locally after one read from the chain
+        self.nonces = NonceManager(self.get_nonce)
+        # Receipts are awaited on a background thread, not by the sender
+        self.receipts = ReceiptTracker(
+            self.rpc, RECEIPT_POLL_INTERVAL, RECEIPT_TIMEOUT, on_mined=self.nonces.confirmed,
+            stale_poll_interval=RECEIPT_STALE_POLL_INTERVAL, address=self.address
+        )
         
     def _load_account(self):
         """Load account from recovery phrase"""
@@ -32,22 +52,11 @@ class WalletManager:
     
     def _get_erc20_balance(self, token_address):
         """Get ERC20 token balance"""
-        # ERC20 balanceOf function ABI
-        balance_abi = [{
-            "constant": True,
-            "inputs": [{"name": "_owner", "type": "address"}],
-            "name": "balanceOf",
-            "outputs": [{"name": "balance", "type": "uint256"}],
-            "type": "function"
-        }]
-        
-        contract = self.w3.eth.contract(
-            address=Web3.to_checksum_address(token_address),
-            abi=balance_abi
-        )
-        
-        balance = contract.functions.balanceOf(self.address).call()
-        return balance
+        return self.contracts.call(token_address, self.contracts.call_data('balanceOf(address)', self.address))
+    
+    def read_batch(self):
+        """A ReadBatch: add contract and RPC reads, then execute() them in one round trip"""
+        return self.multicall.batch()
     
     def sign_transaction(self, transaction):
         """Sign a transaction with the private key"""
@@ -60,15 +69,35 @@ class WalletManager:
     def send_transaction(self, signed_transaction):
         """Send a signed transaction to the network"""
         try:
-            tx_hash = self.w3.eth.send_raw_transaction(signed_transaction.rawTransaction)
-            return tx_hash.hex()
+            # rawTransaction before eth-account 0.13, raw_transaction after
+            raw_transaction = getattr(signed_transaction, 'raw_transaction', None) or signed_transaction.rawTransaction
+            tx_hash = self.w3.eth.send_raw_transaction(raw_transaction)
+            return Web3.to_hex(tx_hash)
         except Exception as e:
             raise Exception(f"Failed to send transaction: {str(e)}")
     
     def get_nonce(self):
-        """Get the current nonce for the account"""
+        """Get the current nonce for the account from the chain (pending transactions included)"""
         return self.w3.eth.get_transaction_count(self.address, 'pending')
     
+    def send_with_nonce(self, build_transaction, max_retries=3):
+        """Sign and send build_transaction(nonce) with a locally allocated nonce.
+        
+        If the node rejects the nonce, the nonce manager resyncs from the
+        chain and the transaction is rebuilt and resent right away. Returns
+        (tx hash, Future of the receipt outcome) without waiting for it.
+        """
+        for attempt in range(max_retries):
+            nonce = self.nonces.allocate()
+            try:
+                tx_hash = self.send_transaction(self.sign_transaction(build_transaction(nonce)))
+            except Exception as e:
+                if self.nonces.failed(nonce, e) and attempt < max_retries - 1:
+                    continue
+                raise
+            self.nonces.sent(nonce, tx_hash)
+            return tx_hash, self.receipts.track(tx_hash, nonce)
+    
     def estimate_gas(self, transaction):
         """Estimate gas for a transaction"""
         try: